@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+asyncio-среда выполнения для LCD GAME
+Ввод, таймеры, фоновые задачи и вывод на дисплей как задачи asyncio
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from power_governor import PowerGovernor
+from config import *
+
+
+class AsyncRuntime:
+    """
+    Среда выполнения на asyncio
+
+    Блокирующая работа с SPI выполняется в отдельном однопоточном
+    исполнителе (доступ к шине сериализован), прочая блокирующая работа
+    (системные команды, опрос системы) - в пуле фоновых потоков.
+    """
+
+    # Событие очереди ввода: дисплей разбужен, нужна полная перерисовка
+    WAKE_EVENT = 'WAKE'
+
+    def __init__(self, lcd, input_poll_interval=ASYNC_CONFIG['input_poll_interval'],
+                 poll_input=True, governor=None):
+        """
+        Инициализация среды выполнения
+
+        Args:
+            lcd: Экземпляр LCDGame
+            input_poll_interval (float): Период опроса кнопок в секундах
+            poll_input (bool): Публиковать нажатия кнопок в очередь событий
+                (игры опрашивают кнопки сами и передают False)
+            governor: Экземпляр PowerGovernor (по умолчанию создается новый)
+        """
+        self.lcd = lcd
+        self.input_poll_interval = input_poll_interval
+        self.poll_input = poll_input
+        self.governor = governor if governor is not None else PowerGovernor(lcd)
+        self.display_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='lcd-display')
+        self.background_executor = ThreadPoolExecutor(
+            max_workers=ASYNC_CONFIG['background_workers'],
+            thread_name_prefix='lcd-background'
+        )
+        self.running = False
+        # Ввод принадлежит игре: опрос кнопок приостановлен
+        self.input_paused = False
+        self.tasks = set()
+        self.events = None
+
+    def start(self):
+        """Запуск среды (вызывается внутри работающего цикла событий)"""
+        self.running = True
+        self.events = asyncio.Queue()
+        if self.poll_input:
+            loop = asyncio.get_running_loop()
+            # Нажатия по фронту GPIO приходят из потока RPi.GPIO
+            notify = lambda name: loop.call_soon_threadsafe(self._on_button, name)
+            if not self.lcd.buttons.enable_events(notify):
+                self.spawn(self._poll_input())
+            self.every(POWER_CONFIG['tick_interval'], self._governor_tick)
+
+    def stop(self):
+        """Остановка среды и отмена всех задач"""
+        self.running = False
+        if self.poll_input:
+            self.lcd.buttons.disable_events()
+        for task in list(self.tasks):
+            task.cancel()
+        if self.events is not None:
+            # Пробуждение ожидающих next_event
+            self.events.put_nowait(None)
+
+    def shutdown(self):
+        """Освобождение пулов потоков"""
+        self.running = False
+        self.display_executor.shutdown(wait=True)
+        self.background_executor.shutdown(wait=False)
+
+    def spawn(self, coro):
+        """
+        Запуск корутины как отслеживаемой задачи
+
+        Args:
+            coro: Корутина
+
+        Returns:
+            asyncio.Task: Созданная задача
+        """
+        task = asyncio.get_running_loop().create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self._task_done)
+        return task
+
+    def _task_done(self, task):
+        """Удаление завершенной задачи и вывод ее ошибки"""
+        self.tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Ошибка в фоновой задаче: {task.exception()}")
+
+    def every(self, interval, callback):
+        """
+        Периодический таймер
+
+        Args:
+            interval (float): Период в секундах
+            callback: Функция или корутинная функция без аргументов
+
+        Returns:
+            asyncio.Task: Задача таймера
+        """
+        async def timer():
+            next_time = time.monotonic()
+            while self.running:
+                result = callback()
+                if asyncio.iscoroutine(result):
+                    await result
+                next_time += interval
+                delay = next_time - time.monotonic()
+                if delay < 0:
+                    # Таймер отстал - не пытаемся догонять пропущенные срабатывания
+                    next_time = time.monotonic()
+                    delay = 0
+                await asyncio.sleep(delay)
+
+        return self.spawn(timer())
+
+    async def run_display(self, func, *args):
+        """Выполнение функции, работающей с дисплеем, в потоке SPI"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.display_executor, func, *args)
+
+    async def run_blocking(self, func, *args):
+        """Выполнение блокирующей функции в фоновом потоке"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.background_executor, func, *args)
+
+    async def flush(self):
+        """Отправка буфера на дисплей без блокировки цикла событий"""
+        await self.run_display(self.lcd.update)
+
+    async def flush_region(self, x, y, width, height):
+        """Отправка области буфера на дисплей без блокировки цикла событий"""
+        await self.run_display(self.lcd.update_region, x, y, width, height)
+
+    async def _publish_button(self, button_name):
+        """
+        Публикация нажатия в очередь событий
+
+        Returns:
+            bool: False если нажатие только разбудило дисплей
+        """
+        # Пробуждение SLPOUT ждет 120 мс - выполняется в потоке дисплея
+        if await self.run_display(self.governor.notify_input):
+            # Нажатие только будит дисплей и не считается командой
+            self.events.put_nowait(self.WAKE_EVENT)
+            return False
+        self.events.put_nowait(button_name)
+        return True
+
+    def _on_button(self, button_name):
+        """Нажатие, полученное по фронту GPIO"""
+        if self.running:
+            self.spawn(self._publish_button(button_name))
+
+    async def _poll_input(self):
+        """Опрос кнопок, если детектирование фронтов недоступно"""
+        while self.running:
+            if not self.input_paused:
+                for button_name in self.lcd.buttons.get_all_pressed():
+                    if not await self._publish_button(button_name):
+                        break
+            await asyncio.sleep(self.input_poll_interval)
+
+    async def _governor_tick(self):
+        """Проверка таймаутов энергосбережения в потоке дисплея"""
+        await self.run_display(self.governor.tick)
+
+    async def next_event(self, timeout=None):
+        """
+        Ожидание следующего нажатия кнопки
+
+        Args:
+            timeout (float): Максимальное время ожидания в секундах
+
+        Returns:
+            str: Имя кнопки или None по таймауту или при остановке
+        """
+        try:
+            return await asyncio.wait_for(self.events.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def run(self, main):
+        """
+        Запуск корутинной функции в новом цикле событий
+
+        Args:
+            main: Корутинная функция, принимающая среду выполнения
+        """
+        async def runner():
+            self.start()
+            try:
+                await main(self)
+            finally:
+                self.stop()
+
+        try:
+            asyncio.run(runner())
+        finally:
+            self.shutdown()
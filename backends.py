@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Бэкенды вывода LCDGame
+LCDGame формирует поток команд ST7789 (команда, данные) и не обращается к
+spidev и RPi.GPIO напрямую; бэкенд передает этот поток на шину или в модель.
+Модули оборудования импортируются только при создании SPI-бэкенда
+"""
+
+import os
+import time
+from config import *
+
+# Переменная окружения, переопределяющая DISPLAY_BACKEND
+BACKEND_ENV = 'LCD_GAME_BACKEND'
+
+
+def backend_name():
+    """Имя выбранного бэкенда (переменная окружения или config.py)"""
+    return os.environ.get(BACKEND_ENV) or DISPLAY_BACKEND
+
+
+def create_backend(name=None, spi_bus=SPI_BUS, spi_device=SPI_DEVICE, trace=True):
+    """
+    Создание бэкенда по имени
+
+    Args:
+        name (str): 'spi', 'fbdev' или 'simulated' (по умолчанию backend_name())
+        spi_bus (int): Номер SPI шины
+        spi_device (int): Номер SPI устройства
+        trace (bool): Обернуть в TracingBackend, если трассировка включена
+
+    Returns:
+        DisplayBackend
+    """
+    name = name or backend_name()
+    if name == 'spi':
+        backend = SpiBackend(spi_bus, spi_device)
+    elif name == 'fbdev':
+        from fb_backend import FramebufferBackend
+        backend = FramebufferBackend()
+    elif name == 'simulated':
+        from sim_backend import SimulatedBackend
+        backend = SimulatedBackend()
+    else:
+        raise ValueError(f"неизвестный бэкенд дисплея: {name}")
+
+    if trace:
+        from spi_trace import trace_path, TracingBackend
+        path = trace_path()
+        if path:
+            backend = TracingBackend(backend, path)
+    return backend
+
+
+class DisplayBackend:
+    """
+    Базовый бэкенд: интерфейс, который использует LCDGame
+
+    Каждый вызов command или data - одна транзакция (CS активен на время
+    передачи), как на настоящей шине.
+    """
+
+    name = None
+    # Панель уже инициализирована ранней заставкой
+    preinitialized = False
+
+    def open(self):
+        """Захват оборудования"""
+        pass
+
+    def reset(self):
+        """Аппаратный сброс контроллера"""
+        pass
+
+    def command(self, cmd):
+        """Байт команды (DC = 0)"""
+        raise NotImplementedError
+
+    def data(self, data):
+        """Параметры команды или пиксели (DC = 1): список байт или буфер"""
+        raise NotImplementedError
+
+    def write_window(self, x_start, y_start, x_end, y_end, data):
+        """Запись пикселей RGB565 в окно (границы включительно)"""
+        self.command(0x2A)
+        self.data([x_start >> 8, x_start & 0xFF, x_end >> 8, x_end & 0xFF])
+        self.command(0x2B)
+        self.data([y_start >> 8, y_start & 0xFF, y_end >> 8, y_end & 0xFF])
+        self.command(0x2C)
+        self.data(data)
+
+    def delay(self, seconds):
+        """Пауза, которой требует контроллер"""
+        time.sleep(seconds)
+
+    def set_backlight(self, state):
+        pass
+
+    def button_source(self):
+        """Источник состояния кнопок для ButtonManager"""
+        raise NotImplementedError
+
+    def close(self):
+        """Освобождение оборудования"""
+        pass
+
+
+class GpioButtonSource:
+    """
+    Кнопки на пинах GPIO
+    """
+
+    def __init__(self, gpio=None):
+        if gpio is None:
+            import RPi.GPIO as gpio
+        self.gpio = gpio
+
+    def setup(self, pin):
+        self.gpio.setup(pin, self.gpio.IN,
+                        pull_up_down=self.gpio.PUD_UP if BUTTON_PULL_UP else self.gpio.PUD_DOWN)
+
+    def is_active(self, pin):
+        """Нажата ли кнопка (с учетом подтяжки)"""
+        level = self.gpio.input(pin)
+        return level == self.gpio.LOW if BUTTON_PULL_UP else level == self.gpio.HIGH
+
+    def add_edge_callback(self, pin, callback, bouncetime):
+        """
+        Уведомление о нажатии по фронту (вызывается из потока RPi.GPIO)
+
+        Args:
+            pin (int): Пин кнопки
+            callback: Функция, получающая номер пина
+            bouncetime (int): Подавление дребезга, мс
+        """
+        edge = self.gpio.FALLING if BUTTON_PULL_UP else self.gpio.RISING
+        self.gpio.add_event_detect(pin, edge, bouncetime=bouncetime, callback=callback)
+
+    def remove_edge_callback(self, pin):
+        self.gpio.remove_event_detect(pin)
+
+
+class SpiBackend(DisplayBackend):
+    """
+    ST7789 через spidev; DC, CS, сброс и подсветка - пины RPi.GPIO
+    """
+
+    name = 'spi'
+
+    def __init__(self, spi_bus=SPI_BUS, spi_device=SPI_DEVICE):
+        import spidev
+        import RPi.GPIO as GPIO
+        from early_splash import panel_initialized
+
+        self.gpio = GPIO
+        self.spi = spidev.SpiDev()
+        self.spi_bus = spi_bus
+        self.spi_device = spi_device
+        self.opened = False
+        self.preinitialized = panel_initialized()
+
+    def open(self):
+        GPIO = self.gpio
+        GPIO.setmode(GPIO.BCM)
+        GPIO.setwarnings(False)  # Отключаем предупреждения
+
+        # Начальные уровни не сбрасывают панель и не гасят подсветку,
+        # если ее уже включила ранняя заставка
+        GPIO.setup(PIN_RESET, GPIO.OUT, initial=GPIO.HIGH)
+        GPIO.setup(PIN_DC, GPIO.OUT)
+        GPIO.setup(PIN_CS, GPIO.OUT, initial=GPIO.HIGH)
+        GPIO.setup(PIN_BACKLIGHT, GPIO.OUT,
+                   initial=GPIO.HIGH if self.preinitialized else GPIO.LOW)
+
+        self.spi.open(self.spi_bus, self.spi_device)
+        self.spi.max_speed_hz = SPI_SPEED
+        self.spi.mode = 0
+        self.spi.bits_per_word = 8
+        self.opened = True
+
+    def reset(self):
+        GPIO = self.gpio
+        GPIO.output(PIN_RESET, GPIO.HIGH)
+        time.sleep(0.01)
+        GPIO.output(PIN_RESET, GPIO.LOW)
+        time.sleep(0.01)
+        GPIO.output(PIN_RESET, GPIO.HIGH)
+        time.sleep(0.01)
+
+    def command(self, cmd):
+        GPIO = self.gpio
+        GPIO.output(PIN_DC, GPIO.LOW)
+        GPIO.output(PIN_CS, GPIO.LOW)
+        self.spi.writebytes([cmd])
+        GPIO.output(PIN_CS, GPIO.HIGH)
+
+    def data(self, data):
+        GPIO = self.gpio
+        GPIO.output(PIN_DC, GPIO.HIGH)
+        GPIO.output(PIN_CS, GPIO.LOW)
+        if isinstance(data, list):
+            self.spi.writebytes(data)
+        else:
+            # writebytes2 принимает буфер и сам делит передачу на блоки
+            self.spi.writebytes2(data)
+        GPIO.output(PIN_CS, GPIO.HIGH)
+
+    def set_backlight(self, state):
+        self.gpio.output(PIN_BACKLIGHT, self.gpio.HIGH if state else self.gpio.LOW)
+
+    def button_source(self):
+        return GpioButtonSource(self.gpio)
+
+    def close(self):
+        from early_splash import clear_panel_initialized
+
+        # После освобождения пинов состояние панели не гарантировано
+        clear_panel_initialized()
+        try:
+            if self.opened:
+                self.spi.close()
+        except Exception:
+            pass
+        try:
+            self.gpio.cleanup()
+        except Exception:
+            pass
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Хранилище резервных копий системных файлов с адресацией по содержимому
+Каждое уникальное содержимое хранится один раз (objects/<sha256>), индекс
+index.json перечисляет версии: (время, путь, хэш). Повторная копия
+неизменившегося файла ничего не записывает на карту
+
+Использование:
+    python3 backup_store.py backup /boot/config.txt ...
+    python3 backup_store.py list [путь]
+    python3 backup_store.py restore /boot/config.txt [--back N | --hash ПРЕФИКС] [--to файл]
+    python3 backup_store.py prune [--keep N] [--max-age ДНИ]
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+from boot_config import write_atomic
+from config import *
+
+
+def file_hash(path):
+    """SHA-256 содержимого файла (hex)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(65536), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class BackupStore:
+    """
+    Версии файлов в каталоге резервных копий
+
+    Записи индекса упорядочены по времени; содержимое лежит в
+    objects/<первые 2 символа хэша>/<хэш>.
+    """
+
+    def __init__(self, root=SYSTEM_CONFIG['backup_path']):
+        """
+        Args:
+            root (str): Каталог хранилища
+        """
+        self.root = root
+        self.index_path = os.path.join(root, 'index.json')
+        try:
+            with open(self.index_path, 'r') as f:
+                self.entries = json.load(f)['entries']
+        except FileNotFoundError:
+            self.entries = []
+
+    def object_path(self, digest):
+        return os.path.join(self.root, 'objects', digest[:2], digest)
+
+    def _save_index(self):
+        os.makedirs(self.root, exist_ok=True)
+        data = json.dumps({'entries': self.entries}, indent=1).encode()
+        write_atomic(self.index_path, data)
+
+    def versions(self, path):
+        """Версии файла от новой к старой"""
+        path = os.path.abspath(path)
+        return [entry for entry in reversed(self.entries) if entry['path'] == path]
+
+    def backup(self, paths):
+        """
+        Резервное копирование файлов
+
+        Файл, совпадающий с последней версией, пропускается; содержимое,
+        уже лежащее в хранилище (например, откат к старой версии), не
+        копируется повторно - в индекс добавляется только запись.
+
+        Args:
+            paths (list): Пути к файлам (отсутствующие пропускаются)
+
+        Returns:
+            dict: путь -> (хэш, добавлена ли новая версия)
+        """
+        results = {}
+        now = time.time()
+        for path in paths:
+            path = os.path.abspath(path)
+            if not os.path.isfile(path):
+                continue
+            digest = file_hash(path)
+            versions = self.versions(path)
+            if versions and versions[0]['sha256'] == digest:
+                results[path] = (digest, False)
+                continue
+
+            blob = self.object_path(digest)
+            if not os.path.exists(blob):
+                os.makedirs(os.path.dirname(blob), exist_ok=True)
+                with open(path, 'rb') as f:
+                    write_atomic(blob, f.read())
+            self.entries.append({
+                'time': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(now)),
+                'timestamp': now,
+                'path': path,
+                'sha256': digest,
+                'size': os.path.getsize(blob),
+            })
+            results[path] = (digest, True)
+
+        if any(added for _, added in results.values()):
+            self._save_index()
+        return results
+
+    def find(self, path, back=0, digest=None):
+        """
+        Версия файла
+
+        Args:
+            path (str): Путь к файлу
+            back (int): Номер версии от новой (0 - последняя)
+            digest (str): Префикс хэша (имеет приоритет над back)
+
+        Returns:
+            dict: Запись индекса или None
+        """
+        versions = self.versions(path)
+        if digest:
+            for entry in versions:
+                if entry['sha256'].startswith(digest):
+                    return entry
+            return None
+        return versions[back] if back < len(versions) else None
+
+    def restore(self, entry, target=None):
+        """
+        Восстановление версии
+
+        Файл, уже совпадающий с версией, не перезаписывается.
+
+        Args:
+            entry (dict): Запись индекса (find)
+            target (str): Куда восстановить (по умолчанию исходный путь)
+
+        Returns:
+            bool: Был ли файл записан
+        """
+        target = target or entry['path']
+        digest = entry['sha256']
+        if os.path.isfile(target) and file_hash(target) == digest:
+            return False
+
+        with open(self.object_path(digest), 'rb') as f:
+            data = f.read()
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"копия {digest[:12]} повреждена")
+        write_atomic(target, data)
+        return True
+
+    def prune(self, keep=BACKUP_CONFIG['keep_versions'], max_age_days=BACKUP_CONFIG['max_age_days']):
+        """
+        Удаление старых версий и неиспользуемого содержимого
+
+        Для каждого файла остаются последние keep версий, из них - не старше
+        max_age_days; последняя версия остается всегда.
+
+        Returns:
+            int: Количество удаленных версий
+        """
+        cutoff = time.time() - max_age_days * 86400 if max_age_days else None
+        kept = []
+        counts = {}
+        for entry in reversed(self.entries):
+            number = counts.get(entry['path'], 0)
+            counts[entry['path']] = number + 1
+            if number == 0 or (number < keep and (cutoff is None or entry['timestamp'] >= cutoff)):
+                kept.append(entry)
+        kept.reverse()
+
+        removed = len(self.entries) - len(kept)
+        if not removed:
+            return 0
+        self.entries = kept
+        self._save_index()
+
+        used = {entry['sha256'] for entry in kept}
+        objects_dir = os.path.join(self.root, 'objects')
+        for prefix in os.listdir(objects_dir):
+            directory = os.path.join(objects_dir, prefix)
+            for name in os.listdir(directory):
+                if name not in used:
+                    os.remove(os.path.join(directory, name))
+            if not os.listdir(directory):
+                os.rmdir(directory)
+        return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Резервные копии системных файлов LCD Game Driver")
+    parser.add_argument('--root', default=SYSTEM_CONFIG['backup_path'], help="каталог хранилища")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    backup_parser = commands.add_parser('backup', help="сохранить файлы")
+    backup_parser.add_argument('paths', nargs='+')
+
+    list_parser = commands.add_parser('list', help="версии файлов")
+    list_parser.add_argument('path', nargs='?')
+
+    restore_parser = commands.add_parser('restore', help="восстановить версию")
+    restore_parser.add_argument('path')
+    restore_parser.add_argument('--back', type=int, default=0, help="номер версии от новой (0 - последняя)")
+    restore_parser.add_argument('--hash', default=None, help="префикс хэша версии")
+    restore_parser.add_argument('--to', default=None, help="восстановить в другой файл")
+
+    prune_parser = commands.add_parser('prune', help="удалить старые версии")
+    prune_parser.add_argument('--keep', type=int, default=BACKUP_CONFIG['keep_versions'])
+    prune_parser.add_argument('--max-age', type=float, default=BACKUP_CONFIG['max_age_days'], help="дней")
+
+    args = parser.parse_args()
+    store = BackupStore(args.root)
+
+    if args.command == 'backup':
+        for path, (digest, added) in store.backup(args.paths).items():
+            print(f"{'✓ сохранен' if added else '✓ без изменений'}: {path} {digest[:12]}")
+    elif args.command == 'list':
+        entries = store.versions(args.path) if args.path else list(reversed(store.entries))
+        for entry in entries:
+            print(f"{entry['time']}  {entry['sha256'][:12]}  {entry['size']:8d}  {entry['path']}")
+    elif args.command == 'restore':
+        entry = store.find(args.path, args.back, args.hash)
+        if entry is None:
+            print(f"✗ Версия не найдена: {args.path}")
+            sys.exit(1)
+        target = args.to or entry['path']
+        if store.restore(entry, target):
+            print(f"✓ Восстановлено: {target} ({entry['time']}, {entry['sha256'][:12]})")
+        else:
+            print(f"✓ {target} уже совпадает с версией {entry['sha256'][:12]}")
+    elif args.command == 'prune':
+        print(f"✓ Удалено версий: {store.prune(args.keep, args.max_age)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Бенчмарки отрисовки и передачи для CM4 с LCD дисплеем
+Выполняются без оборудования на симулированном бэкенде (sim_backend.py):
+время CPU измеряется по-настоящему, байты и время шины - по модели SPI
+
+Использование:
+    python3 benchmark.py run [-o results.json] [-k фильтр] [--quick]
+    python3 benchmark.py compare baseline.json [results.json] [--threshold 0.1]
+
+compare без второго файла сначала выполняет бенчмарки; код возврата 1,
+если есть регрессии
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import tracemalloc
+from config import *
+
+# Зарегистрированные бенчмарки: имя -> функция подготовки
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """
+    Регистрация бенчмарка
+
+    Функция подготовки получает LCDGame и возвращает (операция, очистка или None);
+    операция - один измеряемый шаг (кадр, вызов).
+    """
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+@benchmark('lcd.update')
+def bench_update(lcd):
+    lcd.draw_rect(20, 20, 100, 100, color=(255, 0, 0), fill=True)
+    return lcd.update, None
+
+
+@benchmark('lcd.update_region')
+def bench_update_region(lcd):
+    return (lambda: lcd.update_region(40, 40, 64, 32)), None
+
+
+@benchmark('lcd.clear')
+def bench_clear(lcd):
+    return lcd.clear, None
+
+
+@benchmark('lcd.draw_text')
+def bench_draw_text(lcd):
+    lcd.preload_fonts()
+    return (lambda: lcd.draw_text("CPU: 42.0%  RAM: 61%", 10, 100, font_size=12)), None
+
+
+@benchmark('lcd.draw_image')
+def bench_draw_image(lcd):
+    from PIL import Image
+
+    handle, path = tempfile.mkstemp(suffix='.png')
+    os.close(handle)
+    image = Image.new('RGB', (64, 64))
+    for y in range(64):
+        for x in range(64):
+            image.putpixel((x, y), (x * 4, y * 4, 128))
+    image.save(path)
+    return (lambda: lcd.draw_image(path, 80, 80)), (lambda: os.remove(path))
+
+
+def _desktop(lcd):
+    from desktop import Desktop
+
+    desktop = Desktop(lcd)
+    desktop.metrics.sample_due()
+    return desktop, desktop.probes.close
+
+
+def _desktop_switch(screen_id):
+    """Переход на экран с другого экрана (полный кадр, кэш экранов прогрет)"""
+    def setup(lcd):
+        desktop, cleanup = _desktop(lcd)
+        other = "main" if screen_id != "main" else "settings"
+
+        def op():
+            desktop.current_screen = other
+            desktop.render_screen()
+            desktop.current_screen = screen_id
+            desktop.render_screen()
+        return op, cleanup
+    return setup
+
+
+for _screen in ("main", "system_info", "games", "settings", "network", "shutdown"):
+    benchmark(f'desktop.{_screen}')(_desktop_switch(_screen))
+
+
+@benchmark('desktop.main.refresh')
+def bench_desktop_refresh(lcd):
+    """Повторная отрисовка главного экрана (только изменившиеся виджеты)"""
+    desktop, cleanup = _desktop(lcd)
+    desktop.render_screen()
+    return desktop.render_screen, cleanup
+
+
+@benchmark('splash.intro')
+def bench_splash_intro(lcd):
+    from boot_splash import BootSplash
+
+    splash = BootSplash(lcd)
+    frames = [splash.intro_frames()]
+
+    def op():
+        try:
+            next(frames[0])
+        except StopIteration:
+            frames[0] = splash.intro_frames()
+            next(frames[0])
+        lcd.update()
+    return op, None
+
+
+@benchmark('splash.progress')
+def bench_splash_progress(lcd):
+    from boot_splash import BootSplash
+
+    splash = BootSplash(lcd)
+    splash.draw_background()
+    state = {'step': 0}
+
+    def op():
+        step = state['step'] = (state['step'] + 1) % 100
+        splash.draw_progress(step / 100.0, "Loading", phase=step * 0.1)
+    return op, None
+
+
+def _game(module_name, class_name):
+    """Кадр примера игры: логика и отрисовка с отправкой на дисплей"""
+    def setup(lcd):
+        import importlib
+
+        random.seed(1)
+        game_class = getattr(importlib.import_module(module_name), class_name)
+        game = game_class(lcd)
+
+        def op():
+            if getattr(game, 'game_over', False):
+                game.reset_game()
+            game.handle_input()
+            game.update(1.0 / game.fps)
+            game.render()
+        return op, None
+    return setup
+
+
+benchmark('game.snake')(_game('examples.snake_game', 'SnakeGame'))
+benchmark('game.simple')(_game('examples.simple_game', 'SimpleGame'))
+
+
+def run_case(name, setup, min_time, min_ops, alloc_ops):
+    """
+    Выполнение одного бенчмарка
+
+    Returns:
+        dict: Результаты (µs на операцию, операций в секунду, байты и
+        транзакции шины на операцию, выделения памяти на операцию)
+    """
+    from lcd_game import LCDGame
+    from sim_backend import SimulatedBackend
+
+    backend = SimulatedBackend(realtime=False)
+    lcd = LCDGame(backend=backend)
+    op, cleanup = setup(lcd)
+    try:
+        # Прогрев: кэши шрифтов, экранов и ленивые импорты
+        for _ in range(3):
+            op()
+
+        before = backend.counters()
+        timings = []
+        started = time.perf_counter()
+        while len(timings) < min_ops or time.perf_counter() - started < min_time:
+            start = time.perf_counter()
+            op()
+            timings.append(time.perf_counter() - start)
+        after = backend.counters()
+        ops = len(timings)
+
+        # Выделения памяти - отдельный проход: tracemalloc замедляет код
+        tracemalloc.start()
+        allocated = []
+        try:
+            for _ in range(alloc_ops):
+                tracemalloc.reset_peak()
+                current, _peak = tracemalloc.get_traced_memory()
+                op()
+                allocated.append(tracemalloc.get_traced_memory()[1] - current)
+        finally:
+            tracemalloc.stop()
+    finally:
+        if cleanup:
+            cleanup()
+        lcd.cleanup()
+
+    timings.sort()
+    mean = sum(timings) / ops
+    return {
+        'ops': ops,
+        'us_per_op': timings[ops // 2] * 1e6,
+        'us_mean': mean * 1e6,
+        'us_p95': timings[min(ops - 1, int(ops * 0.95))] * 1e6,
+        'ops_per_sec': 1.0 / mean if mean else 0.0,
+        'bytes_per_op': (after['bytes'] - before['bytes']) / ops,
+        'transactions_per_op': (after['transactions'] - before['transactions']) / ops,
+        'bus_us_per_op': (after['bus_time'] - before['bus_time']) / ops * 1e6,
+        'alloc_bytes_per_op': sum(allocated) / len(allocated) if allocated else 0,
+    }
+
+
+def run(pattern=None, quick=False):
+    """
+    Выполнение бенчмарков
+
+    Args:
+        pattern (str): Подстрока имени (None - все)
+        quick (bool): Короткий прогон
+
+    Returns:
+        dict: Документ с описанием окружения и результатами
+    """
+    min_time = BENCHMARK_CONFIG['min_time'] / (5 if quick else 1)
+    min_ops = BENCHMARK_CONFIG['min_ops'] // (4 if quick else 1)
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if pattern and pattern not in name:
+            continue
+        try:
+            results[name] = run_case(name, setup, min_time, min_ops, BENCHMARK_CONFIG['alloc_ops'])
+        except Exception as e:
+            # Упавший бенчмарк остается в результатах: compare считает его регрессией
+            results[name] = {'error': f"{type(e).__name__}: {e}"}
+            print(f"{name:24} ОШИБКА: {results[name]['error']}")
+            continue
+        result = results[name]
+        print(f"{name:24} {result['us_per_op']:10.1f} µs {result['ops_per_sec']:8.1f}/s "
+              f"{result['bytes_per_op']:9.0f} B {result['alloc_bytes_per_op'] / 1024:8.1f} KiB")
+
+    return {
+        'meta': {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'spi_speed': SPI_SPEED,
+            'filter': pattern,
+        },
+        'results': results,
+    }
+
+
+def compare(baseline, current, threshold=BENCHMARK_CONFIG['threshold']):
+    """
+    Сравнение результатов с базовыми
+
+    Регрессия - рост медианного времени или выделений памяти больше чем на
+    threshold, любой рост байт на шине (они детерминированы), а также
+    упавший бенчмарк и бенчмарк базы, отсутствующий в текущих результатах.
+
+    Returns:
+        list: Строки отчета с регрессиями (пустой список - регрессий нет)
+    """
+    regressions = []
+    base_results = baseline['results']
+    for name, result in current['results'].items():
+        base = base_results.get(name)
+        if 'error' in result:
+            line = f"{name:24} РЕГРЕССИЯ: ошибка ({result['error']})"
+            regressions.append(line)
+            print(line)
+            continue
+        if base is None or 'error' in base:
+            print(f"{name:24} {'новый' if base is None else 'исправлен'}")
+            continue
+
+        flags = []
+        if result['us_per_op'] > base['us_per_op'] * (1 + threshold):
+            flags.append('время')
+        if result['bytes_per_op'] > base['bytes_per_op'] + 0.5:
+            flags.append('байты')
+        if result['alloc_bytes_per_op'] > base['alloc_bytes_per_op'] * (1 + threshold) + 1024:
+            flags.append('память')
+
+        change = (result['us_per_op'] / base['us_per_op'] - 1) * 100 if base['us_per_op'] else 0.0
+        line = (f"{name:24} {base['us_per_op']:10.1f} -> {result['us_per_op']:10.1f} µs "
+                f"({change:+6.1f}%) {base['bytes_per_op']:9.0f} -> {result['bytes_per_op']:9.0f} B")
+        if flags:
+            line += f"  РЕГРЕССИЯ: {', '.join(flags)}"
+            regressions.append(line)
+        print(line)
+
+    pattern = current['meta'].get('filter')
+    for name in base_results:
+        if name not in current['results'] and not (pattern and pattern not in name):
+            line = f"{name:24} РЕГРЕССИЯ: отсутствует"
+            regressions.append(line)
+            print(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарки отрисовки и передачи LCD")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="выполнить бенчмарки")
+    run_parser.add_argument('-o', '--output', default=BENCHMARK_CONFIG['output'])
+    run_parser.add_argument('-k', '--filter', default=None, help="подстрока имени")
+    run_parser.add_argument('--quick', action='store_true', help="короткий прогон")
+
+    compare_parser = commands.add_parser('compare', help="сравнить с базовыми результатами")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current', nargs='?')
+    compare_parser.add_argument('-k', '--filter', default=None, help="подстрока имени")
+    compare_parser.add_argument('--threshold', type=float, default=BENCHMARK_CONFIG['threshold'])
+    compare_parser.add_argument('--quick', action='store_true', help="короткий прогон")
+
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        document = run(args.filter, args.quick)
+        with open(args.output, 'w') as f:
+            json.dump(document, f, indent=2)
+        print(f"Результаты записаны: {args.output}")
+        return
+
+    with open(args.baseline, 'r') as f:
+        baseline = json.load(f)
+    if args.current:
+        with open(args.current, 'r') as f:
+            current = json.load(f)
+    else:
+        current = run(args.filter, args.quick)
+        print()
+
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print(f"\nРегрессий: {len(regressions)}")
+        sys.exit(1)
+    print("\nРегрессий нет")
+
+
+if __name__ == "__main__":
+    main()
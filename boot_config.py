@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Редактор /boot/config.txt
+Файл читается один раз; изменения вносятся по ключам с учетом секций
+условных фильтров ([pi4], [cm4], [all], ...) и записываются одной атомарной
+заменой файла - только если содержимое действительно изменилось
+"""
+
+import os
+from config import *
+
+# Секция строк до первого заголовка и строк под [all]
+DEFAULT_SECTION = 'all'
+
+
+def line_key(line):
+    """
+    Ключ строки параметра: все до последнего '='
+
+    'display_rotate=1' -> 'display_rotate', 'dtparam=spi=on' -> 'dtparam=spi',
+    'gpio=5,6=pu' -> 'gpio=5,6'. Комментарии, пустые строки и заголовки
+    секций ключа не имеют (None).
+    """
+    text = line.strip()
+    if not text or text.startswith('#') or text.startswith('[') or '=' not in text:
+        return None
+    return text.rsplit('=', 1)[0].strip()
+
+
+def write_atomic(path, data):
+    """
+    Атомарная запись файла
+
+    Данные пишутся во временный файл в том же каталоге, синхронизируются на
+    носитель и переименованием заменяют файл: при пропадании питания
+    остается либо старый, либо новый файл целиком.
+
+    Args:
+        path (str): Путь к файлу
+        data (bytes): Содержимое
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    temp_path = os.path.join(directory, f".{os.path.basename(path)}.tmp")
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.chmod(temp_path, os.stat(path).st_mode & 0o7777)
+        except OSError:
+            # Нового файла еще нет, или FAT раздел /boot не хранит права
+            pass
+        os.replace(temp_path, path)
+    except Exception:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+    # Переименование надежно только после синхронизации каталога
+    try:
+        handle = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(handle)
+        finally:
+            os.close(handle)
+    except OSError:
+        pass
+
+
+class BootConfig:
+    """
+    Разобранный config.txt
+
+    Строки хранятся как есть (комментарии и порядок сохраняются); для каждой
+    известна секция, в которой она находится.
+    """
+
+    def __init__(self, path=ROTATION_CONFIG['config_file']):
+        """
+        Args:
+            path (str): Путь к config.txt; отсутствующий файл - пустой конфиг
+        """
+        self.path = path
+        try:
+            with open(path, 'r') as f:
+                self.lines = f.read().splitlines()
+            self.exists = True
+        except FileNotFoundError:
+            self.lines = []
+            self.exists = False
+        self._saved = list(self.lines)
+
+    def _sections(self):
+        """Секция каждой строки (заголовок относится к своей секции)"""
+        section = DEFAULT_SECTION
+        sections = []
+        for line in self.lines:
+            text = line.strip()
+            if text.startswith('[') and text.endswith(']'):
+                section = text[1:-1].strip().lower()
+            sections.append(section)
+        return sections
+
+    def _find(self, key, section):
+        """Индексы строк с ключом в секции"""
+        sections = self._sections()
+        return [i for i, line in enumerate(self.lines)
+                if sections[i] == section and line_key(line) == key]
+
+    def get(self, key, section=DEFAULT_SECTION, default=None):
+        """
+        Значение параметра (действует последнее вхождение)
+
+        Args:
+            key (str): Ключ ('display_rotate', 'dtparam=spi', ...)
+            section (str): Секция без скобок
+            default: Значение, если параметра нет
+        """
+        indices = self._find(key, section.lower())
+        if not indices:
+            return default
+        return self.lines[indices[-1]].strip().rsplit('=', 1)[1].strip()
+
+    def set(self, key, value, section=DEFAULT_SECTION, comment=None):
+        """
+        Установка параметра
+
+        Первое вхождение ключа в секции заменяется, повторные удаляются;
+        новый параметр добавляется в конец последнего блока секции (или в
+        новый блок [секция] в конце файла) с комментарием над ним.
+
+        Args:
+            key (str): Ключ
+            value: Значение
+            section (str): Секция без скобок
+            comment (str): Комментарий над добавленной строкой
+
+        Returns:
+            bool: Изменилось ли содержимое
+        """
+        section = section.lower()
+        before = list(self.lines)
+        line = f"{key}={value}"
+        indices = self._find(key, section)
+        if indices:
+            self.lines[indices[0]] = line
+            self._remove(indices[1:], comment)
+        else:
+            self._insert(section, [f"# {comment}", line] if comment else [line])
+        return self.lines != before
+
+    def unset(self, key, section=DEFAULT_SECTION, comment=None):
+        """
+        Удаление параметра из секции
+
+        Args:
+            comment (str): Комментарий над строкой, удаляемый вместе с ней
+
+        Returns:
+            bool: Изменилось ли содержимое
+        """
+        indices = self._find(key, section.lower())
+        self._remove(indices, comment)
+        return bool(indices)
+
+    def _remove(self, indices, comment):
+        """Удаление строк (и комментария comment прямо над каждой)"""
+        marker = f"# {comment}" if comment else None
+        remove = set(indices)
+        for i in indices:
+            if marker and i > 0 and self.lines[i - 1].strip() == marker:
+                remove.add(i - 1)
+        self.lines = [line for i, line in enumerate(self.lines) if i not in remove]
+
+    def _insert(self, section, new_lines):
+        """Добавление строк в конец последнего блока секции"""
+        sections = self._sections()
+        position = None
+        for i, name in enumerate(sections):
+            if name == section:
+                position = i + 1
+        if position is None:
+            # Секции еще нет: новый блок в конце файла
+            header = [] if not self.lines or self.lines[-1].strip() == '' else ['']
+            self.lines.extend(header + [f"[{section}]"] + new_lines)
+            return
+        # Пустые строки в конце блока остаются разделителем после вставки
+        while position > 0 and self.lines[position - 1].strip() == '' and sections[position - 1] == section:
+            position -= 1
+        if position > 0 and self.lines[position - 1].strip() and new_lines[0].startswith('#'):
+            new_lines = [''] + new_lines
+        self.lines[position:position] = new_lines
+
+    @property
+    def changed(self):
+        """Есть ли незаписанные изменения"""
+        return self.lines != self._saved
+
+    def commit(self):
+        """
+        Запись изменений
+
+        Новое содержимое атомарно заменяет файл (write_atomic).
+
+        Returns:
+            bool: Был ли файл записан (False - изменений нет)
+        """
+        if not self.changed:
+            return False
+
+        write_atomic(self.path, ('\n'.join(self.lines) + '\n').encode())
+        self._saved = list(self.lines)
+        self.exists = True
+        return True
@@ -2,11 +2,22 @@
 """
 Заставка включения для CM4 с LCD дисплеем
 Анимация с надписью SHIWA NETWORK Grand Mini
+
+Заставка рисуется в отдельном потоке, пока основной поток выполняет
+настоящие этапы запуска; индикатор показывает завершенные этапы.
 """
 
+import os
 import time
 import math
+import threading
+from contextlib import contextmanager
+import PIL
+import lcd_game
 from lcd_game import LCDGame
+from perf_stats import startup
+from screen_cache import rgb565_to_image
+from splash_cache import SplashCache, SplashRecorder, cache_key
 from config import *
 
 class BootSplash:
@@ -25,6 +36,20 @@ class BootSplash:
         self.width = DISPLAY_WIDTH
         self.height = DISPLAY_HEIGHT
         
+        # Индикатор загрузки: полоса и подпись над ней
+        self.bar_width = 200
+        self.bar_height = 8
+        self.bar_x = (self.width - self.bar_width) // 2
+        self.bar_y = self.height - 40
+        self.strip = (0, self.bar_y - 22, self.width, self.bar_height + 30)
+        
+        # Состояние этапов запуска (пишет основной поток, читает поток заставки)
+        self.total_stages = 0
+        self.completed_stages = 0
+        self.current_stage = ""
+        self._ready = threading.Event()
+        self._thread = None
+        
     def show_logo_animation(self):
         """Анимация логотипа с появлением"""
         # Очистка экрана
@@ -200,39 +225,226 @@ class BootSplash:
             self.lcd.update()
             time.sleep(0.3)
     
-    def run(self):
-        """Запуск полной анимации заставки"""
-        try:
-            print("Запуск заставки включения...")
-            
-            # 1. Анимация логотипа
-            self.show_logo_animation()
-            time.sleep(0.5)
-            
-            # 2. Анимация текста
-            self.show_text_animation()
-            time.sleep(0.5)
-            
-            # 3. Пульсирующая анимация
-            self.show_pulse_animation()
-            
-            # 4. Анимация загрузки
-            self.show_loading_animation()
+    def _paint_logo(self, main_text="SHIWA NETWORK", sub_text="Grand Mini"):
+        """Логотип и надписи в буфер дисплея (без отправки)"""
+        self.lcd.draw_rect(0, 0, self.width, self.height, color=(0, 0, 0), fill=True)
+        self.lcd.draw_circle(self.width // 2, self.height // 2 - 20, 120, color=(0, 150, 255), fill=True)
+        if main_text:
+            self.lcd.draw_text(main_text, self.width // 2 - 60, self.height // 2 - 10,
+                               color=(255, 255, 255), font_size=16)
+        if sub_text:
+            self.lcd.draw_text(sub_text, self.width // 2 - 40, self.height // 2 + 20,
+                               color=(200, 200, 200), font_size=14)
+    
+    def draw_background(self):
+        """Статичная часть заставки: логотип и надписи (отправляется один раз)"""
+        self._paint_logo()
+        self.lcd.update()
+    
+    def intro_frames(self):
+        """
+        Кадры вступительной анимации
+        
+        Каждый шаг рисует кадр в буфер дисплея и возвращает паузу после него.
+        Последний кадр совпадает с фоном заставки (draw_background).
+        """
+        center = (self.width // 2, self.height // 2 - 20)
+        main_text = "SHIWA NETWORK"
+        sub_text = "Grand Mini"
+        
+        # Появление контура логотипа
+        self.lcd.draw_rect(0, 0, self.width, self.height, color=(0, 0, 0), fill=True)
+        for radius in range(0, 121, 4):
+            self.lcd.draw_circle(center[0], center[1], radius, color=(0, 150, 255), fill=False)
+            yield 0.02
+        
+        # Заполнение логотипа
+        for radius in range(0, 121, 8):
+            self.lcd.draw_circle(center[0], center[1], radius, color=(0, 150, 255), fill=True)
+            yield 0.015
+        
+        # Появление надписей по буквам
+        for i in range(1, len(main_text) + 1):
+            self._paint_logo(main_text[:i], "")
+            yield 0.06
+        for i in range(1, len(sub_text) + 1):
+            self._paint_logo(main_text, sub_text[:i])
+            yield 0.05
+        
+        self._paint_logo()
+        yield 0.0
+    
+    def _cache_key(self):
+        """
+        Ключ кэша кадров: код заставки и примитивов рисования (lcd_game.py),
+        шрифт, версия PIL (растеризация) и влияющие на кадры настройки
+        """
+        return cache_key(
+            [os.path.abspath(__file__), os.path.abspath(lcd_game.__file__), FONT_PATH],
+            (DISPLAY_WIDTH, DISPLAY_HEIGHT, FONT_PATH, PIL.__version__)
+        )
+    
+    def play_intro(self):
+        """
+        Вступительная анимация
+        
+        Если есть кэш для текущего кода и настроек, кадры передаются из
+        файла через mmap без отрисовки. Иначе анимация рисуется и
+        записывается в кэш. Готовность системы прерывает анимацию:
+        сразу показывается ее последний кадр. Если логотип уже выведен
+        ранней заставкой (early_splash.py), вступление пропускается.
+        """
+        if getattr(self.lcd, 'panel_preinitialized', False):
+            # Ранняя заставка уже показала логотип - вступление только мелькнуло бы
+            self._paint_logo()
+            return
+        
+        key = self._cache_key() if SPLASH_CONFIG['cache_enabled'] else None
+        if key is not None:
+            cache = SplashCache(SPLASH_CONFIG['cache_path'], key, self.width, self.height)
+            if cache.valid:
+                try:
+                    cache.play(self.lcd, self._ready)
+                    # Буфер дисплея должен совпадать с экраном для дальнейшей дорисовки
+                    self.lcd.set_buffer(rgb565_to_image(cache.final_frame(), self.width, self.height))
+                finally:
+                    cache.close()
+                return
+        
+        recorder = SplashRecorder(self.width, self.height, key) if key is not None else None
+        deadline = time.perf_counter()
+        for delay in self.intro_frames():
+            if recorder is None and self._ready.is_set():
+                break
+            payload = self.lcd._convert_rgb565(self.lcd.buffer)
+            if recorder is not None:
+                recorder.add(payload, delay)
+            if self._ready.is_set():
+                # Система готова - кадры только записываются, без вывода и пауз
+                continue
+            self.lcd.write_frame(payload)
+            deadline += delay
+            self._ready.wait(max(0.0, deadline - time.perf_counter()))
+        
+        if recorder is not None:
+            recorder.save(SPLASH_CONFIG['cache_path'])
+        if self._ready.is_set():
+            self._paint_logo()
+            self.lcd.update()
+    
+    def draw_progress(self, progress, text, phase=0.0):
+        """
+        Отрисовка индикатора загрузки (только полоса заставки)
+        
+        Args:
+            progress (float): Доля выполнения 0..1
+            text (str): Подпись над полосой
+            phase (float): Фаза пульсации заполнения
+        """
+        x, y, width, height = self.strip
+        self.lcd.draw_rect(x, y, width, height, color=(50, 50, 50), fill=True)
+        self.lcd.draw_text(text, self.bar_x, self.bar_y - 20, color=(255, 255, 255), font_size=12)
+        self.lcd.draw_rect(self.bar_x, self.bar_y, self.bar_width, self.bar_height,
+                           color=(100, 100, 100), fill=False)
+        
+        fill_width = int(max(0.0, min(1.0, progress)) * self.bar_width)
+        if fill_width > 0:
+            glow = int(200 + 55 * math.sin(phase))
+            self.lcd.draw_rect(self.bar_x, self.bar_y, fill_width, self.bar_height,
+                               color=(0, glow, 0), fill=True)
+        self.lcd.update_region(*self.strip)
+    
+    def _animate(self):
+        """Цикл потока заставки: вступление, затем индикатор до готовности системы"""
+        self.play_intro()
+        
+        frame_interval = 1.0 / SPLASH_CONFIG['fps']
+        shown = 0.0
+        phase = 0.0
+        
+        while not self._ready.is_set():
+            frame_start = time.perf_counter()
             
-            # 5. Финальная анимация
-            self.show_complete_animation()
+            # Плавное движение к реальной доле завершенных этапов
+            target = self.completed_stages / self.total_stages if self.total_stages else 0.0
+            shown += (target - shown) * 0.3
+            phase += 0.4
             
-            # Пауза перед переходом к рабочему столу
-            time.sleep(1.0)
+            label = f"Loading: {self.current_stage}" if self.current_stage else "Loading..."
+            self.draw_progress(shown, label, phase)
             
-            print("Заставка завершена")
+            self._ready.wait(max(0.0, frame_interval - (time.perf_counter() - frame_start)))
+        
+        self.draw_progress(1.0, "READY")
+    
+    def start(self, total_stages):
+        """
+        Показ заставки и запуск потока анимации
+        
+        Args:
+            total_stages (int): Количество этапов запуска
+        """
+        self.total_stages = total_stages
+        self.completed_stages = 0
+        self.current_stage = ""
+        self._ready.clear()
+        
+        self._thread = threading.Thread(target=self._animate, name='boot-splash', daemon=True)
+        self._thread.start()
+    
+    @contextmanager
+    def stage(self, name):
+        """
+        Этап запуска: подпись индикатора на время выполнения, затем +1 к прогрессу
+        
+        Args:
+            name (str): Название этапа
+        """
+        self.current_stage = name
+        try:
+            yield
+        finally:
+            self.completed_stages += 1
+            startup.mark(f"stage {name}")
+    
+    def finish(self):
+        """Остановка анимации: система готова"""
+        self._ready.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+            time.sleep(SPLASH_CONFIG['ready_hold'])
+    
+    def run(self, stages=()):
+        """
+        Показ заставки на время выполнения этапов запуска
+        
+        Дисплеем во время заставки владеет поток анимации: этапы не должны
+        рисовать на экране. Заставка завершается сразу после последнего этапа.
+        
+        Args:
+            stages: Список пар (название, функция без аргументов)
             
+        Returns:
+            bool: True если все этапы выполнены без ошибок
+        """
+        print("Запуск заставки включения...")
+        self.start(len(stages))
+        try:
+            for name, func in stages:
+                with self.stage(name):
+                    func()
+            return True
         except Exception as e:
-            print(f"Ошибка в заставке: {e}")
+            print(f"Ошибка этапа запуска \"{self.current_stage}\": {e}")
+            return False
+        finally:
+            self.finish()
+            print("Заставка завершена")
 
 if __name__ == "__main__":
     # Тест заставки
     lcd = LCDGame()
     splash = BootSplash(lcd)
-    splash.run()
+    splash.run([("Fonts", lcd.preload_fonts), ("Wait", lambda: time.sleep(2))])
     lcd.cleanup()
\ No newline at end of file
@@ -5,6 +5,24 @@ SPI_BUS = 0
 SPI_DEVICE = 0
 SPI_SPEED = 40000000  # 40 MHz
 
+# Бэкенд вывода LCDGame: 'spi' - ST7789 через spidev и RPi.GPIO,
+# 'fbdev' - кадровый буфер драйвера ядра fbtft/tinydrm (передача DMA),
+# 'simulated' - модель контроллера и шины без оборудования
+# (переменная окружения LCD_GAME_BACKEND имеет приоритет)
+DISPLAY_BACKEND = 'spi'
+
+# Настройки бэкенда кадрового буфера (fb_backend.py)
+FBDEV_BACKEND_CONFIG = {
+    'device': '/dev/fb1'  # Кадровый буфер панели (fb0 обычно занят HDMI)
+}
+
+# Настройки симулированного бэкенда (sim_backend.py)
+SIMULATED_BACKEND_CONFIG = {
+    'realtime': False,  # Выдерживать расчетное время передачи и пауз контроллера
+    'transaction_overhead': 0.00002,  # Накладные расходы ioctl на блок (секунды)
+    'chunk_size': 4096  # Размер блока передачи spidev (bufsiz)
+}
+
 # Настройки дисплея
 DISPLAY_WIDTH = 240
 DISPLAY_HEIGHT = 240
@@ -37,6 +55,7 @@ BUTTON_PINS = {
 # Настройки кнопок
 BUTTON_PULL_UP = True  # Использовать подтягивающие резисторы
 BUTTON_DEBOUNCE_TIME = 0.1  # Время подавления дребезга в секундах
+BUTTON_POLL_INTERVAL = 0.02  # Период опроса, если детектирование фронтов недоступно
 
 # Настройки цветов (RGB)
 COLORS = {
@@ -56,23 +75,144 @@ COLORS = {
 # Настройки шрифтов
 FONT_PATH = "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
 DEFAULT_FONT_SIZE = 12
+FONT_PRELOAD_SIZES = [10, 12, 14, 16]  # Размеры, загружаемые во время заставки
+
+# Настройки заставки включения
+SPLASH_CONFIG = {
+    'fps': 20,  # Частота анимации индикатора загрузки
+    'ready_hold': 0.3,  # Показ надписи READY перед рабочим столом (секунды)
+    'cache_enabled': True,  # Проигрывать вступительную анимацию из кэша кадров
+    'cache_path': '/var/cache/lcd_game/splash_frames.bin'
+}
+
+# Настройки ранней заставки (early_splash.py)
+EARLY_SPLASH_CONFIG = {
+    'logo_file': 'splash_logo.rgb565',  # Готовый кадр RGB565 рядом с кодом
+    'state_file': '/run/lcd_game/panel_initialized',  # Отметка "панель уже инициализирована"
+    'device_timeout': 3.0  # Ожидание /dev/spidev и /dev/gpiomem от udev (секунды)
+}
+
+# Настройки сервера дисплея (display_server.py)
+DISPLAY_SERVER_CONFIG = {
+    'socket_path': '/run/lcd_game/display.sock',  # Сокет для подключения приложений
+    'shm_dir': '/dev/shm'  # Каталог общих кадровых буферов (tmpfs)
+}
+
+# Трассировка шины дисплея (spi_trace.py)
+SPI_TRACE_CONFIG = {
+    'enabled': False,  # Запись команд и передач в кольцевой файл
+    'path': '/var/log/lcd_game/spi_trace.bin',
+    'max_bytes': 4 * 1024 * 1024  # Размер кольца; старые записи перезаписываются
+}
+
+# Настройки бенчмарков (benchmark.py)
+BENCHMARK_CONFIG = {
+    'min_time': 0.5,  # Минимальное время измерения одного бенчмарка (секунды)
+    'min_ops': 20,  # Минимальное число операций
+    'alloc_ops': 5,  # Операций в проходе с tracemalloc
+    'threshold': 0.10,  # Допустимый рост времени и памяти при сравнении
+    'output': 'benchmark_results.json'  # Файл результатов по умолчанию
+}
+
+# Самопроверка системы (self_test.py)
+SELF_TEST_CONFIG = {
+    'timeout': 0.5  # Таймаут каждой проверки (секунды); проверки идут параллельно
+}
+
+# Эталонные кадры и бюджеты отрисовки (test_golden.py)
+GOLDEN_CONFIG = {
+    'path': 'golden_frames.json',  # Хэши эталонных кадров (относительно каталога проекта)
+    'failures_dir': '/tmp/golden_failures',  # PNG отличающихся кадров
+    'seed': 1,  # Seed случайных чисел для игр
+    'repeats': 3,  # Повторы перехода на экран; берется лучшее время
+    'splash_key_frames': (1, 10, 20),  # Номера сохраняемых кадров вступления
+    # Бюджеты на кадр, мс: вся операция и конвертация RGB565 внутри нее
+    'budgets': {
+        'desktop': {'render_ms': 100, 'convert_ms': 20},
+        'splash': {'render_ms': 50, 'convert_ms': 20},
+        'game': {'render_ms': 50, 'convert_ms': 20}
+    }
+}
 
 # Настройки игрового движка
 DEFAULT_FPS = 30
 MAX_FPS = 60
 
+# Настройки системы частиц
+PARTICLE_CONFIG = {
+    'capacity': 4096  # Максимальное количество частиц
+}
+
+# Настройки запуска игр с рабочего стола
+LAUNCHER_CONFIG = {
+    'enabled': True,        # Процесс-заготовка для быстрого запуска
+    'exit_button': 'MENU',  # Кнопка возврата на рабочий стол
+    'games': {              # Название -> "модуль:Класс" (None - нет реализации)
+        'Snake Game': 'examples.snake_game:SnakeGame',
+        'Pong': None,
+        'Tetris': None,
+        'Breakout': None
+    }
+}
+
 # Настройки отладки
 DEBUG = False
 LOG_LEVEL = "INFO"
 
+# Настройки профилирования кадров
+PERF_STATS_WINDOW = 120  # Количество кадров для скользящих перцентилей
+PERF_HUD_ENABLED = False  # Оверлей FPS и времени передачи
+PERF_HUD_CONFIG = {
+    'corner': 'top_right',
+    'width': 90,
+    'height': 14,
+    'font_size': 10,
+    'refresh_interval': 0.5  # секунды
+}
+
 # Настройки производительности
 BUFFER_SIZE = 1024
 DMA_CHANNEL = 0
 
+# Настройки asyncio-среды выполнения
+ASYNC_CONFIG = {
+    'enabled': False,             # Запускать рабочий стол в asyncio-режиме
+    'input_poll_interval': 0.01,  # Период опроса кнопок (секунды)
+    'background_workers': 2       # Потоки для блокирующих операций
+}
+
 # Настройки энергосбережения
 BACKLIGHT_TIMEOUT = 300  # секунды
 SLEEP_TIMEOUT = 600      # секунды
 
+# Настройки регулятора частоты обновления
+POWER_CONFIG = {
+    'enabled': True,
+    'idle_timeout': 30,            # секунды без ввода и изменений до снижения частоты
+    'idle_update_interval': 10.0,  # период обновления экрана в режиме простоя (секунды)
+    'tick_interval': 1.0           # период проверки таймаутов (секунды)
+}
+
+# Настройки сбора системных метрик (периоды опроса в секундах)
+METRICS_CONFIG = {
+    'intervals': {
+        'cpu_percent': 1.0,
+        'memory_percent': 2.0,
+        'disk_percent': 30.0,
+        'load_average': 5.0,
+        'process_count': 5.0,
+        'temperature': 2.0,
+        'uptime': 1.0
+    },
+    'thermal_zone': '/sys/class/thermal/thermal_zone0/temp'
+}
+
+# Настройки системных датчиков
+PROBES_CONFIG = {
+    'interface': None,   # Сетевой интерфейс (None - первый активный)
+    'address_ttl': 30.0  # Время кэширования IP-адреса и SSID (секунды)
+}
+
 # Настройки калибровки сенсора (если поддерживается)
 TOUCH_CALIBRATION = {
     'x_min': 0,
@@ -136,6 +276,12 @@ SYSTEM_CONFIG = {
     'backup_path': '/opt/lcd_game_backup'
 }
 
+# Резервные копии системных файлов (backup_store.py)
+BACKUP_CONFIG = {
+    'keep_versions': 10,  # Версий каждого файла после очистки
+    'max_age_days': 365  # Более старые версии удаляются (последняя остается всегда)
+}
+
 # Настройки поворота экрана (новые)
 ROTATION_CONFIG = {
     'supported_angles': [0, 90, 180, 270],
@@ -172,6 +318,13 @@ MOUSE_CONFIG = {
 FBCP_CONFIG = {
     'enabled': False,
     'binary_path': '/usr/local/bin/fbcp',
+    'device': '/dev/fb0',  # Источник для fb_mirror.py (встроенная замена fbcp)
+    'geometry': (640, 480, 16),  # Ширина, высота, бит на пиксель, если источник - обычный файл
+    'mode': 'fit',  # 'fit' - масштаб с сохранением пропорций, 'crop' - вырезка
+    'crop_origin': (0, 0),  # Левый верхний угол вырезки
+    'tile_size': 16,  # Размер плитки при поиске изменений
+    'min_interval': 1.0 / 30,  # Интервал опроса при изменениях (секунды)
+    'max_interval': 0.25,  # Предельный интервал опроса без изменений
     'build_options': {
         'SPI_BUS_CLOCK_DIVISOR': 10,
         'WAVESHARE_ST7789VW_HAT': 'ON',
@@ -6,9 +6,18 @@
 
 import time
 import datetime
-import psutil
+import asyncio
 import os
 from lcd_game import LCDGame
+from async_runtime import AsyncRuntime
+from power_governor import PowerGovernor
+from metrics import MetricsCollector
+from probes import SystemProbes
+from game_launcher import GameLauncher
+from widgets import Screen, Label, ListWidget, StatusBar
+from screen_cache import ScreenCache, rgb565_to_image
+from scheduler import EventLoop
+from perf_stats import startup
 from config import *
 
 class Desktop:
@@ -37,193 +46,296 @@ class Desktop:
         ]
         self.last_update = 0
         self.update_interval = 1.0  # Обновление каждую секунду
-    
-    def draw_status_bar(self):
-        """Отрисовка верхней панели статуса"""
-        # Фон панели
-        self.lcd.draw_rect(0, 0, self.width, 25, color=(40, 40, 40), fill=True)
+        self.runtime = None  # AsyncRuntime в asyncio-режиме
+        self.event_loop = None  # EventLoop в обычном режиме
+        self.governor = PowerGovernor(lcd, active_interval=self.update_interval)
+        self.metrics = MetricsCollector()
+        self.probes = SystemProbes()
+        self.launcher = GameLauncher(lcd)
+        self.selected_game = 0
+        self.game_running = False
         
-        # Время
+        # Содержимое статических экранов
+        self.games = [
+            {"name": "Snake Game", "icon": "🐍"},
+            {"name": "Pong", "icon": "🏓"},
+            {"name": "Tetris", "icon": "🧩"},
+            {"name": "Breakout", "icon": "🏀"}
+        ]
+        self.settings = [
+            {"name": "Display Brightness", "value": "80%"},
+            {"name": "Sound Volume", "value": "70%"},
+            {"name": "Auto Sleep", "value": "5min"},
+            {"name": "Network Config", "value": "WiFi"},
+            {"name": "System Update", "value": "Available"}
+        ]
+        self.network_info = self.network_lines()
+        
+        # Экраны из виджетов; _shown_screen - экран, показанный на дисплее
+        self._shown_screen = None
+        self.build_screens()
+        
+        # Кэш готовых кадров статических экранов
+        self.static_screens = ("games", "settings", "network", "shutdown")
+        self.content_versions = {screen_id: 0 for screen_id in self.static_screens}
+        self.screen_cache = ScreenCache()
+    
+    def status_value(self):
+        """Значение панели статуса: время и уровень батареи"""
         current_time = datetime.datetime.now().strftime("%H:%M")
-        self.lcd.draw_text(current_time, 10, 5, color=(255, 255, 255), font_size=12)
+        battery_level = self.probes.battery_level()  # None - батареи нет, индикатор скрыт
+        return (current_time, battery_level)
+    
+    def _add_title(self, screen, text):
+        """Заголовок экрана"""
+        screen.add(Label(10, 35, self.width - 10, 18, text, color=(0, 150, 255), font_size=14))
+    
+    def _add_lines(self, screen, lines, y, step, font_size=10, color=(255, 255, 255)):
+        """Столбец текстовых меток; возвращает список созданных меток"""
+        return [screen.add(Label(10, y + i * step, self.width - 10, step, line, color=color, font_size=font_size))
+                for i, line in enumerate(lines)]
+    
+    def build_screens(self):
+        """Создание экранов рабочего стола из виджетов"""
+        self.screens = {}
+        self.status_bars = {}
         
-        # Индикатор сети
-        self.lcd.draw_text("📶", self.width - 30, 5, color=(0, 255, 0), font_size=12)
+        for screen_id in ("main", "system_info", "games", "settings", "network"):
+            screen = self.screens[screen_id] = Screen(self.lcd)
+            self.status_bars[screen_id] = screen.add(StatusBar(self.width))
         
-        # Индикатор батареи (симуляция)
-        battery_level = 85  # В реальной системе получать из системы
-        battery_color = (0, 255, 0) if battery_level > 50 else (255, 255, 0) if battery_level > 20 else (255, 0, 0)
-        self.lcd.draw_text(f"🔋{battery_level}%", self.width - 80, 5, color=battery_color, font_size=10)
+        # Главный экран
+        main = self.screens["main"]
+        main.add(Label(10, 35, self.width - 10, 15, "SHIWA NETWORK", color=(0, 150, 255), font_size=14))
+        main.add(Label(10, 50, self.width - 10, 15, "Grand Mini", color=(100, 100, 100), font_size=12))
+        self.info_labels = self._add_lines(main, ["", "", "", ""], 80, 15)
+        self.menu_list = main.add(ListWidget(
+            0, 148, self.width, 20,
+            [(item["icon"], item["name"]) for item in self.menu_items],
+            selected=self.selected_item, font_size=12, height=self.height - 148
+        ))
+        
+        # Системная информация
+        system_info = self.screens["system_info"]
+        self._add_title(system_info, "System Information")
+        self.system_info_labels = self._add_lines(system_info, [""] * 6, 60, 20)
+        
+        # Игры
+        games = self.screens["games"]
+        self._add_title(games, "Games")
+        self.games_list = games.add(ListWidget(
+            0, 58, self.width, 30,
+            [(game["icon"], game["name"]) for game in self.games],
+            selected=self.selected_game, font_size=12, text_color=(255, 255, 255)
+        ))
+        
+        # Настройки
+        settings = self.screens["settings"]
+        self._add_title(settings, "Settings")
+        self.setting_labels = []
+        for i, setting in enumerate(self.settings):
+            y_pos = 60 + i * 25
+            settings.add(Label(10, y_pos, self.width - 70, 25, setting["name"], font_size=10))
+            self.setting_labels.append(settings.add(
+                Label(self.width - 60, y_pos, 60, 25, setting["value"], color=(100, 100, 100), font_size=10)
+            ))
+        
+        # Сеть
+        network = self.screens["network"]
+        self._add_title(network, "Network Status")
+        self.network_labels = self._add_lines(network, self.network_info, 60, 20)
+        
+        # Выключение (без панели статуса, текст по центру)
+        shutdown = self.screens["shutdown"] = Screen(self.lcd)
+        shutdown.add(Label(self.width // 2 - 70, self.height // 2 - 30, 150, 20, "Shutdown System?", font_size=14))
+        shutdown.add(Label(self.width // 2 - 60, self.height // 2, 130, 20, "Press A to confirm", color=(200, 200, 200), font_size=12))
+        shutdown.add(Label(self.width // 2 - 60, self.height // 2 + 20, 130, 20, "Press B to cancel", color=(200, 200, 200), font_size=12))
+    
+    def draw_status_bar(self):
+        """Обновление панели статуса текущего экрана"""
+        status_bar = self.status_bars.get(self.current_screen)
+        if status_bar is not None:
+            status_bar.set(self.status_value())
     
     def draw_main_screen(self):
-        """Отрисовка главного экрана"""
-        # Очистка экрана
-        self.lcd.clear()
-        
-        # Статус бар
+        """Обновление виджетов главного экрана"""
         self.draw_status_bar()
         
-        # Заголовок
-        self.lcd.draw_text("SHIWA NETWORK", 10, 35, color=(0, 150, 255), font_size=14)
-        self.lcd.draw_text("Grand Mini", 10, 50, color=(100, 100, 100), font_size=12)
-        
         # Основная информация
         self.draw_system_info()
         
         # Меню
         self.draw_menu()
     
+    @staticmethod
+    def format_metric(label, value, template="{}"):
+        """Строка метрики; неизвестное значение отображается как --"""
+        return f"{label}: {template.format(value) if value is not None else '--'}"
+    
+    def start_metrics(self):
+        """Запуск фонового сбора метрик"""
+        if not self.metrics.is_alive():
+            self.metrics.start()
+    
     def draw_system_info(self):
-        """Отрисовка системной информации"""
-        try:
-            # CPU
-            cpu_percent = psutil.cpu_percent(interval=0.1)
-            self.lcd.draw_text(f"CPU: {cpu_percent}%", 10, 80, color=(255, 255, 255), font_size=10)
-            
-            # Память
-            memory = psutil.virtual_memory()
-            memory_percent = memory.percent
-            self.lcd.draw_text(f"RAM: {memory_percent}%", 10, 95, color=(255, 255, 255), font_size=10)
-            
-            # Температура (симуляция)
-            temp = 45  # В реальной системе получать из /sys/class/thermal/
-            self.lcd.draw_text(f"TEMP: {temp}°C", 10, 110, color=(255, 255, 255), font_size=10)
-            
-            # Uptime
-            uptime = datetime.datetime.now() - datetime.datetime.fromtimestamp(psutil.boot_time())
-            uptime_str = str(uptime).split('.')[0]  # Убираем микросекунды
-            self.lcd.draw_text(f"UP: {uptime_str}", 10, 125, color=(255, 255, 255), font_size=10)
-            
-        except Exception as e:
-            self.lcd.draw_text("System info error", 10, 80, color=(255, 0, 0), font_size=10)
+        """Обновление системной информации"""
+        # Значения берутся из последнего снимка сборщика - без системных вызовов
+        metrics = self.metrics.snapshot
+        
+        uptime_str = "--"
+        if metrics.uptime is not None:
+            uptime_str = str(datetime.timedelta(seconds=int(metrics.uptime)))
+        
+        values = [
+            self.format_metric("CPU", metrics.cpu_percent, "{}%"),
+            self.format_metric("RAM", metrics.memory_percent, "{}%"),
+            self.format_metric("TEMP", metrics.temperature, "{:.0f}°C"),
+            f"UP: {uptime_str}",
+        ]
+        for label, value in zip(self.info_labels, values):
+            label.set(value)
     
     def draw_menu(self):
-        """Отрисовка меню"""
-        menu_y = 150
-        item_height = 20
-        
-        for i, item in enumerate(self.menu_items):
-            y_pos = menu_y + i * item_height
-            
-            # Выделение выбранного элемента
-            if i == self.selected_item:
-                self.lcd.draw_rect(5, y_pos - 2, self.width - 10, item_height, color=(0, 150, 255), fill=True)
-                text_color = (255, 255, 255)
-            else:
-                text_color = (200, 200, 200)
-            
-            # Иконка и текст
-            self.lcd.draw_text(item["icon"], 10, y_pos, color=text_color, font_size=12)
-            self.lcd.draw_text(item["name"], 35, y_pos, color=text_color, font_size=12)
+        """Обновление выделения в меню"""
+        self.menu_list.select(self.selected_item)
     
     def draw_system_info_screen(self):
-        """Экран системной информации"""
-        self.lcd.clear()
+        """Обновление экрана системной информации"""
         self.draw_status_bar()
         
-        self.lcd.draw_text("System Information", 10, 35, color=(0, 150, 255), font_size=14)
-        
-        try:
-            # Подробная информация о системе
-            info_items = [
-                f"CPU: {psutil.cpu_percent()}%",
-                f"RAM: {psutil.virtual_memory().percent}%",
-                f"Disk: {psutil.disk_usage('/').percent}%",
-                f"Load: {os.getloadavg()[0]:.2f}",
-                f"Processes: {len(psutil.pids())}",
-                f"Network: Active"
-            ]
-            
-            for i, item in enumerate(info_items):
-                y_pos = 60 + i * 20
-                self.lcd.draw_text(item, 10, y_pos, color=(255, 255, 255), font_size=10)
-        
-        except Exception as e:
-            self.lcd.draw_text("Error loading system info", 10, 60, color=(255, 0, 0), font_size=10)
+        # Подробная информация о системе из последнего снимка метрик
+        metrics = self.metrics.snapshot
+        info_items = [
+            self.format_metric("CPU", metrics.cpu_percent, "{}%"),
+            self.format_metric("RAM", metrics.memory_percent, "{}%"),
+            self.format_metric("Disk", metrics.disk_percent, "{}%"),
+            self.format_metric("Load", metrics.load_average, "{:.2f}"),
+            self.format_metric("Processes", metrics.process_count, "{}"),
+            f"Network: Active"
+        ]
+        for label, item in zip(self.system_info_labels, info_items):
+            label.set(item)
     
     def draw_games_screen(self):
-        """Экран игр"""
-        self.lcd.clear()
+        """Обновление экрана игр"""
         self.draw_status_bar()
-        
-        self.lcd.draw_text("Games", 10, 35, color=(0, 150, 255), font_size=14)
-        
-        games = [
-            {"name": "Snake Game", "icon": "🐍"},
-            {"name": "Pong", "icon": "🏓"},
-            {"name": "Tetris", "icon": "🧩"},
-            {"name": "Breakout", "icon": "🏀"}
-        ]
-        
-        for i, game in enumerate(games):
-            y_pos = 60 + i * 30
-            self.lcd.draw_text(game["icon"], 10, y_pos, color=(255, 255, 255), font_size=12)
-            self.lcd.draw_text(game["name"], 35, y_pos, color=(255, 255, 255), font_size=12)
+        self.games_list.select(self.selected_game)
     
     def draw_settings_screen(self):
-        """Экран настроек"""
-        self.lcd.clear()
+        """Обновление экрана настроек"""
         self.draw_status_bar()
+    
+    @staticmethod
+    def format_rate(rate):
+        """Скорость передачи в читаемом виде"""
+        if rate is None:
+            return "--"
+        if rate >= 1024 * 1024:
+            return f"{rate / (1024 * 1024):.1f} MB/s"
+        return f"{rate / 1024:.1f} KB/s"
+    
+    def network_lines(self):
+        """Строки экрана сети по данным датчиков"""
+        network = self.probes.network()
+        kind = "WiFi" if network['wireless'] else "Net"
+        state = "Connected" if network['address'] else "Disconnected"
         
-        self.lcd.draw_text("Settings", 10, 35, color=(0, 150, 255), font_size=14)
+        uptime = self.metrics.snapshot.uptime
+        uptime_str = "--"
+        if uptime is not None:
+            hours, rest = divmod(int(uptime), 3600)
+            uptime_str = f"{hours}h {rest // 60}m"
         
-        settings = [
-            {"name": "Display Brightness", "value": "80%"},
-            {"name": "Sound Volume", "value": "70%"},
-            {"name": "Auto Sleep", "value": "5min"},
-            {"name": "Network Config", "value": "WiFi"},
-            {"name": "System Update", "value": "Available"}
+        return [
+            f"{kind}: {state} ({network['interface'] or '--'})",
+            f"SSID: {network['ssid'] or '--'}",
+            f"IP: {network['address'] or '--'}",
+            self.format_metric("Signal", network['level'], "{:.0f} dBm"),
+            f"RX/TX: {self.format_rate(network['rx_rate'])} / {self.format_rate(network['tx_rate'])}",
+            f"Uptime: {uptime_str}"
         ]
-        
-        for i, setting in enumerate(settings):
-            y_pos = 60 + i * 25
-            self.lcd.draw_text(setting["name"], 10, y_pos, color=(255, 255, 255), font_size=10)
-            self.lcd.draw_text(setting["value"], self.width - 60, y_pos, color=(100, 100, 100), font_size=10)
     
     def draw_network_screen(self):
-        """Экран сетевых настроек"""
-        self.lcd.clear()
+        """Обновление экрана сетевых настроек"""
         self.draw_status_bar()
         
-        self.lcd.draw_text("Network Status", 10, 35, color=(0, 150, 255), font_size=14)
-        
-        # Сетевая информация
-        network_info = [
-            "WiFi: Connected",
-            "SSID: SHIWA_Network",
-            "IP: 192.168.1.100",
-            "Signal: -45 dBm",
-            "Speed: 54 Mbps",
-            "Uptime: 2h 15m"
-        ]
-        
-        for i, info in enumerate(network_info):
-            y_pos = 60 + i * 20
-            self.lcd.draw_text(info, 10, y_pos, color=(255, 255, 255), font_size=10)
+        # Живые значения меняют только свои метки; кэш кадра экрана не сбрасывается
+        self.network_info = self.network_lines()
+        for label, line in zip(self.network_labels, self.network_info):
+            label.set(line)
     
     def draw_shutdown_screen(self):
-        """Экран выключения"""
-        self.lcd.clear()
+        """Обновление экрана выключения"""
+        pass
+    
+    def invalidate(self):
+        """Полная перерисовка экрана при следующем обновлении"""
+        self._shown_screen = None
+    
+    def bump_content_version(self, screen_id):
+        """Отметка изменения содержимого статического экрана"""
+        self.content_versions[screen_id] += 1
+        self.screen_cache.invalidate(screen_id)
+    
+    def update_setting(self, name, value):
+        """
+        Изменение значения настройки
         
-        # Центрированный текст
-        self.lcd.draw_text("Shutdown System?", self.width // 2 - 70, self.height // 2 - 30, color=(255, 255, 255), font_size=14)
-        self.lcd.draw_text("Press A to confirm", self.width // 2 - 60, self.height // 2, color=(200, 200, 200), font_size=12)
-        self.lcd.draw_text("Press B to cancel", self.width // 2 - 60, self.height // 2 + 20, color=(200, 200, 200), font_size=12)
+        Args:
+            name (str): Название настройки
+            value (str): Новое значение
+        """
+        for setting, label in zip(self.settings, self.setting_labels):
+            if setting["name"] == name:
+                setting["value"] = value
+                label.set(value)
+                self.bump_content_version("settings")
+                return True
+        return False
+    
+    def set_network_info(self, lines):
+        """Замена строк экрана сети"""
+        if list(lines) == self.network_info:
+            return
+        self.network_info = list(lines)
+        for label, line in zip(self.network_labels, self.network_info):
+            label.set(line)
+        self.bump_content_version("network")
     
     def handle_input(self):
         """Обработка ввода пользователя"""
+        for button_name in ('UP', 'DOWN', 'A', 'B'):
+            if self.lcd.buttons.is_pressed(button_name):
+                return self.handle_button(button_name)
+        
+        return False
+    
+    def handle_button(self, button_name):
+        """
+        Обработка нажатия кнопки
+        
+        Args:
+            button_name (str): Имя нажатой кнопки
+            
+        Returns:
+            bool: True если требуется перерисовка экрана
+        """
         # Навигация по меню
-        if self.lcd.buttons.is_pressed('UP'):
+        if button_name == 'UP':
             if self.current_screen == "main":
                 self.selected_item = max(0, self.selected_item - 1)
+            elif self.current_screen == "games":
+                self.selected_game = max(0, self.selected_game - 1)
             return True
         
-        if self.lcd.buttons.is_pressed('DOWN'):
+        if button_name == 'DOWN':
             if self.current_screen == "main":
                 self.selected_item = min(len(self.menu_items) - 1, self.selected_item + 1)
+            elif self.current_screen == "games":
+                self.selected_game = min(len(self.games) - 1, self.selected_game + 1)
             return True
         
-        if self.lcd.buttons.is_pressed('A'):
+        if button_name == 'A':
             if self.current_screen == "main":
                 # Выбор пункта меню
                 selected_menu = self.menu_items[self.selected_item]["name"]
@@ -237,12 +349,14 @@ class Desktop:
                     self.current_screen = "network"
                 elif selected_menu == "Shutdown":
                     self.current_screen = "shutdown"
+            elif self.current_screen == "games":
+                return self.launch_game()
             elif self.current_screen == "shutdown":
                 # Подтверждение выключения
-                os.system("sudo shutdown -h now")
+                self.shutdown_system()
             return True
         
-        if self.lcd.buttons.is_pressed('B'):
+        if button_name == 'B':
             if self.current_screen != "main":
                 self.current_screen = "main"
                 self.selected_item = 0
@@ -250,51 +364,290 @@ class Desktop:
         
         return False
     
+    def _begin_game(self):
+        """Передача дисплея игре: рабочий стол перестает рисовать"""
+        self.game_running = True
+        if self.runtime is not None:
+            # Кнопки (и сокет сервера дисплея) опрашивает игра
+            self.runtime.input_paused = True
+        self._governor_enabled = self.governor.enabled
+        # Ввод игры рабочий стол не видит - таймауты подсветки не должны срабатывать
+        self.governor.enabled = False
+    
+    def _end_game(self):
+        """Возврат дисплея рабочему столу после выхода из игры"""
+        self.game_running = False
+        if self.runtime is not None:
+            self.runtime.input_paused = False
+        self.governor.enabled = self._governor_enabled
+        self.governor.notify_input()
+        if self.event_loop is not None:
+            # Нажатия во время игры предназначались игре
+            self.event_loop.discard_pending()
+        # Игра рисовала поверх экрана - следующий кадр отправляется целиком
+        self.invalidate()
+    
+    def launch_game(self):
+        """
+        Запуск выбранной игры
+        
+        Returns:
+            bool: True если требуется перерисовка экрана
+        """
+        name = self.games[self.selected_game]["name"]
+        if not self.launcher.has_game(name):
+            print(f"Игра {name} пока не реализована")
+            return False
+        
+        if self.runtime is not None:
+            self.runtime.spawn(self._launch_game_async(name))
+            return False
+        
+        self._begin_game()
+        try:
+            self.launcher.launch(name)
+        finally:
+            self._end_game()
+        return True
+    
+    async def _launch_game_async(self, name):
+        """Запуск игры в asyncio-режиме без блокировки цикла событий"""
+        runtime = self.runtime
+        # Через поток дисплея: текущая отрисовка успеет завершиться до старта игры
+        await runtime.run_display(self._begin_game)
+        try:
+            await runtime.run_blocking(self.launcher.launch, name)
+        finally:
+            await runtime.run_display(self._end_game)
+            runtime.events.put_nowait(runtime.WAKE_EVENT)
+    
+    def shutdown_system(self):
+        """Выключение системы"""
+        if self.runtime is not None:
+            # В asyncio-режиме команда не должна блокировать интерфейс
+            self.runtime.spawn(self.runtime.run_blocking(os.system, "sudo shutdown -h now"))
+        else:
+            os.system("sudo shutdown -h now")
+    
+    def render_screen(self):
+        """
+        Отрисовка текущего экрана и отправка на дисплей
+        
+        При смене экрана кадр отправляется целиком, иначе только области
+        виджетов, значения которых изменились.
+        """
+        if self.game_running:
+            return
+        
+        if self.current_screen == "main":
+            self.draw_main_screen()
+        elif self.current_screen == "system_info":
+            self.draw_system_info_screen()
+        elif self.current_screen == "games":
+            self.draw_games_screen()
+        elif self.current_screen == "settings":
+            self.draw_settings_screen()
+        elif self.current_screen == "network":
+            self.draw_network_screen()
+        elif self.current_screen == "shutdown":
+            self.draw_shutdown_screen()
+        
+        screen_id = self.current_screen
+        screen = self.screens[screen_id]
+        full = self._shown_screen != screen_id
+        
+        if full and screen_id in self.static_screens:
+            version = self.content_versions[screen_id]
+            cached = self.screen_cache.get(screen_id, version)
+            if cached is not None:
+                # Готовый кадр: одна передача без отрисовки и конвертации
+                self.lcd.set_buffer(rgb565_to_image(cached.payload, self.width, self.height))
+                self.lcd.write_frame(cached.payload)
+                screen.restore_widget_state(cached.widget_state)
+                # Дорисовываются только изменившиеся виджеты (например, время)
+                screen.render()
+            else:
+                screen.render(full=True)
+                self.screen_cache.put(screen_id, version,
+                                      self.lcd._convert_rgb565(self.lcd.get_buffer()),
+                                      screen.widget_state())
+                if DEBUG:
+                    print(f"Кэш экранов: {self.screen_cache.stats()}")
+        else:
+            screen.render(full=full)
+        
+        self._shown_screen = screen_id
+        startup.mark_once('desktop frame')
+    
     def update(self):
         """Обновление экрана"""
         current_time = time.time()
         
-        # Обновление каждую секунду
-        if current_time - self.last_update >= self.update_interval:
+        # Период обновления задает регулятор: 1 с в активном режиме,
+        # реже при простое, без отрисовки при погашенном дисплее
+        interval = self.governor.refresh_interval()
+        if interval is None:
+            return
+        
+        if current_time - self.last_update >= interval:
             self.last_update = current_time
-            
-            # Отрисовка соответствующего экрана
-            if self.current_screen == "main":
-                self.draw_main_screen()
-            elif self.current_screen == "system_info":
-                self.draw_system_info_screen()
-            elif self.current_screen == "games":
-                self.draw_games_screen()
-            elif self.current_screen == "settings":
-                self.draw_settings_screen()
-            elif self.current_screen == "network":
-                self.draw_network_screen()
-            elif self.current_screen == "shutdown":
-                self.draw_shutdown_screen()
-            
-            self.lcd.update()
+            self.render_screen()
+    
+    def _schedule_refresh(self, delay):
+        """Перепланирование следующей перерисовки"""
+        if self._refresh_timer is not None:
+            self._refresh_timer.cancel()
+        self._refresh_timer = self.event_loop.timers.schedule(delay, self._on_refresh)
+    
+    def _schedule_governor(self):
+        """Планирование проверки на момент ближайшей смены состояния регулятора"""
+        if self._governor_timer is not None:
+            self._governor_timer.cancel()
+        delay = self.governor.next_transition()
+        self._governor_timer = None
+        if delay is not None:
+            self._governor_timer = self.event_loop.timers.schedule(delay, self._on_governor)
+    
+    def _on_refresh(self):
+        """Таймер перерисовки (часы, метрики)"""
+        self._refresh_timer = None
+        interval = self.governor.refresh_interval()
+        if interval is None:
+            # Дисплей погашен - следующую перерисовку запланирует пробуждение
+            return
+        self.render_screen()
+        self._schedule_refresh(interval)
+    
+    def _on_governor(self):
+        """Таймер регулятора энергосбережения"""
+        self._governor_timer = None
+        self.governor.tick()
+        self._schedule_governor()
+    
+    def _on_button(self, button_name):
+        """Обработка нажатия из событийного цикла"""
+        if self.governor.notify_input():
+            # Нажатие только будит дисплей: одно полное обновление
+            self.invalidate()
+            self._schedule_refresh(0)
+        elif self.handle_button(button_name):
+            self.governor.notify_change()
+            self.render_screen()
+            self._schedule_refresh(self.governor.refresh_interval())
+        self._schedule_governor()
     
     def run(self):
-        """Запуск рабочего стола"""
+        """
+        Запуск рабочего стола
+        
+        Цикл спит до нажатия кнопки (уведомление по фронту GPIO) или до
+        ближайшего таймера - перерисовки или смены режима энергосбережения.
+        """
+        self.event_loop = EventLoop()
+        self._refresh_timer = None
+        self._governor_timer = None
+        buttons = self.lcd.buttons
         try:
             print("Запуск рабочего стола...")
+            # Заготовка для игр создается до запуска фоновых потоков
+            self.launcher.start()
+            self.start_metrics()
             
-            while True:
-                # Обработка ввода
-                if self.handle_input():
-                    # Принудительное обновление при изменении
-                    self.last_update = 0
-                
-                # Обновление экрана
-                self.update()
-                
-                # Небольшая задержка
-                time.sleep(0.1)
+            if not buttons.enable_events(self.event_loop.post):
+                # Без детектирования фронтов опрашиваем кнопки по таймеру
+                self.event_loop.timers.schedule(
+                    BUTTON_POLL_INTERVAL,
+                    lambda: [self.event_loop.post(name) for name in buttons.get_all_pressed()],
+                    interval=BUTTON_POLL_INTERVAL
+                )
+            
+            self._schedule_refresh(0)
+            self._schedule_governor()
+            self.event_loop.run(self._on_button)
                 
         except KeyboardInterrupt:
             print("Рабочий стол остановлен")
         except Exception as e:
             print(f"Ошибка в рабочем столе: {e}")
+        finally:
+            buttons.disable_events()
+            self.metrics.stop()
+            self.probes.close()
+            self.launcher.stop()
+    
+    async def run_async_with(self, runtime):
+        """
+        Основной цикл рабочего стола в asyncio-среде
+        
+        Ввод обрабатывается в цикле событий, отрисовка и передача по SPI
+        выполняются в потоке дисплея, поэтому медленная отрисовка или
+        системные команды не задерживают реакцию на кнопки.
+        
+        Заготовку для игр (launcher.start()) нужно создать до конструктора
+        AsyncRuntime, как в run_async: после запуска его потоков fork
+        небезопасен, и игры выполнялись бы в потоке внутри рабочего стола.
+        
+        Args:
+            runtime: Запущенный экземпляр AsyncRuntime
+        """
+        if LAUNCHER_CONFIG['enabled'] and not self.launcher.available:
+            print("Процесс запуска игр не создан: игры будут выполняться в процессе рабочего стола")
+        self.runtime = runtime
+        self.governor = runtime.governor
+        self.start_metrics()
+        redraw = asyncio.Event()
+        redraw.set()
+        
+        async def render_loop():
+            while runtime.running:
+                await redraw.wait()
+                redraw.clear()
+                await runtime.run_display(self.render_screen)
+        
+        async def refresh_timer():
+            while runtime.running:
+                interval = self.governor.refresh_interval()
+                if interval is None:
+                    # Дисплей погашен - перерисовка только после пробуждения
+                    await asyncio.sleep(POWER_CONFIG['tick_interval'])
+                    continue
+                redraw.set()
+                await asyncio.sleep(interval)
+        
+        runtime.spawn(render_loop())
+        runtime.spawn(refresh_timer())
+        
+        try:
+            while runtime.running:
+                button_name = await runtime.next_event()
+                if self.game_running:
+                    # Нажатия во время игры предназначались игре
+                    continue
+                if button_name == runtime.WAKE_EVENT:
+                    self.invalidate()
+                if button_name == runtime.WAKE_EVENT or self.handle_button(button_name):
+                    self.governor.notify_change()
+                    redraw.set()
+        finally:
+            self.runtime = None
+            self.metrics.stop()
+            self.probes.close()
+    
+    def run_async(self):
+        """Запуск рабочего стола в asyncio-режиме"""
+        try:
+            print("Запуск рабочего стола (asyncio)...")
+            # Заготовка для игр создается до того, как AsyncRuntime запустит
+            # пулы потоков (дисплей и фоновые задачи)
+            self.launcher.start()
+            runtime = AsyncRuntime(self.lcd, governor=self.governor)
+            runtime.run(self.run_async_with)
+        except KeyboardInterrupt:
+            print("Рабочий стол остановлен")
+        except Exception as e:
+            print(f"Ошибка в рабочем столе: {e}")
+        finally:
+            self.launcher.stop()
 
 if __name__ == "__main__":
     # Тест рабочего стола
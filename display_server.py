@@ -0,0 +1,684 @@
+#!/usr/bin/env python3
+"""
+Сервер дисплея для CM4 с LCD дисплеем
+Единственный владелец SPI и GPIO; приложения рисуют в общий кадровый буфер
+в /dev/shm и сообщают серверу об изменившихся областях через Unix-сокет
+
+Протокол (текстовые строки):
+    сервер -> клиент: HELLO <путь буфера> <ширина> <высота>
+                      DONE <номер>        - область отправлена на дисплей
+                      BUTTONS <маска>     - состояние кнопок (бит = BUTTON_PINS)
+                      FOCUS <0|1>         - клиент стал (перестал быть) активным
+    клиент -> сервер: DAMAGE <номер> <x> <y> <ширина> <высота>
+                      FOCUS               - запрос на показ своего буфера
+                      BACKLIGHT <0|1>
+                      SLEEP | WAKE        - сон панели (SLPIN/SLPOUT), пока
+                                            клиент активен
+                      WATCH               - только кнопки: клиент не рисует,
+                                            BUTTONS приходят всегда
+"""
+
+import os
+import sys
+import mmap
+import time
+import signal
+import socket
+import struct
+import selectors
+import threading
+import numpy as np
+from PIL import Image, ImageDraw
+from lcd_game import LCDGame
+from perf_stats import FrameStats, startup
+from config import *
+
+BUTTON_NAMES = list(BUTTON_PINS)
+
+# Неотправленные данные клиента, после которых он считается зависшим
+MAX_OUTBOX = 64 * 1024
+
+
+def _union(a, b):
+    """Объединение прямоугольников (x, y, ширина, высота)"""
+    if a is None:
+        return b
+    x0 = min(a[0], b[0])
+    y0 = min(a[1], b[1])
+    x1 = max(a[0] + a[2], b[0] + b[2])
+    y1 = max(a[1] + a[3], b[1] + b[3])
+    return (x0, y0, x1 - x0, y1 - y0)
+
+
+class ClientConnection:
+    """
+    Подключенное приложение (на стороне сервера)
+    """
+
+    def __init__(self, sock, client_id, shm_dir, width, height):
+        self.sock = sock
+        self.id = client_id
+        self.shm_path = os.path.join(shm_dir, f"lcd_game_fb.{os.getpid()}.{client_id}")
+        self.stride = width * 2
+
+        fd = os.open(self.shm_path, os.O_CREAT | os.O_RDWR | os.O_TRUNC, 0o660)
+        try:
+            # Буфер принадлежит подключившемуся процессу: сервер, запущенный
+            # от root, иначе создал бы файл, который клиент не откроет
+            _pid, uid, gid = struct.unpack('3i', sock.getsockopt(
+                socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i')))
+            try:
+                os.fchown(fd, uid, gid)
+            except PermissionError:
+                # Сервер без root: файл остается доступен его пользователю и группе
+                pass
+            os.ftruncate(fd, self.stride * height)
+            self.map = mmap.mmap(fd, self.stride * height)
+        finally:
+            os.close(fd)
+        self.frame = np.frombuffer(self.map, dtype=np.uint8).reshape(height, self.stride)
+
+        self.pending = None      # Объединение областей, ожидающих отправки
+        self.pending_seq = None  # Номер последней из них
+        self.inbox = b""
+        self.outbox = bytearray()  # Строки, не поместившиеся в буфер сокета
+        self.sleeping = False    # Клиент перевел панель в сон (SLEEP)
+        self.events = selectors.EVENT_READ
+        self.broken = False      # Ошибка соединения: сервер отключит клиента
+
+    def send(self, line):
+        """
+        Отправка строки клиенту
+
+        Сокет неблокирующий: что не поместилось, остается в outbox и
+        дописывается по EVENT_WRITE, поэтому строки не теряются и не рвутся.
+        """
+        if self.broken:
+            return
+        self.outbox += line.encode() + b"\n"
+        if len(self.outbox) > MAX_OUTBOX:
+            # Клиент не читает сообщения
+            self.broken = True
+            return
+        self.flush()
+
+    def flush(self):
+        """Дописывание outbox в сокет"""
+        try:
+            while self.outbox:
+                sent = self.sock.send(self.outbox)
+                del self.outbox[:sent]
+        except (BlockingIOError, InterruptedError):
+            pass
+        except OSError:
+            self.broken = True
+
+    def region(self, x, y, width, height):
+        """Байты RGB565 области из общего буфера"""
+        if x == 0 and width * 2 == self.stride:
+            # Полные строки лежат в памяти подряд - без копирования
+            return memoryview(self.map)[y * self.stride:(y + height) * self.stride]
+        return self.frame[y:y + height, x * 2:(x + width) * 2].tobytes()
+
+    def close(self):
+        """Закрытие соединения и удаление общего буфера"""
+        self.frame = None
+        try:
+            self.map.close()
+        except BufferError:
+            pass
+        try:
+            os.remove(self.shm_path)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+class DisplayServer:
+    """
+    Сервер дисплея
+
+    Показывается буфер активного клиента (последнего начавшего рисовать или
+    запросившего FOCUS): подключение само по себе дисплей не забирает. Уведомления об областях, пришедшие за один проход
+    цикла, объединяются и отправляются на дисплей одной передачей. При смене
+    активного клиента его буфер отправляется целиком; панель не
+    переинициализируется. Панель спит, пока спит активный клиент.
+    """
+
+    def __init__(self, lcd, socket_path=DISPLAY_SERVER_CONFIG['socket_path'],
+                 shm_dir=DISPLAY_SERVER_CONFIG['shm_dir']):
+        """
+        Args:
+            lcd: Экземпляр LCDGame (владелец оборудования)
+            socket_path (str): Путь Unix-сокета
+            shm_dir (str): Каталог общих буферов (tmpfs)
+        """
+        self.lcd = lcd
+        self.socket_path = socket_path
+        self.shm_dir = shm_dir
+        self.selector = selectors.DefaultSelector()
+        self.connections = []  # Все подключенные клиенты
+        self.clients = []      # Порядок активации: последний - активный
+        self.watchers = []     # Клиенты, читающие только кнопки (WATCH)
+        self.listener = None
+        self.running = False
+        self._next_id = 1
+        self._buttons = None
+        self._next_poll = 0.0
+
+    @property
+    def focused(self):
+        """Активный клиент или None"""
+        return self.clients[-1] if self.clients else None
+
+    def start(self):
+        """Создание сокета"""
+        os.makedirs(os.path.dirname(self.socket_path), exist_ok=True)
+        try:
+            os.remove(self.socket_path)
+        except FileNotFoundError:
+            pass
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.listener.bind(self.socket_path)
+        os.chmod(self.socket_path, 0o666)
+        self.listener.listen(8)
+        self.listener.setblocking(False)
+        self.selector.register(self.listener, selectors.EVENT_READ)
+        self.running = True
+
+    def stop(self):
+        """Остановка сервера и отключение клиентов"""
+        self.running = False
+        for client in list(self.connections):
+            self._drop(client)
+        if self.listener is not None:
+            self.selector.unregister(self.listener)
+            self.listener.close()
+            self.listener = None
+            try:
+                os.remove(self.socket_path)
+            except OSError:
+                pass
+
+    def _accept(self):
+        sock, _ = self.listener.accept()
+        sock.setblocking(False)
+        client = ClientConnection(sock, self._next_id, self.shm_dir, self.lcd.width, self.lcd.height)
+        self._next_id += 1
+        self.selector.register(sock, selectors.EVENT_READ, client)
+        self.connections.append(client)
+        client.send(f"HELLO {client.shm_path} {self.lcd.width} {self.lcd.height}")
+
+    def _focus(self, client):
+        """Перевод клиента на передний план"""
+        previous = self.focused
+        if client in self.clients:
+            self.clients.remove(client)
+        self.clients.append(client)
+        if previous is client:
+            return
+        if previous is not None:
+            previous.send("FOCUS 0")
+        client.send("FOCUS 1")
+        # Смена приложения - один полный кадр из буфера нового клиента
+        client.pending = (0, 0, self.lcd.width, self.lcd.height)
+        self._buttons = None
+        self._apply_sleep()
+
+    def _apply_sleep(self):
+        """Сон панели по состоянию активного клиента"""
+        client = self.focused
+        sleeping = client is not None and client.sleeping
+        if sleeping and not self.lcd.sleeping:
+            self.lcd.sleep()
+        elif not sleeping and self.lcd.sleeping:
+            self.lcd.wake()
+            if client is not None:
+                # Во сне кадры не передавались
+                client.pending = (0, 0, self.lcd.width, self.lcd.height)
+
+    def _drop(self, client):
+        """Отключение клиента"""
+        was_focused = client is self.focused
+        self.selector.unregister(client.sock)
+        self.connections.remove(client)
+        for group in (self.clients, self.watchers):
+            if client in group:
+                group.remove(client)
+        client.close()
+        if was_focused and self.clients:
+            focused = self.clients.pop()
+            self._focus(focused)
+
+    def _sync_clients(self):
+        """Отключение клиентов с ошибками и подписка на EVENT_WRITE для outbox"""
+        for client in list(self.connections):
+            if client not in self.connections:
+                continue
+            if client.broken:
+                self._drop(client)
+                continue
+            events = selectors.EVENT_READ | (selectors.EVENT_WRITE if client.outbox else 0)
+            if events != client.events:
+                self.selector.modify(client.sock, events, client)
+                client.events = events
+
+    def _read(self, client):
+        """Чтение и разбор команд клиента"""
+        try:
+            data = client.sock.recv(65536)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._drop(client)
+            return
+
+        *lines, client.inbox = (client.inbox + data).split(b"\n")
+        for line in lines:
+            try:
+                self._handle(client, line.decode(errors='replace').split())
+            except ValueError:
+                # Нарушение протокола отключает только этого клиента
+                print(f"Сервер дисплея: неверная команда клиента {client.id}: {line[:64]!r}")
+                self._drop(client)
+                return
+
+    def _handle(self, client, words):
+        if not words:
+            return
+        command = words[0]
+        if command == "DAMAGE" and len(words) == 6:
+            seq, x, y, width, height = (int(value) for value in words[1:])
+            # Границы приводятся к экрану
+            x0, y0 = max(0, x), max(0, y)
+            x1, y1 = min(self.lcd.width, x + width), min(self.lcd.height, y + height)
+            if client not in self.clients:
+                # Первый кадр нового приложения выводит его на передний план
+                self._focus(client)
+            if client is not self.focused:
+                # Фоновый буфер будет отправлен целиком при активации
+                client.send(f"DONE {seq}")
+                return
+            if x1 > x0 and y1 > y0:
+                client.pending = _union(client.pending, (x0, y0, x1 - x0, y1 - y0))
+            client.pending_seq = seq
+        elif command == "FOCUS":
+            self._focus(client)
+        elif command == "BACKLIGHT" and len(words) == 2:
+            self.lcd.set_backlight(words[1] == "1")
+        elif command in ("SLEEP", "WAKE"):
+            client.sleeping = command == "SLEEP"
+            if client is self.focused:
+                self._apply_sleep()
+        elif command == "WATCH":
+            if client not in self.watchers:
+                self.watchers.append(client)
+            # Текущее состояние уйдет при ближайшем опросе
+            self._buttons = None
+
+    def _flush(self):
+        """Отправка накопленных областей активного клиента одной передачей"""
+        client = self.focused
+        if client is None or (client.pending is None and client.pending_seq is None):
+            return
+        if client.pending is not None:
+            x, y, width, height = client.pending
+            if (width, height) == (self.lcd.width, self.lcd.height):
+                self.lcd.write_frame(client.region(0, 0, width, height))
+            else:
+                self.lcd.write_region(x, y, width, height, client.region(x, y, width, height))
+        if client.pending_seq is not None:
+            client.send(f"DONE {client.pending_seq}")
+        client.pending = None
+        client.pending_seq = None
+
+    def _poll_buttons(self):
+        """Пересылка состояния кнопок активному клиенту и WATCH при его изменении"""
+        receivers = list(self.watchers)
+        if self.focused is not None and self.focused not in receivers:
+            receivers.append(self.focused)
+        buttons = getattr(self.lcd, 'buttons', None)
+        if not receivers or buttons is None:
+            return
+        mask = 0
+        for bit, name in enumerate(BUTTON_NAMES):
+            if buttons.is_held(name):
+                mask |= 1 << bit
+        if mask != self._buttons:
+            self._buttons = mask
+            for client in receivers:
+                client.send(f"BUTTONS {mask:x}")
+
+    def serve_forever(self):
+        """Цикл сервера"""
+        if not self.running:
+            self.start()
+        while self.running:
+            timeout = None
+            if self.connections:
+                timeout = max(0.0, self._next_poll - time.monotonic())
+            for key, events in self.selector.select(timeout):
+                client = key.data
+                if client is None:
+                    self._accept()
+                    continue
+                if events & selectors.EVENT_WRITE:
+                    client.flush()
+                if events & selectors.EVENT_READ and client in self.connections:
+                    self._read(client)
+
+            # Все уведомления этого прохода уже объединены
+            self._flush()
+
+            now = time.monotonic()
+            if now >= self._next_poll:
+                self._next_poll = now + BUTTON_POLL_INTERVAL
+                self._poll_buttons()
+
+            self._sync_clients()
+
+
+class RemoteButtons:
+    """
+    Кнопки, состояние которых присылает сервер дисплея
+
+    Интерфейс совпадает с ButtonManager: is_pressed срабатывает один раз на
+    нажатие, is_held - пока кнопка удерживается.
+    """
+
+    def __init__(self, lcd):
+        self.lcd = lcd
+        self.held = set()
+        self.pressed = set()
+        # Сообщения сервера может разбирать поток отрисовки, пока кнопки
+        # опрашивает поток цикла событий
+        self.lock = threading.Lock()
+
+    def update(self, mask):
+        """Новое состояние кнопок от сервера"""
+        held = {name for bit, name in enumerate(BUTTON_NAMES) if mask & (1 << bit)}
+        with self.lock:
+            self.pressed |= held - self.held
+            self.held = held
+
+    def is_pressed(self, button_name):
+        self.lcd.poll()
+        with self.lock:
+            if button_name in self.pressed:
+                self.pressed.discard(button_name)
+                return True
+        return False
+
+    def is_held(self, button_name):
+        self.lcd.poll()
+        return button_name in self.held
+
+    def get_all_pressed(self):
+        self.lcd.poll()
+        with self.lock:
+            pressed = [name for name in BUTTON_NAMES if name in self.pressed]
+            self.pressed.clear()
+        return pressed
+
+    def enable_events(self, callback):
+        """Уведомления по фронту недоступны - вызывающий код перейдет на опрос"""
+        return False
+
+    def disable_events(self):
+        pass
+
+
+class RemoteLCD(LCDGame):
+    """
+    Клиент сервера дисплея с интерфейсом LCDGame
+
+    Рисование идет в локальный буфер PIL как обычно; при отправке области
+    байты RGB565 записываются прямо в общий буфер, а серверу уходит только
+    короткое уведомление. Следующая запись в общий буфер ждет, пока сервер
+    отправит предыдущую область, поэтому кадры не рвутся, а отрисовка
+    следующего кадра идет параллельно с передачей по SPI.
+
+    Сокет читает один поток за раз (_recv_lock): в асинхронном режиме
+    кнопки опрашивает поток цикла событий, а DONE ждет поток отрисовки.
+    Сокет всегда блокирующий; опрос без ожидания - recv с MSG_DONTWAIT.
+    """
+
+    def __init__(self, socket_path=DISPLAY_SERVER_CONFIG['socket_path']):
+        self.socket_path = socket_path
+        self.buttons = RemoteButtons(self)
+        self._connect()
+
+        self.rotation = 0
+        self.backend = None
+        self.stats = FrameStats()
+        self.sleeping = False
+        self.panel_preinitialized = True
+        self.buffer = Image.new('RGB', (self.width, self.height), color=(0, 0, 0))
+        self.draw = ImageDraw.Draw(self.buffer)
+
+    def _connect(self):
+        """Подключение к серверу и отображение своего общего буфера"""
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.socket_path)
+        self._recv_lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self.inbox = b""
+        self.focused = False
+        self.seq = 0
+        self.done_seq = 0
+
+        hello = self._read_line().split()
+        if len(hello) != 4 or hello[0] != "HELLO":
+            self.sock.close()
+            raise ConnectionError("неожиданный ответ сервера дисплея")
+        shm_path, self.width, self.height = hello[1], int(hello[2]), int(hello[3])
+        self.stride = self.width * 2
+
+        try:
+            fd = os.open(shm_path, os.O_RDWR)
+        except OSError:
+            self.sock.close()
+            raise
+        try:
+            self.map = mmap.mmap(fd, self.stride * self.height)
+        finally:
+            os.close(fd)
+        self.frame = np.frombuffer(self.map, dtype=np.uint8).reshape(self.height, self.stride)
+
+    def _disconnect(self):
+        self.frame = None
+        self.map.close()
+        self.sock.close()
+
+    def after_fork(self):
+        """
+        Отдельное подключение для дочернего процесса игры
+
+        Унаследованный сокет остается рабочему столу: иначе сообщения
+        сервера (DONE, BUTTONS) читали бы оба процесса. Игра получает свой
+        буфер и становится активным клиентом; после ее выхода сервер
+        возвращает дисплей рабочему столу.
+        """
+        self._disconnect()
+        self.buttons = RemoteButtons(self)
+        self._connect()
+
+    def _read_line(self):
+        while b"\n" not in self.inbox:
+            data = self.sock.recv(4096)
+            if not data:
+                raise ConnectionError("сервер дисплея закрыл соединение")
+            self.inbox += data
+        line, self.inbox = self.inbox.split(b"\n", 1)
+        return line.decode()
+
+    def _handle(self, words):
+        if len(words) != 2:
+            return
+        try:
+            if words[0] == "DONE":
+                self.done_seq = max(self.done_seq, int(words[1]))
+            elif words[0] == "BUTTONS":
+                self.buttons.update(int(words[1], 16))
+            elif words[0] == "FOCUS":
+                self.focused = words[1] == "1"
+        except ValueError:
+            # Неизвестный формат строки пропускается
+            pass
+
+    def _receive(self, block):
+        """Чтение и разбор сообщений сервера (вызывается под _recv_lock)"""
+        try:
+            data = self.sock.recv(4096, 0 if block else socket.MSG_DONTWAIT)
+            if not data:
+                raise ConnectionError("сервер дисплея закрыл соединение")
+            self.inbox += data
+        except (BlockingIOError, InterruptedError):
+            pass
+        *lines, self.inbox = self.inbox.split(b"\n")
+        for line in lines:
+            self._handle(line.decode().split())
+
+    def poll(self, block=False):
+        """
+        Обработка сообщений сервера
+
+        Если сокет уже читает другой поток, опрос без ожидания ничего не
+        делает: сообщения разберет тот поток.
+
+        Args:
+            block (bool): Ждать хотя бы одно сообщение
+        """
+        if not self._recv_lock.acquire(blocking=block):
+            return
+        try:
+            self._receive(block)
+        finally:
+            self._recv_lock.release()
+
+    def _wait_done(self):
+        """Ожидание отправки предыдущей области"""
+        while self.done_seq < self.seq:
+            with self._recv_lock:
+                # DONE мог прочитать другой поток, пока этот ждал блокировку
+                if self.done_seq >= self.seq:
+                    break
+                self._receive(block=True)
+
+    def _send(self, line):
+        with self._send_lock:
+            self.sock.sendall(line.encode() + b"\n")
+
+    def _flush_window(self, x_start, y_start, x_end, y_end, data):
+        """Запись области в общий буфер и уведомление сервера"""
+        start = time.perf_counter()
+        self._wait_done()
+
+        width = x_end - x_start + 1
+        height = y_end - y_start + 1
+        if width == self.width:
+            self.map[y_start * self.stride:(y_end + 1) * self.stride] = data
+        else:
+            self.frame[y_start:y_end + 1, x_start * 2:(x_end + 1) * 2] = \
+                np.frombuffer(data, dtype=np.uint8).reshape(height, width * 2)
+
+        self.seq += 1
+        self._send(f"DAMAGE {self.seq} {x_start} {y_start} {width} {height}")
+
+        self.stats.record('transfer', time.perf_counter() - start)
+        self.stats.add_bytes(len(data), full_frame=(width, height) == (self.width, self.height))
+        startup.mark_once('first frame')
+
+    def focus(self):
+        """Запрос на показ буфера этого приложения"""
+        self._send("FOCUS")
+
+    def watch_buttons(self):
+        """
+        Только чтение кнопок
+
+        Приложение (например, эмулятор мыши) не рисует и не забирает дисплей,
+        а состояние кнопок получает независимо от активного клиента.
+        """
+        self._send("WATCH")
+
+    def set_backlight(self, state):
+        self._send(f"BACKLIGHT {1 if state else 0}")
+
+    def sleep(self):
+        """Перевод панели в сон (сервер выполняет SLPIN, пока приложение активно)"""
+        if self.sleeping:
+            return
+        self._send("SLEEP")
+        self.sleeping = True
+
+    def wake(self):
+        """Выход панели из сна (SLPOUT выполняет сервер)"""
+        if not self.sleeping:
+            return
+        self._send("WAKE")
+        self.sleeping = False
+
+    def cleanup(self):
+        """Отключение от сервера (оборудование остается у сервера)"""
+        try:
+            self._wait_done()
+        except (OSError, ConnectionError):
+            pass
+        self._disconnect()
+
+
+def open_display():
+    """
+    Дисплей для приложения
+
+    Пока сервер дисплея работает, прямой доступ к оборудованию невозможен:
+    ошибка подключения к нему (например, нет прав на сокет или буфер)
+    передается вызывающему коду. Прямой доступ используется, только если
+    сокета нет или его никто не слушает (сокет остался от упавшего сервера).
+
+    Returns:
+        RemoteLCD, если запущен сервер дисплея, иначе LCDGame
+        с прямым доступом к оборудованию
+    """
+    if os.path.exists(DISPLAY_SERVER_CONFIG['socket_path']):
+        try:
+            return RemoteLCD()
+        except ConnectionRefusedError as e:
+            print(f"Сервер дисплея не запущен, прямой доступ: {e}")
+    return LCDGame()
+
+
+def notify_ready():
+    """Сообщение systemd о готовности (Type=notify): сокет уже слушает"""
+    address = os.environ.get('NOTIFY_SOCKET')
+    if not address:
+        return
+    if address.startswith('@'):
+        # Абстрактное пространство имен
+        address = '\0' + address[1:]
+    with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+        sock.sendto(b"READY=1", address)
+
+
+def main():
+    """Запуск сервера дисплея"""
+    lcd = LCDGame()
+    server = DisplayServer(lcd)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server.start()
+        notify_ready()
+        print(f"Сервер дисплея запущен: {server.socket_path}")
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        lcd.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Ранняя заставка для CM4 с LCD дисплеем
+Запускается отдельным systemd-сервисом до lcd-game.service: инициализирует
+ST7789 и выводит готовый логотип RGB565 без импорта PIL, numpy и psutil
+
+Использование:
+    python3 early_splash.py          - показать логотип
+    python3 early_splash.py --build  - пересобрать файл логотипа (нужен PIL)
+"""
+
+import os
+import sys
+import time
+import spidev
+import RPi.GPIO as GPIO
+from config import *
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def logo_path():
+    """Путь к файлу логотипа RGB565"""
+    return os.path.join(BASE_DIR, EARLY_SPLASH_CONFIG['logo_file'])
+
+
+def boot_id():
+    """Идентификатор текущей загрузки ядра"""
+    try:
+        with open('/proc/sys/kernel/random/boot_id', 'r') as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+def mark_panel_initialized():
+    """Запись отметки "панель инициализирована в этой загрузке" """
+    state_file = EARLY_SPLASH_CONFIG['state_file']
+    try:
+        os.makedirs(os.path.dirname(state_file), exist_ok=True)
+        with open(state_file, 'w') as f:
+            f.write(boot_id())
+    except OSError as e:
+        print(f"Не удалось записать состояние панели: {e}")
+
+
+def panel_initialized():
+    """
+    Была ли панель инициализирована ранней заставкой в этой загрузке
+
+    Returns:
+        bool: True если отметка есть и относится к текущей загрузке
+    """
+    try:
+        with open(EARLY_SPLASH_CONFIG['state_file'], 'r') as f:
+            return f.read().strip() == boot_id()
+    except OSError:
+        return False
+
+
+def clear_panel_initialized():
+    """Удаление отметки (после освобождения пинов панель может сброситься)"""
+    try:
+        os.remove(EARLY_SPLASH_CONFIG['state_file'])
+    except OSError:
+        pass
+
+
+def write_command(spi, cmd, data=None):
+    """Отправка команды и данных ST7789"""
+    GPIO.output(PIN_DC, GPIO.LOW)
+    GPIO.output(PIN_CS, GPIO.LOW)
+    spi.writebytes([cmd])
+    GPIO.output(PIN_CS, GPIO.HIGH)
+    if data:
+        GPIO.output(PIN_DC, GPIO.HIGH)
+        GPIO.output(PIN_CS, GPIO.LOW)
+        spi.writebytes2(data)
+        GPIO.output(PIN_CS, GPIO.HIGH)
+
+
+def wait_for_devices(timeout=EARLY_SPLASH_CONFIG['device_timeout']):
+    """
+    Ожидание узлов SPI и GPIO
+
+    spi_bcm2835 и gpiomem привязывает udev coldplug, а не modules-load:
+    сразу после systemd-udev-trigger узлов может еще не быть.
+
+    Returns:
+        bool: True если все узлы появились
+    """
+    devices = [f"/dev/spidev{SPI_BUS}.{SPI_DEVICE}", '/dev/gpiomem']
+    deadline = time.monotonic() + timeout
+    while True:
+        missing = [device for device in devices if not os.path.exists(device)]
+        if not missing:
+            return True
+        if time.monotonic() >= deadline:
+            print(f"Устройства не появились за {timeout} с: {', '.join(missing)}")
+            return False
+        time.sleep(0.02)
+
+
+def draw_logo(spi, logo):
+    """Сброс и инициализация ST7789, вывод логотипа и включение подсветки"""
+    GPIO.setmode(GPIO.BCM)
+    GPIO.setwarnings(False)
+    GPIO.setup(PIN_RESET, GPIO.OUT, initial=GPIO.HIGH)
+    GPIO.setup(PIN_DC, GPIO.OUT)
+    GPIO.setup(PIN_CS, GPIO.OUT, initial=GPIO.HIGH)
+    GPIO.setup(PIN_BACKLIGHT, GPIO.OUT, initial=GPIO.LOW)
+
+    spi.open(SPI_BUS, SPI_DEVICE)
+    spi.max_speed_hz = SPI_SPEED
+    spi.mode = 0
+
+    # Аппаратный сброс
+    GPIO.output(PIN_RESET, GPIO.LOW)
+    time.sleep(0.01)
+    GPIO.output(PIN_RESET, GPIO.HIGH)
+    time.sleep(0.12)
+
+    for cmd, data in ST7789_INIT_COMMANDS:
+        write_command(spi, cmd, data)
+        # После SLPOUT контроллеру нужно 120 мс
+        time.sleep(0.12 if cmd == 0x11 else 0.001)
+
+    # Логотип на весь экран, затем подсветка - без мелькания мусора из памяти панели
+    write_command(spi, 0x2A, [0x00, 0x00, (DISPLAY_WIDTH - 1) >> 8, (DISPLAY_WIDTH - 1) & 0xFF])
+    write_command(spi, 0x2B, [0x00, 0x00, (DISPLAY_HEIGHT - 1) >> 8, (DISPLAY_HEIGHT - 1) & 0xFF])
+    write_command(spi, 0x2C, logo)
+    GPIO.output(PIN_BACKLIGHT, GPIO.HIGH)
+
+
+def show_logo():
+    """
+    Инициализация панели и вывод логотипа
+
+    Пины не освобождаются (GPIO.cleanup не вызывается): сброс и подсветка
+    сохраняют уровни до запуска основной системы. Ошибка доступа к
+    оборудованию завершает заставку с сообщением, а не трассировкой.
+
+    Returns:
+        bool: True если логотип выведен
+    """
+    try:
+        with open(logo_path(), 'rb') as f:
+            logo = f.read()
+    except OSError as e:
+        print(f"Файл логотипа недоступен: {e}")
+        return False
+    if len(logo) != DISPLAY_WIDTH * DISPLAY_HEIGHT * 2:
+        print("Размер файла логотипа не совпадает с размером дисплея")
+        return False
+    if not wait_for_devices():
+        return False
+
+    spi = spidev.SpiDev()
+    try:
+        draw_logo(spi, logo)
+    except (OSError, RuntimeError) as e:
+        # RuntimeError - RPi.GPIO без доступа к /dev/gpiomem
+        print(f"Ошибка доступа к дисплею: {e}")
+        return False
+    finally:
+        spi.close()
+    mark_panel_initialized()
+    return True
+
+
+def build_logo():
+    """Рендер логотипа заставки в файл RGB565 (тот же кадр, что рисует BootSplash)"""
+    from lcd_game import LCDGame
+    from boot_splash import BootSplash
+
+    class _Canvas(LCDGame):
+        """Буфер рисования без обращения к оборудованию"""
+
+        def __init__(self):
+            from PIL import Image, ImageDraw
+            self.width = DISPLAY_WIDTH
+            self.height = DISPLAY_HEIGHT
+            self.buffer = Image.new('RGB', (self.width, self.height), color=(0, 0, 0))
+            self.draw = ImageDraw.Draw(self.buffer)
+
+    canvas = _Canvas()
+    BootSplash(canvas)._paint_logo()
+    with open(logo_path(), 'wb') as f:
+        f.write(canvas._convert_rgb565(canvas.buffer))
+    print(f"Логотип записан: {logo_path()}")
+
+
+def main():
+    if '--build' in sys.argv[1:]:
+        build_logo()
+        return
+    if not show_logo():
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,8 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from lcd_game import LCDGame
+from display_server import open_display
+from config import BUTTON_PINS
 import time
 
 def test_buttons():
@@ -18,8 +19,8 @@ def test_buttons():
         print("Нажимайте кнопки для проверки их работы")
         print("Нажмите Ctrl+C для выхода")
         
-        # Создание экземпляра дисплея
-        lcd = LCDGame()
+        # Создание экземпляра дисплея (кнопки - через сервер дисплея, если он запущен)
+        lcd = open_display()
         
         # Очистка экрана
         lcd.clear()
@@ -31,13 +32,13 @@ def test_buttons():
         
         # Словарь для отслеживания состояния кнопок
         button_states = {}
-        for button_name in lcd.buttons.button_states.keys():
+        for button_name in BUTTON_PINS.keys():
             button_states[button_name] = False
         
         # Основной цикл тестирования
         while True:
             # Проверка каждой кнопки
-            for button_name in lcd.buttons.button_states.keys():
+            for button_name in BUTTON_PINS.keys():
                 is_pressed = lcd.buttons.is_pressed(button_name)
                 is_held = lcd.buttons.is_held(button_name)
                 
@@ -5,7 +5,8 @@
 
 import time
 import math
-from lcd_game import LCDGame
+from display_server import open_display
+from lcd_game import ParticleSystem
 from config import COLORS
 
 class LCDDemo:
@@ -14,7 +15,7 @@ class LCDDemo:
     """
     
     def __init__(self):
-        self.lcd = LCDGame()
+        self.lcd = open_display()
         self.frame = 0
         
     def demo_text(self):
@@ -119,53 +120,19 @@ class LCDDemo:
         """Демонстрация частиц"""
         print("Демонстрация частиц...")
         
-        import random
-        
-        # Создание частиц
-        particles = []
-        for _ in range(20):
-            particles.append({
-                'x': random.randint(0, 240),
-                'y': random.randint(0, 240),
-                'vx': random.uniform(-2, 2),
-                'vy': random.uniform(-2, 2),
-                'life': random.randint(50, 100)
-            })
+        # Все частицы хранятся в массивах и обновляются одной операцией
+        particles = ParticleSystem(capacity=2000)
+        particles.emit_random(particles.capacity, speed=(10, 60), life=(2.5, 5.0), color=COLORS['YELLOW'])
         
         # Анимация частиц
         for frame in range(100):
-            self.lcd.clear()
-            
-            # Обновление частиц
-            for particle in particles:
-                particle['x'] += particle['vx']
-                particle['y'] += particle['vy']
-                particle['life'] -= 1
-                
-                # Отражение от границ
-                if particle['x'] <= 0 or particle['x'] >= 240:
-                    particle['vx'] *= -1
-                if particle['y'] <= 0 or particle['y'] >= 240:
-                    particle['vy'] *= -1
-                
-                # Рисование частицы
-                if particle['life'] > 0:
-                    size = max(1, particle['life'] // 20)
-                    color = (255, 255 - particle['life'] * 2, 0)
-                    self.lcd.draw_circle(int(particle['x']), int(particle['y']), 
-                                       size, color, fill=True)
+            particles.update(0.05)
             
-            # Удаление мертвых частиц и создание новых
-            particles = [p for p in particles if p['life'] > 0]
-            while len(particles) < 20:
-                particles.append({
-                    'x': random.randint(0, 240),
-                    'y': random.randint(0, 240),
-                    'vx': random.uniform(-2, 2),
-                    'vy': random.uniform(-2, 2),
-                    'life': random.randint(50, 100)
-                })
+            # Создание новых частиц взамен погибших
+            particles.emit_random(particles.capacity - particles.count,
+                                  speed=(10, 60), life=(2.5, 5.0), color=COLORS['YELLOW'])
             
+            particles.render(self.lcd, background=COLORS['BLACK'])
             self.lcd.update()
             time.sleep(0.05)
     
@@ -8,7 +8,8 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from lcd_game import LCDGame, GameEngine
+from display_server import open_display
+from lcd_game import GameEngine
 import time
 
 class SimpleGame(GameEngine):
@@ -108,7 +109,7 @@ def main():
         print("- SELECT: Перезапуск игры")
         
         # Создание экземпляра дисплея
-        lcd = LCDGame()
+        lcd = open_display()
         
         # Создание и запуск игры
         game = SimpleGame(lcd)
@@ -5,9 +5,13 @@
 
 import random
 import time
-from lcd_game import LCDGame, GameEngine
+from collections import deque
+from display_server import open_display
+from lcd_game import GameEngine, Entity, SpatialHash
 from config import COLORS
 
+CELL_SIZE = 10
+
 class SnakeGame(GameEngine):
     """
     Классическая игра "Змейка"
@@ -20,8 +24,13 @@ class SnakeGame(GameEngine):
     
     def reset_game(self):
         """Сброс игры"""
+        # Сетка занятости: проверка столкновений и поиск места для еды за O(1)
+        self.grid = SpatialHash(240, 240, CELL_SIZE)
+        
         # Инициализация змейки
-        self.snake = [(120, 120)]  # Начальная позиция
+        head = Entity(120, 120, CELL_SIZE, CELL_SIZE, 'snake')  # Начальная позиция
+        self.snake = deque([head])
+        self.grid.insert(head)
         self.direction = (1, 0)  # Направление движения
         self.food = self.generate_food()
         self.score = 0
@@ -29,11 +38,13 @@ class SnakeGame(GameEngine):
         
     def generate_food(self):
         """Генерация еды"""
-        while True:
-            x = random.randint(0, 23) * 10  # 240 / 10 = 24
-            y = random.randint(0, 23) * 10
-            if (x, y) not in self.snake:
-                return (x, y)
+        cell = self.grid.random_free_cell()
+        if cell is None:
+            # Поле заполнено змейкой
+            return None
+        food = Entity(cell[0], cell[1], CELL_SIZE, CELL_SIZE, 'food')
+        self.grid.insert(food)
+        return food
     
     def handle_input(self):
         """Обработка ввода (можно расширить для кнопок)"""
@@ -57,32 +68,38 @@ class SnakeGame(GameEngine):
         
         # Движение змейки
         head = self.snake[0]
-        new_head = (head[0] + self.direction[0] * 10, 
-                   head[1] + self.direction[1] * 10)
+        new_x = head.x + self.direction[0] * CELL_SIZE
+        new_y = head.y + self.direction[1] * CELL_SIZE
         
         # Проверка границ
-        if (new_head[0] < 0 or new_head[0] >= 240 or 
-            new_head[1] < 0 or new_head[1] >= 240):
+        if (new_x < 0 or new_x >= 240 or 
+            new_y < 0 or new_y >= 240):
             self.game_over = True
             return
         
         # Проверка столкновения с собой
-        if new_head in self.snake:
+        hits = self.grid.query(new_x, new_y, CELL_SIZE, CELL_SIZE)
+        if any(entity.tag == 'snake' for entity in hits):
             self.game_over = True
             return
         
         # Добавление новой головы
-        self.snake.insert(0, new_head)
+        new_head = Entity(new_x, new_y, CELL_SIZE, CELL_SIZE, 'snake')
+        self.snake.appendleft(new_head)
+        self.grid.insert(new_head)
         
         # Проверка еды
-        if new_head == self.food:
+        if self.food in hits:
             self.score += 10
+            self.grid.remove(self.food)
             self.food = self.generate_food()
+            if self.food is None:
+                self.game_over = True
             # Увеличение скорости
             self.fps = min(20, 10 + self.score // 50)
         else:
             # Удаление хвоста
-            self.snake.pop()
+            self.grid.remove(self.snake.pop())
     
     def render(self):
         """Отрисовка игры"""
@@ -98,15 +115,16 @@ class SnakeGame(GameEngine):
             # Отрисовка змейки
             for i, segment in enumerate(self.snake):
                 if i == 0:  # Голова
-                    self.lcd.draw_rect(segment[0], segment[1], 10, 10, 
+                    self.lcd.draw_rect(segment.x, segment.y, CELL_SIZE, CELL_SIZE, 
                                      COLORS['GREEN'], fill=True)
                 else:  # Тело
-                    self.lcd.draw_rect(segment[0], segment[1], 10, 10, 
+                    self.lcd.draw_rect(segment.x, segment.y, CELL_SIZE, CELL_SIZE, 
                                      COLORS['DARK_GRAY'], fill=True)
             
             # Отрисовка еды
-            self.lcd.draw_rect(self.food[0], self.food[1], 10, 10, 
-                             COLORS['RED'], fill=True)
+            if self.food is not None:
+                self.lcd.draw_rect(self.food.x, self.food.y, CELL_SIZE, CELL_SIZE, 
+                                 COLORS['RED'], fill=True)
             
             # Отрисовка счета
             self.lcd.draw_text(f"Score: {self.score}", 10, 10, COLORS['WHITE'], 10)
@@ -119,7 +137,7 @@ def main():
     """Основная функция"""
     try:
         print("Запуск игры 'Змейка'...")
-        lcd = LCDGame()
+        lcd = open_display()
         game = SnakeGame(lcd)
         
         print("Игра запущена! Нажмите Ctrl+C для выхода.")
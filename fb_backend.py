@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Бэкенд вывода LCDGame в кадровый буфер ядра (/dev/fbN)
+Панель обслуживает драйвер ядра fbtft/tinydrm с DMA; Python только
+заполняет отображенную память RGB565, передачу по SPI выполняет ядро
+
+Выбор: DISPLAY_BACKEND = 'fbdev' в config.py (устройство в FBDEV_BACKEND_CONFIG)
+"""
+
+import mmap
+import fcntl
+import numpy as np
+from backends import DisplayBackend, GpioButtonSource
+from fb_mirror import framebuffer_geometry
+from config import *
+
+# ioctl гашения кадрового буфера (linux/fb.h)
+FBIOBLANK = 0x4611
+FB_BLANK_UNBLANK = 0
+FB_BLANK_POWERDOWN = 4
+
+# Команды ST7789, которые имеют смысл для кадрового буфера
+CASET = 0x2A
+RASET = 0x2B
+RAMWR = 0x2C
+SLPIN = 0x10
+SLPOUT = 0x11
+
+
+class FramebufferBackend(DisplayBackend):
+    """
+    Вывод в отображенный кадровый буфер RGB565
+
+    Области LCDGame (update_region, write_region) записываются в память
+    буфера как есть; неизменившиеся строки пропускаются, чтобы не помечать
+    страницы для отложенного вывода fbtft. Команды инициализации ST7789
+    не нужны - панель настроил драйвер ядра; SLPIN/SLPOUT гасят и
+    включают буфер через FBIOBLANK.
+    """
+
+    name = 'fbdev'
+    # Панель инициализирована драйвером ядра
+    preinitialized = True
+
+    def __init__(self, device=FBDEV_BACKEND_CONFIG['device'], geometry=None):
+        """
+        Args:
+            device (str): Устройство кадрового буфера или обычный файл
+            geometry (tuple): (ширина, высота, бит на пиксель, длина строки);
+                по умолчанию из sysfs или размер дисплея для обычного файла
+        """
+        self.device = device
+        width, height, bpp, stride = geometry or framebuffer_geometry(
+            device, fallback=(DISPLAY_WIDTH, DISPLAY_HEIGHT, 16))
+        if bpp != 16:
+            raise ValueError(f"кадровый буфер {device}: нужен RGB565, а не {bpp} бит на пиксель")
+        if width < DISPLAY_WIDTH or height < DISPLAY_HEIGHT:
+            raise ValueError(f"кадровый буфер {device} меньше дисплея: {width}x{height}")
+        self.width = width
+        self.height = height
+        self.stride = stride
+        self.file = None
+        self.map = None
+        self.pixels = None
+        self.gpio = None
+        self.window = (0, 0, DISPLAY_WIDTH - 1, DISPLAY_HEIGHT - 1)
+        self._command = None
+        self.bytes = 0
+
+    def open(self):
+        self.file = open(self.device, 'r+b')
+        self.map = mmap.mmap(self.file.fileno(), self.stride * self.height)
+        # Пиксели буфера в порядке байт ядра (младший первым)
+        self.pixels = np.frombuffer(self.map, dtype='<u2').reshape(self.height, self.stride // 2)
+
+    def _blank(self, mode):
+        try:
+            fcntl.ioctl(self.file.fileno(), FBIOBLANK, mode)
+        except OSError:
+            # Обычный файл или драйвер без гашения
+            pass
+
+    def command(self, cmd):
+        self._command = cmd
+        if cmd == SLPIN:
+            self._blank(FB_BLANK_POWERDOWN)
+        elif cmd == SLPOUT:
+            self._blank(FB_BLANK_UNBLANK)
+
+    def data(self, data):
+        cmd = self._command
+        if cmd in (CASET, RASET) and len(data) >= 4:
+            start = (data[0] << 8) | data[1]
+            end = (data[2] << 8) | data[3]
+            x_start, y_start, x_end, y_end = self.window
+            if cmd == CASET:
+                self.window = (start, y_start, end, y_end)
+            else:
+                self.window = (x_start, start, x_end, end)
+        elif cmd == RAMWR:
+            x_start, y_start, x_end, y_end = self.window
+            self.write_window(x_start, y_start, x_end, y_end, data)
+
+    def write_window(self, x_start, y_start, x_end, y_end, data):
+        """Запись области RGB565 (старший байт первым) в кадровый буфер"""
+        width = x_end - x_start + 1
+        height = y_end - y_start + 1
+        source = np.frombuffer(data, dtype='>u2', count=width * height).reshape(height, width)
+        target = self.pixels[y_start:y_end + 1, x_start:x_end + 1]
+
+        # Записываются только строки от первой до последней изменившейся
+        changed = np.flatnonzero((target != source).any(axis=1))
+        if not len(changed):
+            return
+        first, last = changed[0], changed[-1] + 1
+        target[first:last] = source[first:last]
+        self.bytes += int(last - first) * width * 2
+
+    def delay(self, seconds):
+        """Паузы контроллера выдерживает драйвер ядра"""
+        pass
+
+    def set_backlight(self, state):
+        self._blank(FB_BLANK_UNBLANK if state else FB_BLANK_POWERDOWN)
+
+    def button_source(self):
+        """Кнопки остаются на пинах GPIO"""
+        import RPi.GPIO as GPIO
+
+        GPIO.setmode(GPIO.BCM)
+        GPIO.setwarnings(False)
+        self.gpio = GPIO
+        return GpioButtonSource(GPIO)
+
+    def close(self):
+        self.pixels = None
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        if self.gpio is not None:
+            try:
+                self.gpio.cleanup()
+            except Exception:
+                pass
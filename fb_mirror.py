@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Зеркалирование кадрового буфера Linux (/dev/fbN) на LCD дисплей
+Замена внешней программы fbcp: буфер читается через mmap, масштабируется
+или обрезается до размера дисплея по заранее вычисленной карте индексов,
+а на дисплей отправляются только изменившиеся плитки
+
+Использование:
+    python3 fb_mirror.py             - устройство из FBCP_CONFIG
+    python3 fb_mirror.py /dev/fb1    - другое устройство или обычный файл
+"""
+
+import os
+import sys
+import mmap
+import time
+import threading
+import numpy as np
+from splash_cache import tile_rects
+from config import *
+
+# Весовые коэффициенты хэша плитки (нечетные, фиксированные между запусками)
+_WEIGHTS = {}
+
+
+def framebuffer_geometry(device, fallback=FBCP_CONFIG['geometry']):
+    """
+    Геометрия кадрового буфера
+
+    Для устройства fbN значения читаются из /sys/class/graphics; для обычного
+    файла (проверка без дисплея) берутся из fallback.
+
+    Args:
+        device (str): Путь к устройству или файлу
+        fallback (tuple): (ширина, высота, бит на пиксель) для обычного файла
+
+    Returns:
+        tuple: (ширина, высота, бит на пиксель, длина строки в байтах)
+    """
+    sysfs = os.path.join('/sys/class/graphics', os.path.basename(device))
+    try:
+        with open(os.path.join(sysfs, 'virtual_size'), 'r') as f:
+            width, height = (int(value) for value in f.read().strip().split(','))
+        with open(os.path.join(sysfs, 'bits_per_pixel'), 'r') as f:
+            bpp = int(f.read())
+        with open(os.path.join(sysfs, 'stride'), 'r') as f:
+            stride = int(f.read())
+        return width, height, bpp, stride
+    except (OSError, ValueError):
+        width, height, bpp = fallback
+        return width, height, bpp, width * bpp // 8
+
+
+def index_map(src_width, src_height, src_stride, width, height, mode='fit', origin=(0, 0)):
+    """
+    Карта индексов пикселей источника для каждого пикселя дисплея
+
+    Args:
+        src_width (int): Ширина источника
+        src_height (int): Высота источника
+        src_stride (int): Длина строки источника в пикселях
+        width (int): Ширина дисплея
+        height (int): Высота дисплея
+        mode (str): 'fit' - масштаб с сохранением пропорций, 'crop' - вырезка
+        origin (tuple): Левый верхний угол вырезки (для 'crop')
+
+    Returns:
+        tuple: (индексы height x width, маска пикселей вне источника или None)
+    """
+    if mode == 'crop':
+        xs = np.arange(width) + origin[0]
+        ys = np.arange(height) + origin[1]
+    else:
+        # Ближайший сосед; поля по короткой стороне остаются черными
+        scale = max(src_width / width, src_height / height)
+        xs = np.floor((np.arange(width) - width / 2 + 0.5) * scale + src_width / 2).astype(np.int64)
+        ys = np.floor((np.arange(height) - height / 2 + 0.5) * scale + src_height / 2).astype(np.int64)
+
+    outside = (ys[:, None] < 0) | (ys[:, None] >= src_height) | (xs[None, :] < 0) | (xs[None, :] >= src_width)
+    index = np.clip(ys, 0, src_height - 1)[:, None] * src_stride + np.clip(xs, 0, src_width - 1)[None, :]
+    return index, (outside if outside.any() else None)
+
+
+def tile_hashes(frame, tile):
+    """
+    Хэши плиток кадра (взвешенная сумма пикселей по модулю 2^64)
+
+    Args:
+        frame: Кадр (массив uint16 height x width)
+        tile (int): Размер плитки
+
+    Returns:
+        Массив uint64 (строки x столбцы плиток)
+    """
+    height, width = frame.shape
+    rows = -(-height // tile)
+    cols = -(-width // tile)
+    if (rows * tile, cols * tile) != (height, width):
+        padded = np.zeros((rows * tile, cols * tile), dtype=frame.dtype)
+        padded[:height, :width] = frame
+        frame = padded
+
+    weights = _WEIGHTS.get(tile)
+    if weights is None:
+        generator = np.random.default_rng(tile)
+        weights = generator.integers(0, 2 ** 63, size=(tile, tile), dtype=np.uint64) * 2 + 1
+        _WEIGHTS[tile] = weights
+
+    blocks = frame.reshape(rows, tile, cols, tile).astype(np.uint64)
+    return (blocks * weights[None, :, None, :]).sum(axis=(1, 3), dtype=np.uint64)
+
+
+class FramebufferMirror:
+    """
+    Зеркало кадрового буфера на дисплее
+
+    Опрос адаптивный: пока картинка не меняется, интервал растет до
+    max_interval; первое же изменение возвращает его к min_interval.
+    """
+
+    def __init__(self, lcd, device=FBCP_CONFIG['device'], geometry=None,
+                 mode=FBCP_CONFIG['mode'], origin=FBCP_CONFIG['crop_origin']):
+        """
+        Args:
+            lcd: Экземпляр LCDGame (или RemoteLCD)
+            device (str): Устройство кадрового буфера или обычный файл
+            geometry (tuple): (ширина, высота, бит на пиксель, длина строки);
+                по умолчанию framebuffer_geometry(device)
+            mode (str): 'fit' или 'crop'
+            origin (tuple): Угол вырезки для 'crop'
+        """
+        self.lcd = lcd
+        self.device = device
+        self.tile = FBCP_CONFIG['tile_size']
+        self.min_interval = FBCP_CONFIG['min_interval']
+        self.max_interval = FBCP_CONFIG['max_interval']
+        self.interval = self.min_interval
+        self.hashes = None
+        self.frames = 0
+        self.regions = 0
+
+        src_width, src_height, self.bpp, stride = geometry or framebuffer_geometry(device)
+        if self.bpp == 16:
+            dtype = np.dtype('<u2')
+        elif self.bpp == 32:
+            dtype = np.dtype('<u4')
+        else:
+            raise ValueError(f"неподдерживаемый формат: {self.bpp} бит на пиксель")
+
+        with open(device, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), stride * src_height, access=mmap.ACCESS_READ)
+        self.source = np.frombuffer(self.map, dtype=dtype)
+        self.index, self.outside = index_map(src_width, src_height, stride // dtype.itemsize,
+                                             lcd.width, lcd.height, mode, origin)
+
+    def capture(self):
+        """
+        Текущий кадр источника в формате дисплея
+
+        Returns:
+            Массив '>u2' (RGB565, старший байт первым) height x width
+        """
+        pixels = self.source[self.index]
+        if self.bpp == 32:
+            # XRGB8888 -> RGB565
+            pixels = ((pixels >> 8) & 0xF800) | ((pixels >> 5) & 0x07E0) | ((pixels >> 3) & 0x001F)
+        frame = pixels.astype('>u2')
+        if self.outside is not None:
+            frame[self.outside] = 0
+        return frame
+
+    def step(self):
+        """
+        Один проход: захват, сравнение, отправка изменившихся областей
+
+        Returns:
+            int: Количество отправленных областей
+        """
+        frame = self.capture()
+        hashes = tile_hashes(frame, self.tile)
+        if self.hashes is None:
+            rects = [(0, 0, self.lcd.width, self.lcd.height)]
+        else:
+            rects = tile_rects(hashes != self.hashes, self.tile, self.lcd.width, self.lcd.height)
+        self.hashes = hashes
+
+        if not rects:
+            self.interval = min(self.max_interval, self.interval * 1.5)
+            return 0
+        self.interval = self.min_interval
+
+        area = sum(width * height for _, _, width, height in rects)
+        if area * 2 >= self.lcd.width * self.lcd.height:
+            # Больше половины экрана - одна передача вместо множества окон
+            self.lcd.write_frame(frame.tobytes())
+            rects = [(0, 0, self.lcd.width, self.lcd.height)]
+        else:
+            for x, y, width, height in rects:
+                self.lcd.write_region(x, y, width, height, frame[y:y + height, x:x + width].tobytes())
+
+        self.frames += 1
+        self.regions += len(rects)
+        return len(rects)
+
+    def run(self, stop_event=None):
+        """
+        Цикл зеркалирования
+
+        Args:
+            stop_event: threading.Event для остановки (по умолчанию - до Ctrl+C)
+        """
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            start = time.perf_counter()
+            self.step()
+            pause = self.interval - (time.perf_counter() - start)
+            if pause > 0:
+                stop_event.wait(pause)
+
+    def close(self):
+        """Закрытие отображения буфера"""
+        self.source = None
+        self.map.close()
+
+
+def main():
+    from display_server import open_display
+
+    device = sys.argv[1] if len(sys.argv) > 1 else FBCP_CONFIG['device']
+    lcd = open_display()
+    try:
+        mirror = FramebufferMirror(lcd, device)
+    except (OSError, ValueError) as e:
+        print(f"Не удалось открыть кадровый буфер {device}: {e}")
+        lcd.cleanup()
+        sys.exit(1)
+
+    print(f"Зеркалирование {device} на дисплей (Ctrl+C для выхода)")
+    try:
+        mirror.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"Кадров: {mirror.frames}, областей: {mirror.regions}")
+        mirror.close()
+        lcd.cleanup()
+
+
+if __name__ == "__main__":
+    main()
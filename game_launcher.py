@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Быстрый запуск игр с рабочего стола
+Заранее созданный процесс-заготовка (в стиле forkserver) уже импортировал
+PIL, numpy и модули игр и унаследовал инициализированный дисплей
+"""
+
+import os
+import sys
+import signal
+import importlib
+from config import *
+
+
+def load_game_class(entry):
+    """
+    Загрузка класса игры по строке "модуль:Класс"
+
+    Args:
+        entry (str): Например, "examples.snake_game:SnakeGame"
+
+    Returns:
+        type: Подкласс GameEngine
+    """
+    module_name, _, class_name = entry.partition(':')
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+class GameLauncher:
+    """
+    Запуск игр в отдельном процессе без повторной инициализации дисплея
+
+    start() порождает процесс-заготовку, пока в рабочем столе еще нет
+    фоновых потоков. Заготовка импортирует игры и ждет команд по каналу;
+    на каждую команду она делает fork, и дочерний процесс запускает игру
+    с унаследованными дескриптором SPI и состоянием GPIO. Рабочий стол на
+    время игры не обращается к дисплею, а после выхода перерисовывает экран.
+
+    Если заготовку создать не удалось, игра запускается в текущем процессе.
+    """
+
+    def __init__(self, lcd, games=None, exit_button=LAUNCHER_CONFIG['exit_button']):
+        """
+        Инициализация запускателя
+
+        Args:
+            lcd: Экземпляр LCDGame (уже инициализированный)
+            games (dict): Название игры -> "модуль:Класс"
+                (по умолчанию LAUNCHER_CONFIG['games'])
+            exit_button (str): Кнопка выхода из игры на рабочий стол
+        """
+        self.lcd = lcd
+        self.games = dict(LAUNCHER_CONFIG['games'] if games is None else games)
+        self.exit_button = exit_button
+        self.pid = None
+        self._command = None
+        self._result = None
+
+    @property
+    def available(self):
+        """Запущена ли заготовка"""
+        return self.pid is not None
+
+    def has_game(self, name):
+        """Есть ли для игры реализация"""
+        return self.games.get(name) is not None
+
+    def start(self):
+        """
+        Создание процесса-заготовки
+
+        Вызывать до запуска фоновых потоков: fork копирует только
+        вызывающий поток, и блокировки других потоков остались бы занятыми.
+
+        Returns:
+            bool: True если заготовка запущена
+        """
+        if self.pid is not None or not LAUNCHER_CONFIG['enabled'] or not hasattr(os, 'fork'):
+            return self.available
+
+        try:
+            command_read, command_write = os.pipe()
+            result_read, result_write = os.pipe()
+            pid = os.fork()
+        except OSError as e:
+            print(f"Не удалось создать процесс запуска игр: {e}")
+            return False
+
+        if pid == 0:
+            os.close(command_write)
+            os.close(result_read)
+            self._serve(command_read, result_write)
+            os._exit(0)
+
+        os.close(command_read)
+        os.close(result_write)
+        self.pid = pid
+        self._command = os.fdopen(command_write, 'w', buffering=1)
+        self._result = os.fdopen(result_read, 'r')
+        return True
+
+    def _serve(self, command_fd, result_fd):
+        """Цикл процесса-заготовки"""
+        # Ctrl+C обрабатывает рабочий стол; завершение - по закрытию канала
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+        # Предварительный импорт: в дочернем процессе игры он уже не нужен
+        classes = {}
+        for name, entry in self.games.items():
+            if entry is None:
+                continue
+            try:
+                classes[name] = load_game_class(entry)
+            except Exception as e:
+                print(f"Ошибка загрузки игры {name}: {e}")
+
+        commands = os.fdopen(command_fd, 'r')
+        results = os.fdopen(result_fd, 'w', buffering=1)
+        for line in commands:
+            name = line.rstrip('\n')
+            game_class = classes.get(name)
+            if game_class is None:
+                results.write("-1\n")
+                continue
+
+            pid = os.fork()
+            if pid == 0:
+                status = 1
+                try:
+                    self.lcd.after_fork()
+                    self._play(game_class)
+                    status = 0
+                finally:
+                    sys.stdout.flush()
+                    # Без atexit и cleanup(): дисплей и GPIO принадлежат рабочему столу
+                    os._exit(status)
+
+            _, status = os.waitpid(pid, 0)
+            results.write(f"{os.waitstatus_to_exitcode(status)}\n")
+
+    def _play(self, game_class):
+        """Запуск игры в текущем процессе"""
+        game = game_class(self.lcd)
+        game.exit_button = self.exit_button
+        try:
+            game.start()
+        except Exception as e:
+            print(f"Ошибка в игре: {e}")
+            raise
+
+    def launch(self, name):
+        """
+        Запуск игры и ожидание ее завершения
+
+        Args:
+            name (str): Название игры
+
+        Returns:
+            bool: True если игра была запущена
+        """
+        entry = self.games.get(name)
+        if entry is None:
+            print(f"Игра {name} недоступна")
+            return False
+
+        if self.pid is None:
+            try:
+                self._play(load_game_class(entry))
+            except Exception:
+                return False
+            return True
+
+        try:
+            self._command.write(name + "\n")
+            reply = self._result.readline()
+        except OSError as e:
+            print(f"Процесс запуска игр недоступен: {e}")
+            reply = ""
+
+        if not reply:
+            # Заготовка завершилась - дальше игры запускаются в текущем процессе
+            self.stop()
+            return False
+
+        code = int(reply)
+        if code != 0 and DEBUG:
+            print(f"Игра {name} завершилась с кодом {code}")
+        return code >= 0
+
+    def stop(self):
+        """Завершение процесса-заготовки"""
+        if self.pid is None:
+            return
+        for stream in (self._command, self._result):
+            try:
+                stream.close()
+            except OSError:
+                pass
+        try:
+            os.waitpid(self.pid, 0)
+        except ChildProcessError:
+            pass
+        self.pid = None
+        self._command = None
+        self._result = None
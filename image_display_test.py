@@ -6,7 +6,7 @@
 
 import time
 from PIL import Image, ImageDraw, ImageFont
-from lcd_game import LCDGame
+from display_server import open_display
 from config import COLORS
 
 def create_test_image():
@@ -56,7 +56,7 @@ def display_image_test():
         print("✓ Изображение создано")
 
         print("Инициализация LCD дисплея...")
-        lcd = LCDGame()
+        lcd = open_display()
         print("✓ LCD дисплей инициализирован")
 
         print("Отображение изображения...")
@@ -31,18 +31,9 @@ fi
 
 # Создание резервной копии
 echo "Создание резервной копии..."
-BACKUP_DIR="/opt/lcd_game_backup/$(date +%Y%m%d_%H%M%S)"
-mkdir -p "$BACKUP_DIR"
-
-if [ -f /boot/config.txt ]; then
-    cp /boot/config.txt "$BACKUP_DIR/"
-    echo "✓ Резервная копия config.txt создана"
-fi
-
-if [ -f /etc/X11/xorg.conf.d/99-calibration.conf ]; then
-    cp /etc/X11/xorg.conf.d/99-calibration.conf "$BACKUP_DIR/"
-    echo "✓ Резервная копия калибровки создана"
-fi
+# Хранилище с адресацией по содержимому: неизменившиеся файлы не копируются
+BACKUP_DIR="/opt/lcd_game_backup"
+python3 backup_store.py --root "$BACKUP_DIR" backup /boot/config.txt /etc/X11/xorg.conf.d/99-calibration.conf
 
 # Обновление системы
 echo "Обновление системы..."
@@ -128,6 +119,7 @@ pip3 install PyMouse
 echo "Копирование файлов..."
 cp *.py "$INSTALL_PATH/"
 cp requirements.txt "$INSTALL_PATH/"
+cp splash_logo.rgb565 "$INSTALL_PATH/" 2>/dev/null || true
 chown -R pi:pi "$INSTALL_PATH"
 chmod +x "$INSTALL_PATH"/*.py
 
@@ -174,108 +166,14 @@ chown pi:pi /var/log/lcd_game
 
 # Создание systemd сервиса
 echo "Создание systemd сервиса..."
-cat > /etc/systemd/system/lcd-game.service << EOF
-[Unit]
-Description=LCD Game Driver Service
-After=network.target
-
-[Service]
-Type=simple
-User=pi
-Group=pi
-WorkingDirectory=$INSTALL_PATH
-Environment=PATH=$INSTALL_PATH/venv/bin
-ExecStart=$INSTALL_PATH/venv/bin/python3 $INSTALL_PATH/main.py
-Restart=always
-RestartSec=10
-
-[Install]
-WantedBy=multi-user.target
-EOF
+# Unit-файлы основного сервиса, сервера дисплея и ранней заставки формирует system_manager.py
+"$INSTALL_PATH/venv/bin/python3" "$INSTALL_PATH/early_splash.py" --build
+"$INSTALL_PATH/venv/bin/python3" "$INSTALL_PATH/system_manager.py" --write-units
 
 # Создание эмулятора мыши
 echo "Создание эмулятора мыши..."
-cat > "$INSTALL_PATH/mouse_emulator.py" << 'EOF'
-#!/usr/bin/env python3
-"""
-Эмулятор мыши для LCD Game Driver
-"""
-
-from pymouse import PyMouse
-import time
-import RPi.GPIO as GPIO
-
-# Настройка GPIO
-GPIO.setmode(GPIO.BCM)
-
-# Настройка кнопок (BCM нумерация)
-BUTTON_PINS = {
-    'A': 21,
-    'B': 20,
-    'UP': 16,
-    'DOWN': 5,
-    'LEFT': 6,
-    'RIGHT': 13,
-    'START': 19,
-    'SELECT': 26,
-    'MENU': 17
-}
-
-# Настройка кнопок
-for button_name, pin in BUTTON_PINS.items():
-    GPIO.setup(pin, GPIO.IN, GPIO.PUD_UP)
-
-def main():
-    m = PyMouse()
-    button_flags = {}
-    
-    for button_name in BUTTON_PINS.keys():
-        button_flags[button_name] = False
-    
-    print("Эмулятор мыши запущен...")
-    
-    while True:
-        current_pos = m.position()
-        
-        # Обработка кнопок
-        for button_name, pin in BUTTON_PINS.items():
-            if not GPIO.input(pin):  # Кнопка нажата
-                if not button_flags[button_name]:
-                    button_flags[button_name] = True
-                    
-                    if button_name in ['A', 'B']:
-                        # Эмуляция клика
-                        click_type = 1 if button_name == 'A' else 2
-                        m.click(current_pos[0], current_pos[1], click_type)
-                        print(f"Клик: {button_name}")
-                    else:
-                        # Эмуляция движения мыши
-                        move_speed = 5
-                        if button_name == 'UP':
-                            m.move(current_pos[0], current_pos[1] - move_speed)
-                        elif button_name == 'DOWN':
-                            m.move(current_pos[0], current_pos[1] + move_speed)
-                        elif button_name == 'LEFT':
-                            m.move(current_pos[0] - move_speed, current_pos[1])
-                        elif button_name == 'RIGHT':
-                            m.move(current_pos[0] + move_speed, current_pos[1])
-                        
-                        print(f"Движение: {button_name}")
-            
-            elif button_flags[button_name]:  # Кнопка отпущена
-                button_flags[button_name] = False
-        
-        time.sleep(0.02)  # Poll every 20ms
-
-if __name__ == "__main__":
-    try:
-        main()
-    except KeyboardInterrupt:
-        print("\nЭмулятор мыши остановлен")
-        GPIO.cleanup()
-EOF
-
-chmod +x "$INSTALL_PATH/mouse_emulator.py"
+# Эмулятор читает кнопки через сервер дисплея (текст скрипта - в system_manager.py)
+"$INSTALL_PATH/venv/bin/python3" "$INSTALL_PATH/system_manager.py" --mouse-emulator
 
 # Создание автозапуска
 echo "Создание автозапуска..."
@@ -379,13 +277,13 @@ cat > "$INSTALL_PATH/test_display.py" << 'EOF'
 
 import sys
 import time
-from lcd_game import LCDGame
+from display_server import open_display
 
 def test_display():
     """Тестирование дисплея"""
     try:
         print("Инициализация LCD дисплея...")
-        lcd = LCDGame()
+        lcd = open_display()  # Через сервер дисплея, если он запущен
         
         print("Очистка экрана...")
         lcd.clear()
@@ -484,9 +382,9 @@ sudo /opt/lcd_game_driver/mouse_emulator.py
 
 ### Базовый пример
 ```python
-from lcd_game import LCDGame
+from display_server import open_display
 
-lcd = LCDGame()
+lcd = open_display()
 lcd.clear()
 lcd.draw_text("Hello World!", 10, 10)
 lcd.update()
@@ -494,7 +392,8 @@ lcd.update()
 
 ### Игровой пример
 ```python
-from lcd_game import LCDGame, GameEngine
+from display_server import open_display
+from lcd_game import GameEngine
 
 class MyGame(GameEngine):
     def update(self, delta_time):
@@ -507,7 +406,7 @@ class MyGame(GameEngine):
         self.lcd.draw_text("Game Running", 10, 10)
         self.lcd.update()
 
-game = MyGame(LCDGame())
+game = MyGame(open_display())
 game.start()
 ```
 EOF
@@ -519,6 +418,8 @@ systemctl daemon-reload
 # Включение автозапуска сервиса
 echo "Включение автозапуска сервиса..."
 systemctl enable lcd-game.service
+systemctl enable lcd-game-display.service
+systemctl enable lcd-game-splash.service
 
 echo "=========================================="
 echo "Установка завершена успешно!"
@@ -542,7 +443,7 @@ echo ""
 echo "Документация находится в:"
 echo "$INSTALL_PATH/docs/"
 echo ""
-echo "Резервная копия создана в:"
+echo "Резервные копии (восстановление: sudo python3 $INSTALL_PATH/backup_store.py restore /boot/config.txt):"
 echo "$BACKUP_DIR"
 echo ""
 echo "Перезагрузите систему для применения всех изменений:"
@@ -5,26 +5,59 @@
 """
 
 import time
-import spidev
-import RPi.GPIO as GPIO
+import random
 from PIL import Image, ImageDraw, ImageFont
 import numpy as np
 from config import *
+from perf_stats import FrameStats, PerfHUD, startup
+from backends import create_backend, GpioButtonSource
+
+# Загруженные шрифты по размеру: truetype читает и разбирает файл шрифта,
+# поэтому каждый размер загружается один раз
+_fonts = {}
+
+def load_font(font_size):
+    """
+    Шрифт заданного размера (из кэша)
+    
+    Args:
+        font_size (int): Размер шрифта
+        
+    Returns:
+        ImageFont: Шрифт FONT_PATH, DejaVuSans или встроенный шрифт PIL
+    """
+    font = _fonts.get(font_size)
+    if font is None:
+        try:
+            font = ImageFont.truetype(FONT_PATH, font_size)
+        except Exception:
+            try:
+                font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", font_size)
+            except Exception:
+                font = ImageFont.load_default()
+        _fonts[font_size] = font
+    return font
 
 class ButtonManager:
     """
     Менеджер кнопок для игрового устройства
     """
     
-    def __init__(self):
-        """Инициализация менеджера кнопок"""
+    def __init__(self, source=None):
+        """
+        Инициализация менеджера кнопок
+        
+        Args:
+            source: Источник состояния кнопок (по умолчанию пины GPIO)
+        """
+        self.source = source or GpioButtonSource()
         self.button_states = {}
         self.button_callbacks = {}
         self.last_press_time = {}
         
-        # Настройка GPIO для кнопок
+        # Настройка пинов кнопок
         for button_name, pin in BUTTON_PINS.items():
-            GPIO.setup(pin, GPIO.IN, pull_up_down=GPIO.PUD_UP if BUTTON_PULL_UP else GPIO.PUD_DOWN)
+            self.source.setup(pin)
             self.button_states[button_name] = False
             self.last_press_time[button_name] = 0
     
@@ -41,8 +74,7 @@ class ButtonManager:
         if button_name not in BUTTON_PINS:
             return False
             
-        pin = BUTTON_PINS[button_name]
-        current_state = GPIO.input(pin) == GPIO.LOW if BUTTON_PULL_UP else GPIO.input(pin) == GPIO.HIGH
+        current_state = self.source.is_active(BUTTON_PINS[button_name])
         
         # Проверка дребезга
         current_time = time.time()
@@ -69,8 +101,7 @@ class ButtonManager:
         if button_name not in BUTTON_PINS:
             return False
             
-        pin = BUTTON_PINS[button_name]
-        return GPIO.input(pin) == GPIO.LOW if BUTTON_PULL_UP else GPIO.input(pin) == GPIO.HIGH
+        return self.source.is_active(BUTTON_PINS[button_name])
     
     def get_all_pressed(self):
         """
@@ -84,13 +115,47 @@ class ButtonManager:
             if self.is_pressed(button_name):
                 pressed.append(button_name)
         return pressed
+    
+    def enable_events(self, callback):
+        """
+        Уведомления о нажатиях по фронту сигнала вместо опроса
+        
+        Подавление дребезга выполняет источник (bouncetime RPi.GPIO).
+        Обработчик вызывается из потока RPi.GPIO.
+        
+        Args:
+            callback: Функция, получающая имя нажатой кнопки
+            
+        Returns:
+            bool: True если детектирование фронтов включено для всех кнопок
+        """
+        bouncetime = max(1, int(BUTTON_DEBOUNCE_TIME * 1000))
+        try:
+            for button_name, pin in BUTTON_PINS.items():
+                self.button_callbacks[button_name] = callback
+                self.source.add_edge_callback(pin, lambda channel, name=button_name: callback(name),
+                                              bouncetime)
+            return True
+        except Exception as e:
+            print(f"Детектирование фронтов недоступно, используется опрос: {e}")
+            self.disable_events()
+            return False
+    
+    def disable_events(self):
+        """Отключение уведомлений о нажатиях"""
+        for button_name in list(self.button_callbacks):
+            try:
+                self.source.remove_edge_callback(BUTTON_PINS[button_name])
+            except Exception:
+                pass
+        self.button_callbacks.clear()
 
 class LCDGame:
     """
     Драйвер для 1.54 inch LCD GAME дисплея на CM4
     """
     
-    def __init__(self, rotation=0, spi_bus=SPI_BUS, spi_device=SPI_DEVICE):
+    def __init__(self, rotation=0, spi_bus=SPI_BUS, spi_device=SPI_DEVICE, backend=None):
         """
         Инициализация драйвера LCD дисплея
         
@@ -98,42 +163,38 @@ class LCDGame:
             rotation (int): Поворот дисплея (0, 90, 180, 270)
             spi_bus (int): Номер SPI шины
             spi_device (int): Номер SPI устройства
+            backend: Бэкенд вывода (по умолчанию DISPLAY_BACKEND из config.py)
         """
         self.width = DISPLAY_WIDTH
         self.height = DISPLAY_HEIGHT
         self.rotation = rotation
-        self.spi = None
+        self.backend = None
+        self.stats = FrameStats()
+        self.sleeping = False
+        self.panel_preinitialized = False
         
         try:
-            # Настройка GPIO
-            GPIO.setmode(GPIO.BCM)
-            GPIO.setwarnings(False)  # Отключаем предупреждения
-            
-            # Настройка пинов дисплея
-            GPIO.setup(PIN_RESET, GPIO.OUT)
-            GPIO.setup(PIN_DC, GPIO.OUT)
-            GPIO.setup(PIN_CS, GPIO.OUT)
-            GPIO.setup(PIN_BACKLIGHT, GPIO.OUT)
-            
-            # Настройка SPI
-            self.spi = spidev.SpiDev()
-            self.spi.open(spi_bus, spi_device)
-            self.spi.max_speed_hz = SPI_SPEED
-            self.spi.mode = 0
-            self.spi.bits_per_word = 8
+            # Настройка пинов дисплея и шины
+            self.backend = backend or create_backend(spi_bus=spi_bus, spi_device=spi_device)
+            # Панель уже инициализирована ранней заставкой и показывает логотип
+            self.panel_preinitialized = self.backend.preinitialized
+            self.backend.open()
+            startup.mark_once('gpio setup')
             
-            # Инициализация дисплея
-            self._init_display()
+            # Инициализация дисплея (без сброса, если панель уже готова)
+            if not self.panel_preinitialized:
+                self._init_display()
+            startup.mark_once('panel init')
             
             # Создание буфера изображения
             self.buffer = Image.new('RGB', (self.width, self.height), color=(0, 0, 0))
             self.draw = ImageDraw.Draw(self.buffer)
             
             # Включение подсветки
-            GPIO.output(PIN_BACKLIGHT, GPIO.HIGH)
+            self.backend.set_backlight(True)
             
             # Инициализация менеджера кнопок
-            self.buttons = ButtonManager()
+            self.buttons = ButtonManager(self.backend.button_source())
             
         except Exception as e:
             print(f"Ошибка инициализации LCD: {e}")
@@ -144,19 +205,14 @@ class LCDGame:
         """Инициализация дисплея ST7789"""
         try:
             # Сброс дисплея
-            GPIO.output(PIN_RESET, GPIO.HIGH)
-            time.sleep(0.01)
-            GPIO.output(PIN_RESET, GPIO.LOW)
-            time.sleep(0.01)
-            GPIO.output(PIN_RESET, GPIO.HIGH)
-            time.sleep(0.01)
+            self.backend.reset()
             
             # Используем команды из конфигурации
             for cmd, data in ST7789_INIT_COMMANDS:
                 self._write_command(cmd)
                 if data:
                     self._write_data(data)
-                time.sleep(0.01)
+                self.backend.delay(0.01)
                 
         except Exception as e:
             print(f"Ошибка инициализации дисплея: {e}")
@@ -165,10 +221,7 @@ class LCDGame:
     def _write_command(self, cmd):
         """Отправка команды на дисплей"""
         try:
-            GPIO.output(PIN_DC, GPIO.LOW)
-            GPIO.output(PIN_CS, GPIO.LOW)
-            self.spi.writebytes([cmd])
-            GPIO.output(PIN_CS, GPIO.HIGH)
+            self.backend.command(cmd)
         except Exception as e:
             print(f"Ошибка отправки команды: {e}")
             raise
@@ -176,13 +229,7 @@ class LCDGame:
     def _write_data(self, data):
         """Отправка данных на дисплей"""
         try:
-            GPIO.output(PIN_DC, GPIO.HIGH)
-            GPIO.output(PIN_CS, GPIO.LOW)
-            if isinstance(data, list):
-                self.spi.writebytes(data)
-            else:
-                self.spi.writebytes([data])
-            GPIO.output(PIN_CS, GPIO.HIGH)
+            self.backend.data(data if isinstance(data, list) else [data])
         except Exception as e:
             print(f"Ошибка отправки данных: {e}")
             raise
@@ -213,32 +260,112 @@ class LCDGame:
         except Exception as e:
             print(f"Ошибка очистки экрана: {e}")
     
+    def _convert_rgb565(self, image):
+        """
+        Конвертация изображения в байты RGB565
+        
+        Args:
+            image: Изображение PIL
+            
+        Returns:
+            bytes: Байты пикселей (старший байт первым)
+        """
+        pixels = np.asarray(image.convert('RGB'), dtype=np.uint16)
+        r = pixels[..., 0]
+        g = pixels[..., 1]
+        b = pixels[..., 2]
+        # Конвертация в RGB565 для всего кадра сразу
+        rgb565 = ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
+        return rgb565.astype('>u2').tobytes()
+    
+    def _flush_window(self, x_start, y_start, x_end, y_end, data):
+        """Отправка готовых байт RGB565 в область дисплея"""
+        start = time.perf_counter()
+        
+        # Окно (CASET/RASET/RAMWR) и данные
+        self.backend.write_window(x_start, y_start, x_end, y_end, data)
+        
+        self.stats.record('transfer', time.perf_counter() - start)
+        full_frame = (x_start, y_start, x_end, y_end) == (0, 0, self.width - 1, self.height - 1)
+        self.stats.add_bytes(len(data), full_frame=full_frame)
+        startup.mark_once('first frame')
+    
     def update(self):
         """Обновление дисплея"""
+        if self.sleeping:
+            # Контроллер в режиме сна - передача бессмысленна
+            return
         try:
-            # Конвертация RGB в RGB565
-            img_data = self.buffer.convert('RGB')
-            pixels = list(img_data.getdata())
+            start = time.perf_counter()
+            data = self._convert_rgb565(self.buffer)
+            self.stats.record('convert', time.perf_counter() - start)
+            
+            self._flush_window(0, 0, self.width - 1, self.height - 1, data)
             
-            # Установка области отображения
-            self._set_window(0, 0, self.width - 1, self.height - 1)
+        except Exception as e:
+            print(f"Ошибка обновления дисплея: {e}")
+    
+    def write_frame(self, data):
+        """
+        Отправка готового кадра RGB565 на весь экран без конвертации
+        
+        Args:
+            data (bytes): Байты RGB565 размером width * height * 2
+        """
+        if self.sleeping:
+            return
+        try:
+            self._flush_window(0, 0, self.width - 1, self.height - 1, data)
+        except Exception as e:
+            print(f"Ошибка вывода кадра: {e}")
+    
+    def write_region(self, x, y, width, height, data):
+        """
+        Отправка готовых байт RGB565 в прямоугольную область без конвертации
+        
+        Args:
+            x (int): Левая граница
+            y (int): Верхняя граница
+            width (int): Ширина
+            height (int): Высота
+            data: Байты RGB565 размером width * height * 2 (bytes или memoryview)
+        """
+        if self.sleeping:
+            return
+        try:
+            self._flush_window(x, y, x + width - 1, y + height - 1, data)
+        except Exception as e:
+            print(f"Ошибка вывода области: {e}")
+    
+    def update_region(self, x, y, width, height):
+        """
+        Обновление только части дисплея
+        
+        Args:
+            x (int): Левая граница области
+            y (int): Верхняя граница области
+            width (int): Ширина области
+            height (int): Высота области
+        """
+        if self.sleeping:
+            return
+        try:
+            x_start = max(0, x)
+            y_start = max(0, y)
+            x_end = min(self.width, x + width) - 1
+            y_end = min(self.height, y + height) - 1
+            if x_end < x_start or y_end < y_start:
+                return
             
-            # Подготовка данных для отправки
-            data = []
-            for pixel in pixels:
-                r, g, b = pixel
-                # Конвертация в RGB565
-                rgb565 = ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
-                data.extend([rgb565 >> 8, rgb565 & 0xFF])
+            start = time.perf_counter()
+            region = self.buffer.crop((x_start, y_start, x_end + 1, y_end + 1))
+            data = self._convert_rgb565(region)
+            self.stats.record('convert', time.perf_counter() - start)
             
-            # Отправка данных
-            GPIO.output(PIN_DC, GPIO.HIGH)
-            GPIO.output(PIN_CS, GPIO.LOW)
-            self.spi.writebytes(data)
-            GPIO.output(PIN_CS, GPIO.HIGH)
+            self._flush_window(x_start, y_start, x_end, y_end, data)
             
         except Exception as e:
-            print(f"Ошибка обновления дисплея: {e}")
+            print(f"Ошибка частичного обновления дисплея: {e}")
     
     def draw_pixel(self, x, y, color=(255, 255, 255)):
         """Рисование пикселя"""
@@ -266,15 +393,12 @@ class LCDGame:
     
     def draw_text(self, text, x, y, color=(255, 255, 255), font_size=12):
         """Рисование текста"""
-        try:
-            font = ImageFont.truetype(FONT_PATH, font_size)
-        except:
-            try:
-                font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", font_size)
-            except:
-                font = ImageFont.load_default()
-        
-        self.draw.text((x, y), text, fill=color, font=font)
+        self.draw.text((x, y), text, fill=color, font=load_font(font_size))
+    
+    def preload_fonts(self, sizes=FONT_PRELOAD_SIZES):
+        """Предварительная загрузка шрифтов (например, во время заставки)"""
+        for font_size in sizes:
+            load_font(font_size)
     
     def draw_image(self, image_path, x, y):
         """Отображение изображения"""
@@ -286,7 +410,28 @@ class LCDGame:
     
     def set_backlight(self, state):
         """Управление подсветкой"""
-        GPIO.output(PIN_BACKLIGHT, GPIO.HIGH if state else GPIO.LOW)
+        self.backend.set_backlight(state)
+    
+    def sleep(self):
+        """Перевод контроллера в режим сна (SLPIN)"""
+        if self.sleeping:
+            return
+        self._write_command(0x10)
+        self.backend.delay(0.005)
+        self.sleeping = True
+    
+    def wake(self):
+        """
+        Выход контроллера из режима сна (SLPOUT)
+        
+        Содержимое памяти дисплея после сна не гарантируется, поэтому
+        после пробуждения нужно одно полное обновление экрана.
+        """
+        if not self.sleeping:
+            return
+        self._write_command(0x11)
+        self.backend.delay(0.12)  # ST7789 требует 120 мс после SLPOUT
+        self.sleeping = False
     
     def get_buffer(self):
         """Получение текущего буфера изображения"""
@@ -298,17 +443,337 @@ class LCDGame:
             self.buffer = image
             self.draw = ImageDraw.Draw(self.buffer)
     
+    def watch_buttons(self):
+        """Приложение только читает кнопки (имеет смысл для клиента сервера дисплея)"""
+        pass
+    
+    def after_fork(self):
+        """Вызывается в дочернем процессе игры после fork (оборудование общее)"""
+        pass
+    
     def cleanup(self):
         """Очистка ресурсов"""
-        try:
-            if self.spi:
-                self.spi.close()
-        except:
-            pass
-        try:
-            GPIO.cleanup()
-        except:
-            pass
+        if self.backend:
+            self.backend.close()
+
+
+class Entity:
+    """
+    Игровой объект с прямоугольными границами (AABB)
+    """
+    
+    def __init__(self, x, y, width, height, tag=None):
+        """
+        Инициализация объекта
+        
+        Args:
+            x (int): Левая граница
+            y (int): Верхняя граница
+            width (int): Ширина
+            height (int): Высота
+            tag: Произвольная метка типа объекта
+        """
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.tag = tag
+    
+    def intersects(self, x, y, width, height):
+        """Пересечение с прямоугольником"""
+        return (self.x < x + width and x < self.x + self.width and
+                self.y < y + height and y < self.y + self.height)
+
+
+class SpatialHash:
+    """
+    Равномерная сетка для поиска столкновений
+    
+    Каждая ячейка хранит множество объектов, которые ее касаются.
+    Проверка занятости ячейки и выбор случайной свободной ячейки
+    выполняются за O(1), запрос по прямоугольнику - за время,
+    пропорциональное числу затронутых ячеек.
+    """
+    
+    def __init__(self, width=DISPLAY_WIDTH, height=DISPLAY_HEIGHT, cell_size=10):
+        """
+        Инициализация сетки
+        
+        Args:
+            width (int): Ширина игрового поля
+            height (int): Высота игрового поля
+            cell_size (int): Размер ячейки в пикселях
+        """
+        self.cell_size = cell_size
+        self.cols = (width + cell_size - 1) // cell_size
+        self.rows = (height + cell_size - 1) // cell_size
+        self.clear()
+    
+    def clear(self):
+        """Удаление всех объектов"""
+        self.cells = {}
+        self.entity_cells = {}
+        # Свободные ячейки: список для случайного выбора и индекс для удаления за O(1)
+        self._free = list(range(self.cols * self.rows))
+        self._free_index = {cell: i for i, cell in enumerate(self._free)}
+    
+    def _cells_for(self, x, y, width, height):
+        """Индексы ячеек, которых касается прямоугольник"""
+        size = self.cell_size
+        col_start = max(0, x // size)
+        col_end = min(self.cols - 1, (x + width - 1) // size)
+        row_start = max(0, y // size)
+        row_end = min(self.rows - 1, (y + height - 1) // size)
+        return tuple(row * self.cols + col
+                     for row in range(row_start, row_end + 1)
+                     for col in range(col_start, col_end + 1))
+    
+    def _occupy(self, cell, entity):
+        """Добавление объекта в ячейку"""
+        occupants = self.cells.get(cell)
+        if occupants is None:
+            occupants = self.cells[cell] = set()
+            # Ячейка больше не свободна: меняем местами с последней и удаляем
+            index = self._free_index.pop(cell)
+            last = self._free.pop()
+            if last != cell:
+                self._free[index] = last
+                self._free_index[last] = index
+        occupants.add(entity)
+    
+    def _release(self, cell, entity):
+        """Удаление объекта из ячейки"""
+        occupants = self.cells[cell]
+        occupants.discard(entity)
+        if not occupants:
+            del self.cells[cell]
+            self._free_index[cell] = len(self._free)
+            self._free.append(cell)
+    
+    def insert(self, entity):
+        """Добавление объекта в сетку"""
+        cells = self._cells_for(entity.x, entity.y, entity.width, entity.height)
+        self.entity_cells[entity] = cells
+        for cell in cells:
+            self._occupy(cell, entity)
+    
+    def remove(self, entity):
+        """Удаление объекта из сетки"""
+        for cell in self.entity_cells.pop(entity, ()):
+            self._release(cell, entity)
+    
+    def move(self, entity, x, y):
+        """
+        Перемещение объекта
+        
+        Ячейки пересчитываются, только если объект перешел в другие ячейки.
+        """
+        entity.x = x
+        entity.y = y
+        cells = self._cells_for(x, y, entity.width, entity.height)
+        old_cells = self.entity_cells.get(entity)
+        if cells == old_cells:
+            return
+        self.remove(entity)
+        self.entity_cells[entity] = cells
+        for cell in cells:
+            self._occupy(cell, entity)
+    
+    def query(self, x, y, width, height):
+        """
+        Объекты, пересекающие прямоугольник
+        
+        Returns:
+            set: Найденные объекты
+        """
+        found = set()
+        for cell in self._cells_for(x, y, width, height):
+            occupants = self.cells.get(cell)
+            if occupants:
+                found.update(e for e in occupants if e.intersects(x, y, width, height))
+        return found
+    
+    def collisions(self, entity):
+        """Объекты, пересекающиеся с данным (кроме него самого)"""
+        found = self.query(entity.x, entity.y, entity.width, entity.height)
+        found.discard(entity)
+        return found
+    
+    def is_occupied(self, x, y):
+        """Проверка занятости ячейки, содержащей точку"""
+        if not (0 <= x < self.cols * self.cell_size and 0 <= y < self.rows * self.cell_size):
+            return False
+        return (y // self.cell_size) * self.cols + x // self.cell_size in self.cells
+    
+    def free_count(self):
+        """Количество свободных ячеек"""
+        return len(self._free)
+    
+    def random_free_cell(self, rng=random):
+        """
+        Случайная свободная ячейка
+        
+        Args:
+            rng: Генератор случайных чисел (модуль random или random.Random)
+            
+        Returns:
+            tuple: Координаты левого верхнего угла ячейки (x, y) или None,
+                если свободных ячеек нет
+        """
+        if not self._free:
+            return None
+        cell = self._free[rng.randrange(len(self._free))]
+        row, col = divmod(cell, self.cols)
+        return (col * self.cell_size, row * self.cell_size)
+
+
+class ParticleSystem:
+    """
+    Система частиц на массивах NumPy
+    
+    Положения, скорости, время жизни и цвета хранятся в отдельных массивах
+    (structure of arrays); живые частицы всегда занимают первые count
+    элементов, поэтому обновление и отрисовка выполняются одной
+    векторной операцией без циклов по частицам.
+    """
+    
+    def __init__(self, capacity=PARTICLE_CONFIG['capacity'], width=DISPLAY_WIDTH,
+                 height=DISPLAY_HEIGHT, gravity=0.0, bounce=True):
+        """
+        Инициализация системы частиц
+        
+        Args:
+            capacity (int): Максимальное количество частиц
+            width (int): Ширина области
+            height (int): Высота области
+            gravity (float): Ускорение по оси Y в пикселях/с²
+            bounce (bool): Отражать частицы от границ (иначе удалять)
+        """
+        self.capacity = capacity
+        self.width = width
+        self.height = height
+        self.gravity = gravity
+        self.bounce = bounce
+        self.count = 0
+        
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.vx = np.zeros(capacity, dtype=np.float32)
+        self.vy = np.zeros(capacity, dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.float32)
+        self.max_life = np.ones(capacity, dtype=np.float32)
+        self.color = np.zeros((capacity, 3), dtype=np.uint8)
+        
+        self._rng = np.random.default_rng()
+    
+    def emit(self, count, x, y, speed=(10.0, 40.0), life=(1.0, 3.0), color=(255, 255, 0)):
+        """
+        Создание частиц
+        
+        Args:
+            count (int): Количество частиц
+            x: Координата X источника (число или массив на каждую частицу)
+            y: Координата Y источника (число или массив на каждую частицу)
+            speed (tuple): Диапазон скорости в пикселях/с
+            life (tuple): Диапазон времени жизни в секундах
+            color: Цвет RGB или массив цветов формы (count, 3)
+            
+        Returns:
+            int: Количество фактически созданных частиц
+        """
+        count = min(count, self.capacity - self.count)
+        if count <= 0:
+            return 0
+        
+        start, end = self.count, self.count + count
+        rng = self._rng
+        angle = rng.uniform(0.0, 2.0 * np.pi, count)
+        velocity = rng.uniform(speed[0], speed[1], count)
+        
+        self.x[start:end] = x if np.isscalar(x) else np.asarray(x)[:count]
+        self.y[start:end] = y if np.isscalar(y) else np.asarray(y)[:count]
+        self.vx[start:end] = np.cos(angle) * velocity
+        self.vy[start:end] = np.sin(angle) * velocity
+        self.life[start:end] = rng.uniform(life[0], life[1], count)
+        self.max_life[start:end] = self.life[start:end]
+        self.color[start:end] = np.asarray(color, dtype=np.uint8)[:count] if np.ndim(color) == 2 else color
+        
+        self.count = end
+        return count
+    
+    def emit_random(self, count, **kwargs):
+        """Создание частиц в случайных точках всей области"""
+        count = min(count, self.capacity - self.count)
+        x = self._rng.uniform(0, self.width, count)
+        y = self._rng.uniform(0, self.height, count)
+        return self.emit(count, x, y, **kwargs)
+    
+    def update(self, delta_time):
+        """
+        Интегрирование движения всех частиц
+        
+        Args:
+            delta_time (float): Время с прошлого обновления в секундах
+        """
+        n = self.count
+        if n == 0:
+            return
+        
+        x, y = self.x[:n], self.y[:n]
+        vx, vy = self.vx[:n], self.vy[:n]
+        
+        if self.gravity:
+            vy += self.gravity * delta_time
+        x += vx * delta_time
+        y += vy * delta_time
+        self.life[:n] -= delta_time
+        
+        alive = self.life[:n] > 0
+        if self.bounce:
+            # Отражение от границ
+            out_x = (x < 0) | (x >= self.width)
+            out_y = (y < 0) | (y >= self.height)
+            vx[out_x] *= -1
+            vy[out_y] *= -1
+            np.clip(x, 0, self.width - 1, out=x)
+            np.clip(y, 0, self.height - 1, out=y)
+        else:
+            alive &= (x >= 0) & (x < self.width) & (y >= 0) & (y < self.height)
+        
+        # Уплотнение: живые частицы перемещаются в начало массивов
+        keep = int(np.count_nonzero(alive))
+        if keep < n:
+            for array in (self.x, self.y, self.vx, self.vy, self.life, self.max_life, self.color):
+                array[:keep] = array[:n][alive]
+            self.count = keep
+    
+    def render(self, lcd, background=None, fade=True):
+        """
+        Отрисовка всех частиц в буфер дисплея одной операцией
+        
+        Args:
+            lcd: Экземпляр LCDGame
+            background: Цвет фона RGB (None - рисовать поверх текущего буфера)
+            fade (bool): Затухание цвета по мере окончания жизни частицы
+        """
+        if background is None:
+            frame = np.array(lcd.get_buffer().convert('RGB'))
+        else:
+            frame = np.empty((lcd.height, lcd.width, 3), dtype=np.uint8)
+            frame[:] = background
+        
+        n = self.count
+        if n:
+            xi = self.x[:n].astype(np.intp)
+            yi = self.y[:n].astype(np.intp)
+            visible = (xi >= 0) & (xi < lcd.width) & (yi >= 0) & (yi < lcd.height)
+            colors = self.color[:n]
+            if fade:
+                scale = np.clip(self.life[:n] / self.max_life[:n], 0.0, 1.0)
+                colors = (colors * scale[:, None]).astype(np.uint8)
+            frame[yi[visible], xi[visible]] = colors[visible]
+        
+        lcd.set_buffer(Image.fromarray(frame, 'RGB'))
 
 
 class GameEngine:
@@ -327,6 +792,9 @@ class GameEngine:
         self.running = False
         self.fps = DEFAULT_FPS
         self.last_frame_time = time.time()
+        self.stats = lcd.stats
+        self.hud = PerfHUD(lcd) if PERF_HUD_ENABLED else None
+        self.exit_button = None  # Кнопка выхода из игры (задает запускатель игр)
     
     def start(self):
         """Запуск игрового цикла"""
@@ -337,6 +805,15 @@ class GameEngine:
         """Остановка игрового цикла"""
         self.running = False
     
+    def check_exit(self):
+        """Остановка игры по кнопке выхода"""
+        if self.exit_button and self.lcd.buttons.is_pressed(self.exit_button):
+            self.stop()
+    
+    def show_perf_hud(self, enabled=True):
+        """Включение или выключение оверлея производительности"""
+        self.hud = PerfHUD(self.lcd) if enabled else None
+    
     def game_loop(self):
         """Основной игровой цикл"""
         while self.running:
@@ -345,9 +822,21 @@ class GameEngine:
                 delta_time = current_time - self.last_frame_time
                 
                 if delta_time >= 1.0 / self.fps:
+                    frame_start = time.perf_counter()
+                    self.check_exit()
                     self.handle_input()
+                    input_done = time.perf_counter()
                     self.update(delta_time)
+                    update_done = time.perf_counter()
                     self.render()
+                    if self.hud:
+                        self.hud.draw()
+                    render_done = time.perf_counter()
+                    
+                    self.stats.record('input', input_done - frame_start)
+                    self.stats.record('update', update_done - input_done)
+                    self.stats.record('render', render_done - update_done)
+                    self.stats.end_frame(render_done - frame_start, 1.0 / self.fps)
                     self.last_frame_time = current_time
                 
                 time.sleep(0.001)  # Небольшая задержка для снижения нагрузки на CPU
@@ -358,6 +847,75 @@ class GameEngine:
             except Exception as e:
                 print(f"Ошибка в игровом цикле: {e}")
                 break
+        
+        if DEBUG:
+            print(self.stats.format_report())
+    
+    async def game_loop_async(self, runtime):
+        """
+        Игровой цикл в asyncio-среде
+        
+        Логика игры выполняется в цикле событий, отрисовка с передачей по
+        SPI - в потоке дисплея, поэтому таймеры и фоновые задачи среды
+        продолжают работать во время вывода кадра.
+        
+        Args:
+            runtime: Запущенный экземпляр AsyncRuntime
+        """
+        # Импорт asyncio отложен: он заметно удлиняет холодный старт
+        import asyncio
+        
+        self.last_frame_time = time.time()
+        while self.running and runtime.running:
+            try:
+                current_time = time.time()
+                delta_time = current_time - self.last_frame_time
+                self.last_frame_time = current_time
+                
+                frame_start = time.perf_counter()
+                self.check_exit()
+                self.handle_input()
+                input_done = time.perf_counter()
+                self.update(delta_time)
+                update_done = time.perf_counter()
+                await runtime.run_display(self.render)
+                if self.hud:
+                    await runtime.run_display(self.hud.draw)
+                render_done = time.perf_counter()
+                
+                budget = 1.0 / self.fps
+                self.stats.record('input', input_done - frame_start)
+                self.stats.record('update', update_done - input_done)
+                self.stats.record('render', render_done - update_done)
+                self.stats.end_frame(render_done - frame_start, budget)
+                
+                # Ожидание следующего кадра без блокировки цикла событий
+                await asyncio.sleep(max(0.0, budget - (time.perf_counter() - frame_start)))
+                
+            except asyncio.CancelledError:
+                self.stop()
+                raise
+            except Exception as e:
+                print(f"Ошибка в игровом цикле: {e}")
+                break
+        
+        if DEBUG:
+            print(self.stats.format_report())
+    
+    def start_async(self, runtime=None):
+        """
+        Запуск игрового цикла в asyncio-среде
+        
+        Args:
+            runtime: Экземпляр AsyncRuntime (по умолчанию создается новый)
+        """
+        from async_runtime import AsyncRuntime
+        
+        self.running = True
+        try:
+            (runtime or AsyncRuntime(self.lcd, poll_input=False)).run(self.game_loop_async)
+        except KeyboardInterrupt:
+            self.stop()
     
     def handle_input(self):
         """Обработка ввода (переопределить в наследниках)"""
@@ -8,9 +8,15 @@ import sys
 import time
 import signal
 import os
-from lcd_game import LCDGame
-from boot_splash import BootSplash
-from desktop import Desktop
+import importlib.util
+# Первым импортируется легкий perf_stats: от него отсчитывается хронология запуска
+from perf_stats import startup
+from config import ASYNC_CONFIG, FBDEV_BACKEND_CONFIG, SPI_BUS, SPI_DEVICE
+# Выбор бэкенда дисплея не импортирует модули оборудования
+from backends import backend_name
+
+# Тяжелые модули (PIL, numpy, spidev, psutil, рабочий стол) импортируются
+# при первом использовании: рабочий стол загружается уже под заставкой
 
 class CM4System:
     """
@@ -36,35 +42,55 @@ class CM4System:
         sys.exit(0)
     
     def initialize_system(self):
-        """Инициализация системы"""
+        """Инициализация дисплея и заставки"""
         try:
             print("Инициализация системы CM4...")
             
-            # Инициализация LCD дисплея
-            self.lcd = LCDGame()
+            # Инициализация LCD дисплея (через сервер дисплея, если он запущен)
+            from display_server import open_display
+            startup.mark('import lcd_game')
+            self.lcd = open_display()
             print("LCD дисплей инициализирован")
             
             # Инициализация заставки
+            from boot_splash import BootSplash
+            startup.mark('import splash')
             self.splash = BootSplash(self.lcd)
             print("Заставка инициализирована")
             
-            # Инициализация рабочего стола
-            self.desktop = Desktop(self.lcd)
-            print("Рабочий стол инициализирован")
-            
             return True
             
         except Exception as e:
             print(f"Ошибка инициализации системы: {e}")
             return False
     
+    def initialize_desktop(self):
+        """Загрузка и инициализация рабочего стола (без отрисовки)"""
+        from desktop import Desktop
+        startup.mark('import desktop')
+        self.desktop = Desktop(self.lcd)
+        print("Рабочий стол инициализирован")
+    
+    def warm_up_metrics(self):
+        """Первый опрос метрик и датчиков: рабочий стол сразу покажет значения"""
+        self.desktop.metrics.sample_due()
+        self.desktop.probes.network()
+    
     def show_boot_splash(self):
-        """Показ заставки включения"""
+        """
+        Показ заставки на время загрузки
+        
+        Заставка анимируется в своем потоке, а этапы загрузки выполняются
+        здесь; индикатор отражает завершенные этапы.
+        """
         try:
-            print("Запуск заставки включения...")
-            self.splash.run()
-            print("Заставка завершена")
-            return True
+            ready = self.splash.run([
+                ("Fonts", self.lcd.preload_fonts),
+                ("Desktop", self.initialize_desktop),
+                ("Metrics", self.warm_up_metrics),
+            ])
+            startup.mark('splash done')
+            return ready
         except Exception as e:
             print(f"Ошибка заставки: {e}")
             return False
@@ -73,7 +99,10 @@ class CM4System:
         """Запуск рабочего стола"""
         try:
             print("Запуск рабочего стола...")
-            self.desktop.run()
+            if ASYNC_CONFIG['enabled']:
+                self.desktop.run_async()
+            else:
+                self.desktop.run()
         except Exception as e:
             print(f"Ошибка рабочего стола: {e}")
     
@@ -85,9 +114,9 @@ class CM4System:
                 print("Ошибка инициализации системы")
                 return
             
-            # Показ заставки
+            # Заставка на время загрузки рабочего стола
             if not self.show_boot_splash():
-                print("Ошибка заставки")
+                print("Ошибка загрузки системы")
                 return
             
             # Запуск рабочего стола
@@ -111,35 +140,47 @@ class CM4System:
             print(f"Ошибка очистки: {e}")
 
 def check_dependencies():
-    """Проверка зависимостей"""
-    try:
-        import psutil
-        import RPi.GPIO as GPIO
-        import spidev
-        from PIL import Image, ImageDraw, ImageFont
-        print("Все зависимости доступны")
-        return True
-    except ImportError as e:
-        print(f"Отсутствует зависимость: {e}")
+    """Проверка зависимостей (модули ищутся, но не импортируются)"""
+    modules = ["psutil", "PIL", "numpy"]
+    if backend_name() == 'spi':
+        modules += ["RPi.GPIO", "spidev"]
+    elif backend_name() == 'fbdev':
+        modules += ["RPi.GPIO"]
+    missing = [name for name in modules if _find_module(name) is None]
+    if missing:
+        print(f"Отсутствуют зависимости: {', '.join(missing)}")
         print("Установите зависимости: pip3 install -r requirements.txt")
         return False
+    print("Все зависимости доступны")
+    return True
 
-def check_permissions():
-    """Проверка прав доступа"""
+def _find_module(name):
+    """Поиск модуля без его импорта"""
     try:
-        # Проверка доступа к GPIO
-        import RPi.GPIO as GPIO
-        GPIO.setmode(GPIO.BCM)
-        GPIO.cleanup()
-        print("Права доступа к GPIO в порядке")
-        return True
-    except Exception as e:
-        print(f"Ошибка прав доступа: {e}")
+        return importlib.util.find_spec(name)
+    except (ImportError, ValueError):
+        return None
+
+def check_permissions():
+    """Проверка прав доступа к устройствам GPIO и SPI (без инициализации GPIO)"""
+    devices = {
+        'spi': ["/dev/gpiomem", f"/dev/spidev{SPI_BUS}.{SPI_DEVICE}"],
+        'fbdev': ["/dev/gpiomem", FBDEV_BACKEND_CONFIG['device']],
+    }.get(backend_name(), [])
+    denied = [path for path in devices if os.path.exists(path) and not os.access(path, os.R_OK | os.W_OK)]
+    if denied:
+        print(f"Нет доступа к устройствам: {', '.join(denied)}")
         print("Запустите с правами sudo: sudo python3 main.py")
         return False
+    print("Права доступа к GPIO в порядке")
+    return True
 
 def main():
     """Главная функция"""
+    if "--startup-profile" in sys.argv[1:]:
+        # Отчет выводится после первого кадра рабочего стола
+        startup.print_on('desktop frame')
+    
     print("=" * 50)
     print("SHIWA NETWORK Grand Mini - CM4 System")
     print("=" * 50)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Фоновый сбор системных метрик для рабочего стола
+Отрисовка читает готовый снимок и никогда не ждет системных вызовов
+"""
+
+import os
+import time
+import threading
+from collections import namedtuple
+import psutil
+from probes import ThermalProbe, CpuProbe
+from config import *
+
+MetricsSnapshot = namedtuple('MetricsSnapshot', [
+    'cpu_percent',      # Загрузка CPU, %
+    'memory_percent',   # Занятая память, %
+    'disk_percent',     # Занятое место на корневом разделе, %
+    'load_average',     # Средняя загрузка за 1 минуту
+    'process_count',    # Количество процессов
+    'temperature',      # Температура SoC, °C
+    'uptime',           # Время работы системы, секунды
+    'timestamp',        # Время последнего обновления снимка
+])
+
+# Снимок до первого измерения: все значения неизвестны
+EMPTY_SNAPSHOT = MetricsSnapshot(*([None] * len(MetricsSnapshot._fields)))
+
+
+class MetricsCollector(threading.Thread):
+    """
+    Поток сбора системных метрик
+
+    Каждая метрика опрашивается со своим периодом из METRICS_CONFIG.
+    После каждого прохода публикуется новый неизменяемый снимок;
+    чтение snapshot не блокируется и не выполняет системных вызовов.
+    """
+
+    def __init__(self, intervals=None):
+        """
+        Инициализация сборщика
+
+        Args:
+            intervals (dict): Периоды опроса метрик в секундах
+                (по умолчанию METRICS_CONFIG['intervals'])
+        """
+        super().__init__(name='metrics-collector', daemon=True)
+        self.intervals = dict(METRICS_CONFIG['intervals'])
+        if intervals:
+            self.intervals.update(intervals)
+
+        self._snapshot = EMPTY_SNAPSHOT
+        self._stop_event = threading.Event()
+        self._boot_time = None
+        self._thermal = ThermalProbe()
+        self._cpu = CpuProbe()
+        self._samplers = {
+            'cpu_percent': self._sample_cpu,
+            'memory_percent': lambda: psutil.virtual_memory().percent,
+            'disk_percent': lambda: psutil.disk_usage('/').percent,
+            'load_average': lambda: os.getloadavg()[0],
+            'process_count': lambda: len(psutil.pids()),
+            'temperature': self._thermal.sample,
+            'uptime': self._sample_uptime,
+        }
+        self._next_due = {name: 0.0 for name in self._samplers}
+
+        # Первое чтение /proc/stat только запоминает точку отсчета; загрузка
+        # CPU публикуется через полный интервал, а не по приращению в микросекунды
+        self._cpu.sample()
+        self._next_due['cpu_percent'] = time.monotonic() + self.intervals['cpu_percent']
+
+    @property
+    def snapshot(self):
+        """Последний опубликованный снимок метрик"""
+        return self._snapshot
+
+    def _sample_cpu(self):
+        """Загрузка CPU с момента прошлого вызова (без блокирующего интервала)"""
+        return self._cpu.sample()
+
+    def _sample_uptime(self):
+        """Время работы системы"""
+        if self._boot_time is None:
+            self._boot_time = psutil.boot_time()
+        return time.time() - self._boot_time
+
+    def sample_due(self, now=None):
+        """
+        Опрос метрик, срок которых наступил, и публикация снимка
+
+        Args:
+            now (float): Текущее время time.monotonic()
+
+        Returns:
+            float: Время следующего запланированного опроса
+        """
+        if now is None:
+            now = time.monotonic()
+
+        values = {}
+        for name, sampler in self._samplers.items():
+            if now < self._next_due[name]:
+                continue
+            try:
+                values[name] = sampler()
+            except Exception as e:
+                if DEBUG:
+                    print(f"Ошибка опроса метрики {name}: {e}")
+            self._next_due[name] = now + self.intervals[name]
+
+        if values:
+            # Новый кортеж целиком заменяет старый - читатели видят согласованный снимок
+            self._snapshot = self._snapshot._replace(timestamp=time.time(), **values)
+
+        return min(self._next_due.values())
+
+    def run(self):
+        """Цикл сбора метрик"""
+        while not self._stop_event.is_set():
+            next_due = self.sample_due()
+            self._stop_event.wait(max(0.0, next_due - time.monotonic()))
+        self._thermal.file.close()
+        self._cpu.file.close()
+
+    def stop(self):
+        """Остановка сбора метрик"""
+        self._stop_event.set()
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Статистика времени кадра для LCD GAME
+Поэтапные таймеры, скользящие перцентили и оверлей производительности
+"""
+
+import os
+import time
+from collections import deque
+from config import *
+
+
+class RollingStats:
+    """
+    Скользящее окно измерений с расчетом перцентилей
+    """
+
+    def __init__(self, window=PERF_STATS_WINDOW):
+        """
+        Инициализация окна измерений
+
+        Args:
+            window (int): Количество последних измерений в окне
+        """
+        self.samples = deque(maxlen=window)
+
+    def add(self, value):
+        """Добавление измерения"""
+        self.samples.append(value)
+
+    def percentile(self, p):
+        """
+        Перцентиль по последним измерениям (метод ближайшего ранга)
+
+        Args:
+            p (float): Перцентиль от 0 до 100
+
+        Returns:
+            float: Значение перцентиля или 0.0 если измерений нет
+        """
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        rank = int(round(p / 100.0 * (len(ordered) - 1)))
+        return ordered[rank]
+
+    def percentiles(self):
+        """Словарь p50/p95/p99"""
+        if not self.samples:
+            return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0}
+        ordered = sorted(self.samples)
+        last = len(ordered) - 1
+        return {
+            'p50': ordered[int(round(0.50 * last))],
+            'p95': ordered[int(round(0.95 * last))],
+            'p99': ordered[int(round(0.99 * last))],
+        }
+
+    @property
+    def last(self):
+        """Последнее измерение"""
+        return self.samples[-1] if self.samples else 0.0
+
+    def __len__(self):
+        return len(self.samples)
+
+
+class FrameStats:
+    """
+    Поэтапная статистика кадров
+
+    Фазы игрового цикла (input, update, render) записывает GameEngine,
+    фазы вывода (convert, transfer) - LCDGame.update.
+    """
+
+    def __init__(self, window=PERF_STATS_WINDOW):
+        """
+        Инициализация статистики
+
+        Args:
+            window (int): Размер окна для скользящих перцентилей
+        """
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        """Сброс всех счетчиков"""
+        self.phases = {}
+        self.frame_time = RollingStats(self.window)
+        self.frame_interval = RollingStats(self.window)
+        self.frame_bytes = RollingStats(self.window)
+        self.frames = 0
+        self.missed_deadlines = 0
+        self.full_flushes = 0
+        self.partial_flushes = 0
+        self.bytes_total = 0
+        self._pending_bytes = 0
+        self._last_frame_end = None
+
+    def record(self, phase, seconds):
+        """
+        Запись длительности фазы
+
+        Args:
+            phase (str): Имя фазы
+            seconds (float): Длительность в секундах
+        """
+        stats = self.phases.get(phase)
+        if stats is None:
+            stats = self.phases[phase] = RollingStats(self.window)
+        stats.add(seconds)
+
+    def add_bytes(self, count, full_frame=True):
+        """
+        Учет байт, отправленных на дисплей
+
+        Args:
+            count (int): Количество байт
+            full_frame (bool): Было ли это полное обновление экрана
+        """
+        self._pending_bytes += count
+        self.bytes_total += count
+        if full_frame:
+            self.full_flushes += 1
+        else:
+            self.partial_flushes += 1
+
+    def end_frame(self, frame_time, budget=None):
+        """
+        Завершение кадра
+
+        Args:
+            frame_time (float): Время обработки кадра в секундах
+            budget (float): Бюджет кадра (1 / fps); превышение считается пропуском
+        """
+        now = time.perf_counter()
+        if self._last_frame_end is not None:
+            self.frame_interval.add(now - self._last_frame_end)
+        self._last_frame_end = now
+
+        self.frames += 1
+        self.frame_time.add(frame_time)
+        self.frame_bytes.add(self._pending_bytes)
+        self._pending_bytes = 0
+
+        if budget is not None and frame_time > budget:
+            self.missed_deadlines += 1
+
+    def fps(self):
+        """Фактическая частота кадров по медиане интервалов"""
+        interval = self.frame_interval.percentile(50)
+        return 1.0 / interval if interval > 0 else 0.0
+
+    def last_flush_time(self):
+        """Время последней передачи на дисплей в секундах"""
+        transfer = self.phases.get('transfer')
+        return transfer.last if transfer else 0.0
+
+    def summary(self):
+        """
+        Сводка статистики
+
+        Returns:
+            dict: Перцентили фаз в миллисекундах и счетчики
+        """
+        def to_ms(values):
+            return {key: value * 1000.0 for key, value in values.items()}
+
+        return {
+            'frames': self.frames,
+            'fps': self.fps(),
+            'missed_deadlines': self.missed_deadlines,
+            'full_flushes': self.full_flushes,
+            'partial_flushes': self.partial_flushes,
+            'bytes_total': self.bytes_total,
+            'bytes_per_frame': self.frame_bytes.percentiles(),
+            'frame_ms': to_ms(self.frame_time.percentiles()),
+            'phases_ms': {name: to_ms(stats.percentiles()) for name, stats in self.phases.items()},
+        }
+
+    def format_report(self):
+        """Текстовый отчет для вывода в консоль"""
+        summary = self.summary()
+        lines = [
+            f"Кадров: {summary['frames']}, FPS: {summary['fps']:.1f}, "
+            f"пропущено дедлайнов: {summary['missed_deadlines']}",
+            f"Обновлений: полных {summary['full_flushes']}, частичных {summary['partial_flushes']}, "
+            f"байт за кадр (p50): {summary['bytes_per_frame']['p50']:.0f}",
+        ]
+        rows = [('frame', summary['frame_ms'])] + list(summary['phases_ms'].items())
+        for name, values in rows:
+            lines.append(
+                f"  {name:<10} p50 {values['p50']:7.2f} мс  "
+                f"p95 {values['p95']:7.2f} мс  p99 {values['p99']:7.2f} мс"
+            )
+        return "\n".join(lines)
+
+
+class PerfHUD:
+    """
+    Оверлей FPS и времени передачи в углу экрана
+
+    Перерисовывает и отправляет на дисплей только свою область и только
+    когда изменился текст или полное обновление экрана затерло оверлей.
+    """
+
+    def __init__(self, lcd, stats=None, corner=PERF_HUD_CONFIG['corner']):
+        """
+        Инициализация оверлея
+
+        Args:
+            lcd: Экземпляр LCDGame
+            stats: Экземпляр FrameStats (по умолчанию lcd.stats)
+            corner (str): Угол экрана (top_left, top_right, bottom_left, bottom_right)
+        """
+        self.lcd = lcd
+        self.stats = stats if stats is not None else lcd.stats
+        self.width = PERF_HUD_CONFIG['width']
+        self.height = PERF_HUD_CONFIG['height']
+        self.font_size = PERF_HUD_CONFIG['font_size']
+        self.refresh_interval = PERF_HUD_CONFIG['refresh_interval']
+
+        self.x = 0 if corner.endswith('left') else lcd.width - self.width
+        self.y = 0 if corner.startswith('top') else lcd.height - self.height
+
+        self._text = ""
+        self._last_refresh = 0
+        self._seen_full_flushes = -1
+
+    def _format(self):
+        """Текст оверлея"""
+        flush_ms = self.stats.last_flush_time() * 1000.0
+        return f"{self.stats.fps():.0f}fps {flush_ms:.1f}ms"
+
+    def draw(self, force=False):
+        """
+        Отрисовка оверлея, если это необходимо
+
+        Args:
+            force (bool): Перерисовать независимо от изменений
+
+        Returns:
+            bool: True если область была отправлена на дисплей
+        """
+        now = time.time()
+        if force or now - self._last_refresh >= self.refresh_interval:
+            self._last_refresh = now
+            text = self._format()
+            if text != self._text:
+                self._text = text
+                force = True
+
+        # Полное обновление экрана перезаписало область оверлея
+        if self.stats.full_flushes != self._seen_full_flushes:
+            force = True
+
+        if not force:
+            return False
+
+        self.lcd.draw_rect(self.x, self.y, self.width, self.height, color=(0, 0, 0), fill=True)
+        self.lcd.draw_text(self._text, self.x + 2, self.y + 1, color=(0, 255, 0), font_size=self.font_size)
+        self.lcd.update_region(self.x, self.y, self.width, self.height)
+        self._seen_full_flushes = self.stats.full_flushes
+        return True
+
+
+def _process_age():
+    """
+    Время с момента запуска процесса (по /proc/self/stat)
+
+    Returns:
+        float: Секунды или None, если определить нельзя
+    """
+    try:
+        with open('/proc/self/stat', 'rb') as f:
+            # Поле 22 (starttime) - после имени процесса в скобках
+            fields = f.read().rsplit(b')', 1)[1].split()
+        start_ticks = int(fields[19])
+        return time.clock_gettime(time.CLOCK_BOOTTIME) - start_ticks / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class StartupTimeline:
+    """
+    Хронология холодного старта
+
+    Отметки (импорт модулей, настройка GPIO, инициализация панели, первый
+    кадр) отсчитываются от запуска процесса, поэтому в отчет попадает и
+    время запуска интерпретатора.
+    """
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        # Время от запуска процесса до создания хронологии
+        self.process_offset = _process_age()
+        self.marks = []
+        self._names = set()
+        self.report_on = None
+
+    def mark(self, name):
+        """
+        Отметка этапа запуска
+
+        Args:
+            name (str): Название этапа
+        """
+        self.marks.append((name, time.perf_counter() - self.origin))
+        self._names.add(name)
+        if name == self.report_on:
+            self.report_on = None
+            print(self.format_report())
+
+    def mark_once(self, name):
+        """Отметка этапа, если он еще не отмечен (для первого кадра и т.п.)"""
+        if name not in self._names:
+            self.mark(name)
+
+    def print_on(self, name):
+        """Вывод отчета при достижении этапа name"""
+        self.report_on = name
+
+    def format_report(self):
+        """Текстовый отчет для вывода в консоль"""
+        offset = self.process_offset or 0.0
+        lines = ["Хронология запуска (мс от старта процесса):"]
+        if self.process_offset is not None:
+            lines.append(f"  {'interpreter':<16} {offset * 1000:8.1f}")
+        previous = 0.0
+        for name, elapsed in self.marks:
+            lines.append(
+                f"  {name:<16} {(offset + elapsed) * 1000:8.1f}  (+{(elapsed - previous) * 1000:.1f})"
+            )
+            previous = elapsed
+        return "\n".join(lines)
+
+
+# Общая хронология процесса: создается при первом импорте perf_stats
+startup = StartupTimeline()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Регулятор энергопотребления для LCD GAME
+Снижение частоты обновления при простое, отключение подсветки и сон панели
+"""
+
+import time
+from config import *
+
+
+class PowerGovernor:
+    """
+    Регулятор частоты обновления и энергосбережения
+
+    Состояния:
+        active - обычная частота обновления
+        idle - нет ввода и изменений на экране, частота снижена
+        backlight_off - подсветка выключена, отрисовка остановлена
+        sleep - контроллер в режиме SLPIN, передача на дисплей пропускается
+    """
+
+    STATE_ACTIVE = 'active'
+    STATE_IDLE = 'idle'
+    STATE_BACKLIGHT_OFF = 'backlight_off'
+    STATE_SLEEP = 'sleep'
+
+    def __init__(self, lcd, active_interval=1.0,
+                 idle_interval=POWER_CONFIG['idle_update_interval'],
+                 idle_timeout=POWER_CONFIG['idle_timeout'],
+                 backlight_timeout=BACKLIGHT_TIMEOUT,
+                 sleep_timeout=SLEEP_TIMEOUT,
+                 enabled=POWER_CONFIG['enabled']):
+        """
+        Инициализация регулятора
+
+        Args:
+            lcd: Экземпляр LCDGame
+            active_interval (float): Период обновления в активном режиме
+            idle_interval (float): Период обновления в режиме простоя
+            idle_timeout (float): Время без активности до режима простоя
+            backlight_timeout (float): Время без ввода до выключения подсветки
+            sleep_timeout (float): Время без ввода до сна контроллера
+            enabled (bool): Включено ли энергосбережение
+        """
+        self.lcd = lcd
+        self.active_interval = active_interval
+        self.idle_interval = idle_interval
+        self.idle_timeout = idle_timeout
+        self.backlight_timeout = backlight_timeout
+        self.sleep_timeout = sleep_timeout
+        self.enabled = enabled
+
+        now = time.monotonic()
+        self.last_input = now
+        self.last_activity = now
+        self.state = self.STATE_ACTIVE
+
+    def notify_input(self):
+        """
+        Регистрация пользовательского ввода
+
+        Returns:
+            bool: True если дисплей был погашен и сейчас разбужен; такое
+                нажатие не должно обрабатываться как команда, а вызывающий
+                код должен один раз полностью перерисовать экран
+        """
+        now = time.monotonic()
+        self.last_input = now
+        self.last_activity = now
+
+        dark = self.state in (self.STATE_BACKLIGHT_OFF, self.STATE_SLEEP)
+        if self.state == self.STATE_SLEEP:
+            self.lcd.wake()
+        if dark:
+            self.lcd.set_backlight(True)
+        self.state = self.STATE_ACTIVE
+        return dark
+
+    def notify_change(self):
+        """Регистрация видимого изменения содержимого экрана"""
+        self.last_activity = time.monotonic()
+        if self.state == self.STATE_IDLE:
+            self.state = self.STATE_ACTIVE
+
+    def tick(self):
+        """
+        Проверка таймаутов и смена состояния
+
+        Returns:
+            str: Текущее состояние
+        """
+        if not self.enabled:
+            return self.state
+
+        now = time.monotonic()
+        since_input = now - self.last_input
+
+        if self.state != self.STATE_SLEEP and since_input >= self.sleep_timeout:
+            if self.state != self.STATE_BACKLIGHT_OFF:
+                self.lcd.set_backlight(False)
+            self.lcd.sleep()
+            self.state = self.STATE_SLEEP
+        elif self.state in (self.STATE_ACTIVE, self.STATE_IDLE) and since_input >= self.backlight_timeout:
+            self.lcd.set_backlight(False)
+            self.state = self.STATE_BACKLIGHT_OFF
+        elif self.state == self.STATE_ACTIVE and now - self.last_activity >= self.idle_timeout:
+            self.state = self.STATE_IDLE
+
+        return self.state
+
+    def next_transition(self):
+        """
+        Время до следующей смены состояния по таймауту
+
+        Returns:
+            float: Секунды или None, если смен по таймауту больше не будет
+        """
+        if not self.enabled or self.state == self.STATE_SLEEP:
+            return None
+
+        deadlines = [self.last_input + self.sleep_timeout]
+        if self.state in (self.STATE_ACTIVE, self.STATE_IDLE):
+            deadlines.append(self.last_input + self.backlight_timeout)
+        if self.state == self.STATE_ACTIVE:
+            deadlines.append(self.last_activity + self.idle_timeout)
+        return max(0.0, min(deadlines) - time.monotonic())
+
+    def refresh_interval(self):
+        """
+        Текущий период обновления экрана
+
+        Returns:
+            float: Период в секундах или None, если отрисовка не нужна
+        """
+        if self.state == self.STATE_ACTIVE:
+            return self.active_interval
+        if self.state == self.STATE_IDLE:
+            return self.idle_interval
+        return None
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Легкие системные датчики для панели статуса и экрана сети
+Файлы /proc и /sys открываются один раз и перечитываются через pread
+"""
+
+import os
+import glob
+import time
+import array
+import fcntl
+import socket
+import struct
+from config import *
+
+# ioctl для адреса интерфейса и имени беспроводной сети
+SIOCGIFADDR = 0x8915
+SIOCGIWESSID = 0x8B1B
+
+
+class FileProbe:
+    """
+    Файл с постоянно открытым дескриптором
+
+    Каждое чтение - один системный вызов pread с начала файла,
+    без open/close и без создания объектов файла Python.
+    """
+
+    def __init__(self, path, size=4096):
+        """
+        Args:
+            path (str): Путь к файлу
+            size (int): Максимальный размер читаемых данных
+        """
+        self.path = path
+        self.size = size
+        self.fd = None
+
+    def read(self):
+        """
+        Чтение содержимого файла
+
+        Returns:
+            bytes: Содержимое или None, если файл недоступен
+        """
+        try:
+            if self.fd is None:
+                self.fd = os.open(self.path, os.O_RDONLY)
+            return os.pread(self.fd, self.size, 0)
+        except OSError:
+            self.close()
+            return None
+
+    def close(self):
+        """Закрытие дескриптора"""
+        if self.fd is not None:
+            try:
+                os.close(self.fd)
+            except OSError:
+                pass
+            self.fd = None
+
+
+class ThermalProbe:
+    """Температура SoC из /sys/class/thermal"""
+
+    def __init__(self, path=METRICS_CONFIG['thermal_zone']):
+        self.file = FileProbe(path, 32)
+
+    def sample(self):
+        """Температура в °C или None"""
+        data = self.file.read()
+        try:
+            return int(data) / 1000.0
+        except (TypeError, ValueError):
+            return None
+
+
+class CpuProbe:
+    """Загрузка CPU по приращениям счетчиков /proc/stat"""
+
+    def __init__(self, path='/proc/stat'):
+        self.file = FileProbe(path, 256)
+        self._last = None
+
+    def sample(self):
+        """
+        Загрузка CPU с момента прошлого вызова
+
+        Returns:
+            float: Процент загрузки или None при первом вызове
+        """
+        data = self.file.read()
+        if not data:
+            return None
+        # Первая строка: cpu user nice system idle iowait irq softirq steal ...
+        fields = [int(value) for value in data.split(b'\n', 1)[0].split()[1:]]
+        idle = fields[3] + (fields[4] if len(fields) > 4 else 0)
+        total = sum(fields[:8])
+
+        last, self._last = self._last, (idle, total)
+        if last is None or total == last[1]:
+            return None
+        return round(100.0 * (1.0 - (idle - last[0]) / (total - last[1])), 1)
+
+
+class NetDevProbe:
+    """Трафик сетевого интерфейса по /proc/net/dev"""
+
+    def __init__(self, interface=None, path='/proc/net/dev'):
+        """
+        Args:
+            interface (str): Имя интерфейса (None - первый активный, кроме lo)
+        """
+        self.file = FileProbe(path, 16384)
+        self.interface = interface
+        self._last = None
+
+    def _counters(self, interface):
+        """Счетчики (интерфейс, принято байт, передано байт)"""
+        data = self.file.read()
+        if not data:
+            return None
+        for line in data.split(b'\n')[2:]:
+            name, _, values = line.partition(b':')
+            name = name.strip().decode()
+            if not values or name == 'lo':
+                continue
+            if interface is not None and name != interface:
+                continue
+            fields = values.split()
+            rx, tx = int(fields[0]), int(fields[8])
+            if interface is None and rx == 0 and tx == 0:
+                continue
+            return name, rx, tx
+        return None
+
+    def sample(self, interface=None):
+        """
+        Скорость приема и передачи
+
+        Args:
+            interface (str): Интерфейс для этого замера (None - заданный
+                в конструкторе)
+
+        Returns:
+            dict: interface, rx_bytes, tx_bytes, rx_rate, tx_rate (байт/с)
+                или None, если интерфейс не найден
+        """
+        counters = self._counters(interface or self.interface)
+        if counters is None:
+            return None
+        name, rx, tx = counters
+        now = time.monotonic()
+
+        rx_rate = tx_rate = None
+        last, self._last = self._last, (name, rx, tx, now)
+        if last is not None and last[0] == name and now > last[3]:
+            elapsed = now - last[3]
+            rx_rate = (rx - last[1]) / elapsed
+            tx_rate = (tx - last[2]) / elapsed
+
+        return {
+            'interface': name,
+            'rx_bytes': rx,
+            'tx_bytes': tx,
+            'rx_rate': rx_rate,
+            'tx_rate': tx_rate,
+        }
+
+
+class PowerSupplyProbe:
+    """Уровень заряда батареи из /sys/class/power_supply"""
+
+    def __init__(self, root='/sys/class/power_supply'):
+        self.capacity = None
+        self.status = None
+        for supply in sorted(glob.glob(os.path.join(root, '*'))):
+            try:
+                with open(os.path.join(supply, 'type'), 'r') as f:
+                    if f.read().strip() != 'Battery':
+                        continue
+            except OSError:
+                continue
+            self.capacity = FileProbe(os.path.join(supply, 'capacity'), 16)
+            self.status = FileProbe(os.path.join(supply, 'status'), 32)
+            break
+
+    def sample(self):
+        """
+        Returns:
+            dict: capacity (%) и status (Charging, Discharging, ...)
+                или None, если батареи нет
+        """
+        if self.capacity is None:
+            return None
+        data = self.capacity.read()
+        try:
+            capacity = int(data)
+        except (TypeError, ValueError):
+            return None
+        status = self.status.read()
+        return {
+            'capacity': capacity,
+            'status': status.decode().strip() if status else None,
+        }
+
+
+class WirelessProbe:
+    """Качество связи Wi-Fi из /proc/net/wireless"""
+
+    def __init__(self, path='/proc/net/wireless'):
+        self.file = FileProbe(path, 1024)
+
+    def sample(self):
+        """
+        Returns:
+            dict: interface, link (качество связи), level (дБм)
+                или None, если беспроводных интерфейсов нет
+        """
+        data = self.file.read()
+        if not data:
+            return None
+        for line in data.split(b'\n')[2:]:
+            name, _, values = line.partition(b':')
+            fields = values.split()
+            if len(fields) < 3:
+                continue
+            return {
+                'interface': name.strip().decode(),
+                'link': float(fields[1].rstrip(b'.')),
+                'level': float(fields[2].rstrip(b'.')),
+            }
+        return None
+
+
+def interface_address(interface):
+    """IPv4-адрес интерфейса через ioctl (без запуска процессов)"""
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            request = struct.pack('256s', interface.encode()[:15])
+            result = fcntl.ioctl(sock.fileno(), SIOCGIFADDR, request)
+            return socket.inet_ntoa(result[20:24])
+    except OSError:
+        return None
+
+
+def wireless_essid(interface):
+    """Имя беспроводной сети через ioctl SIOCGIWESSID"""
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            buffer = array.array('B', bytes(33))
+            address, length = buffer.buffer_info()
+            request = struct.pack('16sPHH', interface.encode()[:15], address, length, 0)
+            fcntl.ioctl(sock.fileno(), SIOCGIWESSID, request)
+            return buffer.tobytes().rstrip(b'\0').decode(errors='replace') or None
+    except OSError:
+        return None
+
+
+class SystemProbes:
+    """
+    Набор датчиков панели статуса и экрана сети
+
+    Адрес и имя сети меняются редко и кэшируются на PROBES_CONFIG['address_ttl'].
+    Температуру и загрузку CPU опрашивает MetricsCollector (metrics.py).
+    """
+
+    def __init__(self):
+        self.net = NetDevProbe(PROBES_CONFIG['interface'])
+        self.power = PowerSupplyProbe()
+        self.wireless = WirelessProbe()
+        self._address_cache = {}
+
+    def battery_level(self):
+        """Уровень заряда батареи в процентах или None"""
+        power = self.power.sample()
+        return power['capacity'] if power else None
+
+    def _cached(self, key, func, interface):
+        now = time.monotonic()
+        cached = self._address_cache.get((key, interface))
+        if cached is None or now - cached[0] > PROBES_CONFIG['address_ttl']:
+            cached = (now, func(interface))
+            self._address_cache[(key, interface)] = cached
+        return cached[1]
+
+    def network(self):
+        """
+        Состояние сети
+
+        Трафик, адрес и данные Wi-Fi относятся к одному интерфейсу:
+        PROBES_CONFIG['interface'], иначе беспроводному, иначе первому
+        активному.
+
+        Returns:
+            dict: interface, address, wireless, ssid, level, rx_rate, tx_rate
+        """
+        wireless = self.wireless.sample()
+        interface = self.net.interface or (wireless['interface'] if wireless else None)
+        traffic = self.net.sample(interface) or {}
+        interface = traffic.get('interface', interface)
+        if wireless and wireless['interface'] != interface:
+            wireless = None
+
+        info = {
+            'interface': interface,
+            'address': None,
+            'wireless': wireless is not None,
+            'ssid': None,
+            'level': wireless['level'] if wireless else None,
+            'rx_rate': traffic.get('rx_rate'),
+            'tx_rate': traffic.get('tx_rate'),
+        }
+        if interface:
+            info['address'] = self._cached('address', interface_address, interface)
+            if wireless:
+                info['ssid'] = self._cached('ssid', wireless_essid, interface)
+        return info
+
+    def close(self):
+        """Закрытие всех дескрипторов"""
+        for probe in (self.net.file, self.wireless.file,
+                      self.power.capacity, self.power.status):
+            if probe is not None:
+                probe.close()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Событийный цикл для рабочего стола
+Ожидание событий ввода и ближайшего таймера без периодического опроса
+"""
+
+import heapq
+import itertools
+import queue
+import time
+
+
+class Timer:
+    """
+    Запланированный вызов
+    """
+
+    def __init__(self, deadline, callback, interval=None):
+        """
+        Args:
+            deadline (float): Время срабатывания по time.monotonic()
+            callback: Функция без аргументов
+            interval (float): Период повтора в секундах (None - однократный)
+        """
+        self.deadline = deadline
+        self.callback = callback
+        self.interval = interval
+        self.cancelled = False
+
+    def cancel(self):
+        """Отмена таймера"""
+        self.cancelled = True
+
+
+class TimerQueue:
+    """
+    Очередь таймеров на двоичной куче
+
+    Ближайший срок доступен за O(1), добавление - за O(log n);
+    отмененные таймеры удаляются лениво при извлечении.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._counter = itertools.count()
+
+    def schedule(self, delay, callback, interval=None):
+        """
+        Планирование вызова
+
+        Args:
+            delay (float): Задержка в секундах
+            callback: Функция без аргументов
+            interval (float): Период повтора в секундах (None - однократный)
+
+        Returns:
+            Timer: Таймер, который можно отменить
+        """
+        timer = Timer(time.monotonic() + delay, callback, interval)
+        self._push(timer)
+        return timer
+
+    def _push(self, timer):
+        heapq.heappush(self._heap, (timer.deadline, next(self._counter), timer))
+
+    def next_deadline(self):
+        """Время ближайшего срабатывания или None, если таймеров нет"""
+        while self._heap and self._heap[0][2].cancelled:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def run_due(self, now=None):
+        """
+        Вызов всех таймеров, срок которых наступил
+
+        Returns:
+            int: Количество вызванных таймеров
+        """
+        if now is None:
+            now = time.monotonic()
+
+        fired = 0
+        while self._heap and self._heap[0][0] <= now:
+            _, _, timer = heapq.heappop(self._heap)
+            if timer.cancelled:
+                continue
+            if timer.interval is not None:
+                # Следующий срок считается от предыдущего; пропущенные не догоняем
+                timer.deadline = max(timer.deadline + timer.interval, now)
+                self._push(timer)
+            timer.callback()
+            fired += 1
+        return fired
+
+
+class EventLoop:
+    """
+    Цикл обработки событий
+
+    События (например, нажатия кнопок из потока GPIO) публикуются через
+    post(); цикл спит до прихода события или до срока ближайшего таймера.
+    """
+
+    def __init__(self):
+        self.events = queue.Queue()
+        self.timers = TimerQueue()
+        self.running = False
+
+    def post(self, event):
+        """Публикация события (безопасно вызывать из любого потока)"""
+        self.events.put(event)
+
+    def discard_pending(self):
+        """
+        Удаление накопившихся событий (запрос остановки сохраняется)
+
+        Returns:
+            int: Количество удаленных событий
+        """
+        discarded = 0
+        while True:
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if event is None:
+                self.events.put(None)
+                break
+            discarded += 1
+        return discarded
+
+    def stop(self):
+        """Остановка цикла"""
+        self.running = False
+        self.events.put(None)
+
+    def run(self, handler):
+        """
+        Запуск цикла
+
+        Args:
+            handler: Функция обработки события (получает объект события)
+        """
+        self.running = True
+        while self.running:
+            deadline = self.timers.next_deadline()
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+
+            try:
+                event = self.events.get(timeout=timeout)
+            except queue.Empty:
+                event = None
+
+            if event is not None and self.running:
+                handler(event)
+
+            self.timers.run_due()
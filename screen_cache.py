@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Кэш готовых кадров статических экранов
+Переключение на закэшированный экран - одна передача готовых байт RGB565
+"""
+
+import numpy as np
+from PIL import Image
+
+
+def rgb565_to_image(payload, width, height):
+    """
+    Восстановление изображения RGB из байт RGB565
+
+    Повторная конвертация результата в RGB565 дает те же байты,
+    поэтому восстановленный буфер можно дорисовывать и отправлять частями.
+
+    Args:
+        payload (bytes): Байты RGB565 (старший байт первым)
+        width (int): Ширина кадра
+        height (int): Высота кадра
+
+    Returns:
+        Image: Изображение PIL в режиме RGB
+    """
+    pixels = np.frombuffer(payload, dtype='>u2').reshape(height, width).astype(np.uint16)
+    r = (pixels >> 11) & 0x1F
+    g = (pixels >> 5) & 0x3F
+    b = pixels & 0x1F
+    rgb = np.empty((height, width, 3), dtype=np.uint8)
+    rgb[..., 0] = (r << 3) | (r >> 2)
+    rgb[..., 1] = (g << 2) | (g >> 4)
+    rgb[..., 2] = (b << 3) | (b >> 2)
+    return Image.fromarray(rgb, 'RGB')
+
+
+class CachedScreen:
+    """
+    Закэшированный кадр экрана
+    """
+
+    def __init__(self, payload, widget_state):
+        """
+        Args:
+            payload (bytes): Кадр в формате RGB565
+            widget_state (list): Отрисованные значения виджетов экрана
+        """
+        self.payload = payload
+        self.widget_state = widget_state
+
+
+class ScreenCache:
+    """
+    Кэш кадров RGB565, ключ - (идентификатор экрана, версия содержимого)
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, screen_id, version):
+        """
+        Получение кадра экрана
+
+        Returns:
+            CachedScreen: Закэшированный кадр или None
+        """
+        entry = self.entries.get((screen_id, version))
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def put(self, screen_id, version, payload, widget_state):
+        """Сохранение кадра; старые версии экрана удаляются"""
+        self.invalidate(screen_id)
+        self.entries[(screen_id, version)] = CachedScreen(bytes(payload), widget_state)
+
+    def invalidate(self, screen_id=None):
+        """
+        Удаление кадров
+
+        Args:
+            screen_id (str): Экран (None - очистить весь кэш)
+        """
+        if screen_id is None:
+            self.entries.clear()
+            return
+        for key in [key for key in self.entries if key[0] == screen_id]:
+            del self.entries[key]
+
+    def memory_bytes(self):
+        """Объем памяти, занятый кадрами"""
+        return sum(len(entry.payload) for entry in self.entries.values())
+
+    def stats(self):
+        """Статистика кэша"""
+        return {
+            'entries': len(self.entries),
+            'memory_bytes': self.memory_bytes(),
+            'hits': self.hits,
+            'misses': self.misses,
+        }
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Параллельная самопроверка системы CM4 LCD Game Driver
+Независимые проверки (SPI, GPIO, config.txt, калибровка, сервисы, вывод на
+симулированный дисплей) выполняются одновременно, каждая со своим
+таймаутом: зависший systemctl или занятый пин не задерживают остальные.
+Отчет - JSON с длительностями, пригодный для мониторинга
+
+Использование:
+    python3 self_test.py [-k проверка ...] [--timeout 0.5] [--json] [-o отчет.json]
+
+Код возврата 1, если хотя бы одна проверка не прошла
+"""
+
+import os
+import sys
+import json
+import mmap
+import time
+import struct
+import argparse
+import importlib
+import platform
+import threading
+import subprocess
+from config import *
+
+# Зарегистрированные проверки: имя -> функция
+CHECKS = {}
+# Модули, которые импортируются до начала отсчета таймаутов: имя -> модули
+CHECK_IMPORTS = {}
+
+# Регистры GPIO BCM2711 (CM4) в /dev/gpiomem
+GPFSEL0 = 0x00                   # Функции пинов, 3 бита на пин (000 - вход)
+GPLEV0 = 0x34                    # Уровни пинов 0-31
+GPIO_PUP_PDN_CNTRL_REG0 = 0xE4   # Подтяжки, 2 бита на пин (01 - вверх, 10 - вниз)
+
+
+def check(name, imports=()):
+    """
+    Регистрация проверки
+
+    Функция возвращает (успех, описание) и получает таймаут в секундах
+    (для внешних команд); исключение считается ошибкой проверки.
+
+    Args:
+        name (str): Имя проверки
+        imports (tuple): Тяжелые модули (numpy, PIL), импорт которых не
+            должен расходовать таймаут проверки
+    """
+    def register(func):
+        CHECKS[name] = func
+        CHECK_IMPORTS[name] = imports
+        return func
+    return register
+
+
+@check('spi')
+def check_spi(timeout):
+    device = f"/dev/spidev{SPI_BUS}.{SPI_DEVICE}"
+    if os.path.exists(device):
+        return True, device
+    return False, f"{device} не найдено"
+
+
+@check('gpio')
+def check_gpio(timeout):
+    """
+    Пины кнопок: вход, подтяжка по BUTTON_PULL_UP, ни одна не зажата
+
+    Регистры только читаются через /dev/gpiomem: настройка пинов через
+    RPi.GPIO и cleanup() сбросили бы подтяжки, на которые опирается
+    работающий сервис.
+    """
+    with open('/dev/gpiomem', 'rb') as f:
+        registers = mmap.mmap(f.fileno(), 4096, mmap.MAP_SHARED, mmap.PROT_READ)
+    try:
+        def register(offset):
+            return struct.unpack_from('<I', registers, offset)[0]
+
+        levels = register(GPLEV0)
+        pull_expected = 0b01 if BUTTON_PULL_UP else 0b10
+        not_input, no_pull, held = [], [], []
+        for name, pin in BUTTON_PINS.items():
+            if (register(GPFSEL0 + 4 * (pin // 10)) >> (3 * (pin % 10))) & 0b111:
+                not_input.append(name)
+            if (register(GPIO_PUP_PDN_CNTRL_REG0 + 4 * (pin // 16)) >> (2 * (pin % 16))) & 0b11 != pull_expected:
+                no_pull.append(name)
+            if bool(levels & (1 << pin)) != BUTTON_PULL_UP:
+                held.append(name)
+    finally:
+        registers.close()
+
+    problems = []
+    if not_input:
+        problems.append(f"не вход: {', '.join(not_input)}")
+    if no_pull:
+        problems.append(f"нет подтяжки: {', '.join(no_pull)}")
+    if held:
+        problems.append(f"нажаты: {', '.join(held)}")
+    if problems:
+        return False, '; '.join(problems)
+    return True, f"кнопок: {len(BUTTON_PINS)}"
+
+
+@check('config_txt')
+def check_config_txt(timeout):
+    from boot_config import BootConfig
+
+    boot_config = BootConfig(ROTATION_CONFIG['config_file'])
+    if not boot_config.exists:
+        return False, f"{boot_config.path} не найден"
+    gpio_pins = ','.join(str(pin) for pin in BUTTON_PINS.values())
+    problems = []
+    if boot_config.get('dtparam=spi') != 'on':
+        problems.append("SPI не включен")
+    if boot_config.get(f"gpio={gpio_pins}") != 'pu':
+        problems.append("нет подтяжки кнопок")
+    if problems:
+        return False, ', '.join(problems)
+    return True, f"поворот {boot_config.get('display_rotate', default='0')}"
+
+
+@check('calibration')
+def check_calibration(timeout):
+    calibration_file = f"{ROTATION_CONFIG['calibration_dir']}/99-calibration.conf"
+    if os.path.exists(calibration_file):
+        return True, calibration_file
+    return False, f"{calibration_file} не найден"
+
+
+@check('service')
+def check_service(timeout):
+    services = [f"{SYSTEM_CONFIG['service_name']}-splash.service",
+                f"{SYSTEM_CONFIG['service_name']}.service"]
+    # Заставка - oneshot с RemainAfterExit: после загрузки она тоже active
+    result = subprocess.run(['systemctl', 'is-active'] + services,
+                            capture_output=True, text=True, timeout=timeout)
+    states = result.stdout.split()
+    detail = ', '.join(f"{service}: {state}" for service, state in zip(services, states))
+    return result.returncode == 0, detail or result.stderr.strip()
+
+
+@check('display', imports=('lcd_game', 'sim_backend'))
+def check_display(timeout):
+    """Кадр проходит через LCDGame и модель шины ST7789 без искажений"""
+    from lcd_game import LCDGame
+    from sim_backend import SimulatedBackend
+
+    backend = SimulatedBackend(realtime=False)
+    lcd = LCDGame(backend=backend)
+    try:
+        lcd.clear((0, 0, 255))
+        lcd.draw_rect(10, 20, 100, 60, color=(255, 0, 0), fill=True)
+        lcd.update()
+        lcd.draw_rect(40, 120, 30, 30, color=(0, 255, 0), fill=True)
+        lcd.update_region(40, 120, 30, 30)
+        if backend.frame().tobytes() != lcd._convert_rgb565(lcd.buffer):
+            return False, "кадр на панели не совпадает с буфером"
+        counters = backend.counters()
+        return True, f"{counters['transactions']} транзакций, {counters['bytes']} байт"
+    finally:
+        lcd.cleanup()
+
+
+def run(names=None, timeout=SELF_TEST_CONFIG['timeout']):
+    """
+    Одновременное выполнение проверок
+
+    Каждая проверка - отдельный поток-демон; не уложившаяся в таймаут
+    отмечается как timeout и брошена (процесс завершится, не дожидаясь ее).
+
+    Args:
+        names (list): Имена проверок (None - все)
+        timeout (float): Таймаут каждой проверки, секунды
+
+    Returns:
+        dict: Отчет (время, узел, общий результат, проверки с длительностями)
+    """
+    selected = [name for name in CHECKS if not names or name in names]
+    finished = {}
+
+    # Импорт numpy и PIL с SD-карты дольше таймаута; ошибку импорта
+    # покажет сама проверка
+    prepare_start = time.perf_counter()
+    for name in selected:
+        for module in CHECK_IMPORTS[name]:
+            try:
+                importlib.import_module(module)
+            except Exception:
+                pass
+    prepare = time.perf_counter() - prepare_start
+
+    started = time.perf_counter()
+
+    def worker(name):
+        start = time.perf_counter()
+        try:
+            ok, detail = CHECKS[name](timeout)
+            status = 'ok' if ok else 'fail'
+        except Exception as e:
+            status, detail = 'error', f"{type(e).__name__}: {e}"
+        finished[name] = (status, detail, time.perf_counter() - start)
+
+    threads = []
+    for name in selected:
+        thread = threading.Thread(target=worker, args=(name,), name=f"self-test-{name}", daemon=True)
+        thread.start()
+        threads.append((name, thread))
+
+    checks = []
+    for name, thread in threads:
+        thread.join(max(0.0, started + timeout - time.perf_counter()))
+        result = finished.get(name)
+        if result is None:
+            result = ('timeout', f"нет ответа за {timeout} с", time.perf_counter() - started)
+        status, detail, duration = result
+        checks.append({'name': name, 'status': status, 'duration_ms': round(duration * 1000, 2),
+                       'detail': detail})
+
+    return {
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'host': platform.node(),
+        'ok': all(item['status'] == 'ok' for item in checks),
+        'duration_ms': round((time.perf_counter() - started) * 1000, 2),
+        'import_ms': round(prepare * 1000, 2),
+        'checks': checks,
+    }
+
+
+def print_report(report):
+    for item in report['checks']:
+        mark = "✓" if item['status'] == 'ok' else "✗"
+        print(f"{mark} {item['name']:12} {item['status']:8} {item['duration_ms']:8.1f} мс  {item['detail']}")
+    print(f"\n{'✓ Все проверки пройдены' if report['ok'] else '✗ Есть ошибки'} "
+          f"за {report['duration_ms']:.0f} мс (импорт {report['import_ms']:.0f} мс)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Самопроверка CM4 LCD Game Driver")
+    parser.add_argument('-k', '--check', action='append', choices=list(CHECKS), help="только эти проверки")
+    parser.add_argument('--timeout', type=float, default=SELF_TEST_CONFIG['timeout'], help="секунды на проверку")
+    parser.add_argument('--json', action='store_true', help="отчет JSON в stdout")
+    parser.add_argument('-o', '--output', default=None, help="записать отчет JSON в файл")
+    args = parser.parse_args()
+
+    report = run(args.check, args.timeout)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print_report(report)
+    # Потоки зависших проверок - демоны и не задерживают выход
+    sys.exit(0 if report['ok'] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Симулированный дисплей ST7789 для работы без оборудования
+Поток команд LCDGame разбирается как контроллером: CASET/RASET задают окно,
+RAMWR заполняет память панели, MADCTL и COLMOD учитываются при выводе.
+Время передачи рассчитывается по SPI_SPEED
+
+Выбор: DISPLAY_BACKEND = 'simulated' в config.py или
+    LCD_GAME_BACKEND=simulated python3 desktop.py
+"""
+
+import time
+import numpy as np
+from PIL import Image
+from backends import DisplayBackend
+from config import *
+
+# Команды ST7789
+CASET = 0x2A
+RASET = 0x2B
+RAMWR = 0x2C
+MADCTL = 0x36
+COLMOD = 0x3A
+SLPIN = 0x10
+SLPOUT = 0x11
+DISPON = 0x29
+DISPOFF = 0x28
+
+# Биты MADCTL
+MADCTL_MY = 0x80
+MADCTL_MX = 0x40
+MADCTL_MV = 0x20
+
+
+class SimulatedButtonSource:
+    """
+    Кнопки, нажимаемые из кода (тесты, сценарии, бенчмарки)
+    """
+
+    def __init__(self):
+        self.active = set()
+        self.callbacks = {}
+
+    def setup(self, pin):
+        pass
+
+    def is_active(self, pin):
+        return pin in self.active
+
+    def add_edge_callback(self, pin, callback, bouncetime):
+        self.callbacks[pin] = callback
+
+    def remove_edge_callback(self, pin):
+        self.callbacks.pop(pin, None)
+
+    def press(self, button_name):
+        """Нажатие кнопки (фронт вызывает обработчик, как RPi.GPIO)"""
+        pin = BUTTON_PINS[button_name]
+        if pin in self.active:
+            return
+        self.active.add(pin)
+        callback = self.callbacks.get(pin)
+        if callback is not None:
+            callback(pin)
+
+    def release(self, button_name):
+        """Отпускание кнопки"""
+        self.active.discard(BUTTON_PINS[button_name])
+
+
+class SimulatedBackend(DisplayBackend):
+    """
+    Модель контроллера ST7789 и шины SPI
+
+    Счетчики: transactions - транзакции (CS активен), bytes - байты на шине,
+    bus_time - расчетное время передачи. Каждая транзакция стоит
+    transaction_overhead на каждый блок chunk_size (ioctl spidev) плюс
+    8 бит на байт при частоте SPI_SPEED. При realtime=True вызовы
+    выдерживают расчетное время, и частота кадров совпадает с устройством.
+    """
+
+    name = 'simulated'
+
+    def __init__(self, width=DISPLAY_WIDTH, height=DISPLAY_HEIGHT, spi_speed=SPI_SPEED,
+                 realtime=SIMULATED_BACKEND_CONFIG['realtime']):
+        self.width = width
+        self.height = height
+        self.spi_speed = spi_speed
+        self.realtime = realtime
+        self.overhead = SIMULATED_BACKEND_CONFIG['transaction_overhead']
+        self.chunk_size = SIMULATED_BACKEND_CONFIG['chunk_size']
+        self.buttons = SimulatedButtonSource()
+
+        # Память панели в адресах контроллера
+        self.memory = np.zeros((height, width), dtype='>u2')
+        self.backlight = False
+        self.transactions = 0
+        self.bytes = 0
+        self.pixels = 0
+        self.bus_time = 0.0
+        self.delay_time = 0.0
+        self.reset()
+
+    def reset(self):
+        """Состояние контроллера после сброса"""
+        self.madctl = 0
+        self.colmod = 0x06  # 18 бит до настройки COLMOD
+        self.sleeping = True
+        self.display_on = False
+        self.window = (0, 0, self.width - 1, self.height - 1)
+        self.cursor = 0
+        self._command = None
+
+    def _transfer(self, count):
+        """Учет транзакции на шине"""
+        chunks = max(1, -(-count // self.chunk_size))
+        seconds = count * 8 / self.spi_speed + chunks * self.overhead
+        self.transactions += 1
+        self.bytes += count
+        self.bus_time += seconds
+        if self.realtime:
+            time.sleep(seconds)
+
+    def command(self, cmd):
+        self._transfer(1)
+        self._command = cmd
+        if cmd == RAMWR:
+            self.cursor = 0
+        elif cmd == SLPIN:
+            self.sleeping = True
+        elif cmd == SLPOUT:
+            self.sleeping = False
+        elif cmd == DISPON:
+            self.display_on = True
+        elif cmd == DISPOFF:
+            self.display_on = False
+
+    def data(self, data):
+        self._transfer(len(data))
+        cmd = self._command
+        if cmd == RAMWR:
+            self._write_pixels(data)
+        elif cmd in (CASET, RASET) and len(data) >= 4:
+            start = (data[0] << 8) | data[1]
+            end = (data[2] << 8) | data[3]
+            x_start, y_start, x_end, y_end = self.window
+            if cmd == CASET:
+                self.window = (start, y_start, end, y_end)
+            else:
+                self.window = (x_start, start, x_end, end)
+        elif cmd == MADCTL and len(data):
+            self.madctl = data[0]
+        elif cmd == COLMOD and len(data):
+            self.colmod = data[0]
+
+    def _write_pixels(self, data):
+        """RAMWR: пиксели заполняют окно построчно, продолжая с курсора"""
+        if self.colmod & 0x07 != 0x05:
+            # Поддерживается только формат 16 бит (RGB565)
+            return
+        x_start, y_start, x_end, y_end = self.window
+        x_end = min(x_end, self.width - 1)
+        y_end = min(y_end, self.height - 1)
+        width = x_end - x_start + 1
+        height = y_end - y_start + 1
+        if width <= 0 or height <= 0:
+            return
+
+        values = np.frombuffer(data, dtype='>u2', count=len(data) // 2)
+        area = width * height
+        if self.cursor == 0 and len(values) >= area:
+            self.memory[y_start:y_end + 1, x_start:x_end + 1] = values[:area].reshape(height, width)
+        else:
+            # Запись окна частями: курсор переносится между транзакциями
+            index = (self.cursor + np.arange(len(values))) % area
+            self.memory[y_start + index // width, x_start + index % width] = values
+        self.cursor = (self.cursor + len(values)) % area
+        self.pixels += len(values)
+
+    def delay(self, seconds):
+        self.delay_time += seconds
+        if self.realtime:
+            time.sleep(seconds)
+
+    def set_backlight(self, state):
+        self.backlight = bool(state)
+
+    def button_source(self):
+        return self.buttons
+
+    def frame(self):
+        """
+        Изображение на экране (RGB565, массив '>u2')
+
+        Учитываются перестановка и отражение осей MADCTL; выключенный
+        дисплей или подсветка дают черный экран.
+        """
+        if not (self.display_on and self.backlight) or self.sleeping:
+            return np.zeros((self.height, self.width), dtype='>u2')
+        frame = self.memory
+        if self.madctl & MADCTL_MV:
+            frame = frame.T
+        if self.madctl & MADCTL_MX:
+            frame = frame[:, ::-1]
+        if self.madctl & MADCTL_MY:
+            frame = frame[::-1, :]
+        return np.ascontiguousarray(frame)
+
+    def to_image(self):
+        """Изображение на экране как PIL Image RGB"""
+        frame = self.frame().astype(np.uint32)
+        rgb = np.empty(frame.shape + (3,), dtype=np.uint8)
+        rgb[..., 0] = ((frame >> 11) & 0x1F) * 255 // 31
+        rgb[..., 1] = ((frame >> 5) & 0x3F) * 255 // 63
+        rgb[..., 2] = (frame & 0x1F) * 255 // 31
+        return Image.fromarray(rgb, 'RGB')
+
+    def counters(self):
+        """Счетчики шины"""
+        return {
+            'transactions': self.transactions,
+            'bytes': self.bytes,
+            'pixels': self.pixels,
+            'bus_time': self.bus_time,
+        }
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Трассировка транзакций шины дисплея
+TracingBackend записывает каждую команду и передачу данных (время, команда,
+длина, параметры) в кольцевой файл фиксированного размера: при переполнении
+перезаписываются самые старые записи. Пиксели не сохраняются
+
+Включение: SPI_TRACE_CONFIG['enabled'] = True в config.py или
+    LCD_GAME_TRACE=/tmp/spi_trace.bin sudo -E python3 main.py
+
+Использование:
+    python3 spi_trace.py summary trace.bin
+    python3 spi_trace.py dump trace.bin [--limit N]
+    python3 spi_trace.py replay trace.bin [--backend simulated|spi|fbdev] [--speed 1.0] [--output frame.png]
+"""
+
+import os
+import sys
+import mmap
+import time
+import struct
+import argparse
+from collections import Counter
+from backends import DisplayBackend
+from config import *
+
+# Переменная окружения с путем трассы (включает трассировку)
+TRACE_ENV = 'LCD_GAME_TRACE'
+
+# Заголовок: сигнатура, размер записи, емкость кольца, всего записей,
+# время начала (Unix)
+HEADER = struct.Struct('<8sIIQd')
+# Запись: время от начала, тип, текущая команда, число параметров,
+# длина данных, первые байты параметров
+RECORD = struct.Struct('<dBBBxI16s')
+MAGIC = b'LCDTRC01'
+
+# Типы записей
+KIND_COMMAND = 0
+KIND_DATA = 1
+KIND_DELAY = 2  # длина - пауза в микросекундах
+KIND_BACKLIGHT = 3  # длина - 0 или 1
+KIND_NAMES = {KIND_COMMAND: 'CMD', KIND_DATA: 'DATA', KIND_DELAY: 'DELAY', KIND_BACKLIGHT: 'BL'}
+
+# Имена команд ST7789 для отчетов
+COMMAND_NAMES = {
+    0x01: 'SWRESET', 0x10: 'SLPIN', 0x11: 'SLPOUT', 0x20: 'INVOFF', 0x21: 'INVON',
+    0x28: 'DISPOFF', 0x29: 'DISPON', 0x2A: 'CASET', 0x2B: 'RASET', 0x2C: 'RAMWR',
+    0x36: 'MADCTL', 0x3A: 'COLMOD',
+}
+CASET = 0x2A
+RASET = 0x2B
+RAMWR = 0x2C
+
+
+def trace_path():
+    """Путь трассы, если трассировка включена, иначе None"""
+    path = os.environ.get(TRACE_ENV)
+    if path:
+        return path
+    if SPI_TRACE_CONFIG['enabled']:
+        return SPI_TRACE_CONFIG['path']
+    return None
+
+
+def command_name(cmd):
+    return COMMAND_NAMES.get(cmd, f"0x{cmd:02X}")
+
+
+class TraceWriter:
+    """
+    Кольцевой файл трассы (отображается через mmap)
+    """
+
+    def __init__(self, path, max_bytes=SPI_TRACE_CONFIG['max_bytes']):
+        self.capacity = max(1, (max_bytes - HEADER.size) // RECORD.size)
+        self.count = 0
+        self.start = time.perf_counter()
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        size = HEADER.size + self.capacity * RECORD.size
+        fd = os.open(path, os.O_CREAT | os.O_RDWR | os.O_TRUNC, 0o644)
+        try:
+            os.ftruncate(fd, size)
+            self.map = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        HEADER.pack_into(self.map, 0, MAGIC, RECORD.size, self.capacity, 0, time.time())
+
+    def write(self, kind, cmd, length, params=b""):
+        """Добавление записи (самая старая перезаписывается)"""
+        offset = HEADER.size + (self.count % self.capacity) * RECORD.size
+        RECORD.pack_into(self.map, offset, time.perf_counter() - self.start,
+                         kind, cmd, min(len(params), 255), length, params[:16])
+        self.count += 1
+        struct.pack_into('<Q', self.map, 16, self.count)
+
+    def close(self):
+        if self.map is not None:
+            self.map.flush()
+            self.map.close()
+            self.map = None
+
+
+def read_trace(path):
+    """
+    Чтение трассы
+
+    Returns:
+        tuple: (время начала, всего записей, список записей
+        (время, тип, команда, параметры, длина)) - записи по порядку, только
+        сохранившиеся в кольце
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, record_size, capacity, count, started = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or record_size != RECORD.size:
+        raise ValueError(f"{path}: не файл трассы")
+
+    records = []
+    for seq in range(max(0, count - capacity), count):
+        offset = HEADER.size + (seq % capacity) * RECORD.size
+        timestamp, kind, cmd, nparams, length, params = RECORD.unpack_from(data, offset)
+        records.append((timestamp, kind, cmd, params[:min(nparams, 16)], length))
+    return started, count, records
+
+
+class TracingBackend(DisplayBackend):
+    """
+    Бэкенд-обертка, записывающий поток команд в трассу
+
+    Запись идет на уровне command/data, поэтому трасса совпадает с тем, что
+    получает шина, для любого бэкенда.
+    """
+
+    def __init__(self, inner, path):
+        self.inner = inner
+        self.name = inner.name
+        self.preinitialized = inner.preinitialized
+        self.writer = TraceWriter(path)
+        self._command = None
+        print(f"Трассировка шины дисплея: {path}")
+
+    def open(self):
+        self.inner.open()
+
+    def reset(self):
+        self.inner.reset()
+
+    def command(self, cmd):
+        self._command = cmd
+        self.writer.write(KIND_COMMAND, cmd, 1)
+        self.inner.command(cmd)
+
+    def data(self, data):
+        params = bytes(data) if isinstance(data, list) or len(data) <= 16 else b""
+        self.writer.write(KIND_DATA, self._command or 0, len(data), params)
+        self.inner.data(data)
+
+    def delay(self, seconds):
+        self.writer.write(KIND_DELAY, self._command or 0, int(seconds * 1000000))
+        self.inner.delay(seconds)
+
+    def set_backlight(self, state):
+        self.writer.write(KIND_BACKLIGHT, 0, 1 if state else 0)
+        self.inner.set_backlight(state)
+
+    def button_source(self):
+        return self.inner.button_source()
+
+    def close(self):
+        self.writer.close()
+        self.inner.close()
+
+
+def summarize(records, width=DISPLAY_WIDTH, height=DISPLAY_HEIGHT):
+    """
+    Сводка трассы
+
+    Returns:
+        dict: Байты и число транзакций по командам, установки окна (в т.ч.
+        повторные с тем же окном), полные и частичные передачи кадра
+    """
+    per_command = Counter()
+    bytes_per_command = Counter()
+    window_sets = 0
+    redundant_windows = 0
+    full_flushes = 0
+    partial_flushes = 0
+    full_bytes = 0
+    partial_bytes = 0
+    window = {CASET: None, RASET: None}
+
+    for timestamp, kind, cmd, params, length in records:
+        if kind == KIND_COMMAND:
+            per_command[cmd] += 1
+            bytes_per_command[cmd] += 1
+        elif kind == KIND_DATA:
+            bytes_per_command[cmd] += length
+            if cmd in window and len(params) >= 4:
+                window_sets += 1
+                span = ((params[0] << 8) | params[1], (params[2] << 8) | params[3])
+                if window[cmd] == span:
+                    redundant_windows += 1
+                window[cmd] = span
+            elif cmd == RAMWR:
+                x_span = window[CASET] or (0, width - 1)
+                y_span = window[RASET] or (0, height - 1)
+                if x_span == (0, width - 1) and y_span == (0, height - 1):
+                    full_flushes += 1
+                    full_bytes += length
+                else:
+                    partial_flushes += 1
+                    partial_bytes += length
+
+    duration = records[-1][0] - records[0][0] if records else 0.0
+    return {
+        'records': len(records),
+        'duration': duration,
+        'bytes': sum(bytes_per_command.values()),
+        'commands': per_command,
+        'bytes_per_command': bytes_per_command,
+        'window_sets': window_sets,
+        'redundant_windows': redundant_windows,
+        'full_flushes': full_flushes,
+        'partial_flushes': partial_flushes,
+        'full_bytes': full_bytes,
+        'partial_bytes': partial_bytes,
+    }
+
+
+def print_summary(path):
+    started, count, records = read_trace(path)
+    summary = summarize(records)
+    print(f"Трасса: {path}")
+    print(f"Начало: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(started))}")
+    print(f"Записей: {summary['records']} (всего {count}, "
+          f"перезаписано {count - summary['records']})")
+    print(f"Длительность: {summary['duration']:.3f} с, байт: {summary['bytes']}")
+    if summary['duration'] > 0:
+        print(f"Средняя загрузка шины: {summary['bytes'] / summary['duration'] / 1024:.1f} КиБ/с")
+
+    print("\nКоманда      транзакций        байт")
+    for cmd, total in summary['bytes_per_command'].most_common():
+        print(f"{command_name(cmd):10} {summary['commands'][cmd]:12} {total:11}")
+
+    print(f"\nУстановок окна: {summary['window_sets']}, "
+          f"повторных (то же окно): {summary['redundant_windows']}")
+    flushes = summary['full_flushes'] + summary['partial_flushes']
+    print(f"Передач пикселей: {flushes} - полных {summary['full_flushes']} "
+          f"({summary['full_bytes']} байт), частичных {summary['partial_flushes']} "
+          f"({summary['partial_bytes']} байт)")
+
+
+def dump(path, limit=None):
+    started, count, records = read_trace(path)
+    for timestamp, kind, cmd, params, length in records[:limit]:
+        detail = f" {params.hex(' ')}" if params else ""
+        print(f"{timestamp:12.6f} {KIND_NAMES.get(kind, kind):6} {command_name(cmd):8} {length:8}{detail}")
+
+
+def replay(path, backend_name='simulated', speed=1.0, output=None):
+    """
+    Воспроизведение трассы на бэкенде
+
+    Команды и параметры повторяются как были; пиксели в трассе не хранятся,
+    поэтому каждая передача заливает свое окно отдельным цветом - видно,
+    какие области и в каком порядке обновлялись.
+
+    Args:
+        path (str): Файл трассы
+        backend_name (str): 'simulated', 'spi' или 'fbdev'
+        speed (float): Множитель скорости (0 - без пауз)
+        output (str): PNG с итоговым изображением (только simulated)
+    """
+    from backends import create_backend
+
+    started, count, records = read_trace(path)
+    backend = create_backend(backend_name, trace=False)
+    backend.open()
+    colors = [0xF800, 0x07E0, 0x001F, 0xFFE0, 0xF81F, 0x07FF, 0xFFFF]
+    flushes = 0
+    replay_start = time.perf_counter()
+    first = records[0][0] if records else 0.0
+    try:
+        for timestamp, kind, cmd, params, length in records:
+            if speed > 0:
+                pause = (timestamp - first) / speed - (time.perf_counter() - replay_start)
+                if pause > 0:
+                    time.sleep(pause)
+            if kind == KIND_COMMAND:
+                backend.command(cmd)
+            elif kind == KIND_DATA:
+                if cmd == RAMWR:
+                    color = colors[flushes % len(colors)]
+                    backend.data(bytes([color >> 8, color & 0xFF]) * (length // 2))
+                    flushes += 1
+                else:
+                    backend.data(list(params))
+            elif kind == KIND_DELAY and speed <= 0:
+                # Без пауз по времени трассы паузы контроллера все равно нужны
+                backend.delay(length / 1000000.0)
+            elif kind == KIND_BACKLIGHT:
+                backend.set_backlight(bool(length))
+        print(f"Воспроизведено записей: {len(records)}, передач пикселей: {flushes}")
+        if output and hasattr(backend, 'to_image'):
+            backend.to_image().save(output)
+            print(f"Изображение: {output}")
+    finally:
+        backend.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Трасса шины дисплея")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    summary_parser = commands.add_parser('summary', help="сводка по трассе")
+    summary_parser.add_argument('trace')
+
+    dump_parser = commands.add_parser('dump', help="записи трассы")
+    dump_parser.add_argument('trace')
+    dump_parser.add_argument('--limit', type=int, default=None)
+
+    replay_parser = commands.add_parser('replay', help="воспроизвести трассу")
+    replay_parser.add_argument('trace')
+    replay_parser.add_argument('--backend', default='simulated', choices=['simulated', 'spi', 'fbdev'])
+    replay_parser.add_argument('--speed', type=float, default=1.0, help="0 - без пауз")
+    replay_parser.add_argument('--output', default=None, help="PNG итогового кадра (simulated)")
+
+    args = parser.parse_args()
+    try:
+        if args.command == 'summary':
+            print_summary(args.trace)
+        elif args.command == 'dump':
+            dump(args.trace, args.limit)
+        else:
+            replay(args.trace, args.backend, args.speed, args.output)
+    except (OSError, ValueError) as e:
+        print(f"Ошибка: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
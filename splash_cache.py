@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Кэш кадров анимации заставки
+Кадры хранятся как изменившиеся области в формате RGB565 и при следующих
+загрузках проигрываются из файла через mmap без отрисовки и конвертации
+"""
+
+import os
+import mmap
+import time
+import struct
+import hashlib
+import numpy as np
+
+# Заголовок: сигнатура, ключ содержимого, размер кадра, число кадров,
+# смещение и длина последнего полного кадра
+HEADER = struct.Struct('<8s32sHHIII')
+# Область кадра: x, y, ширина, высота, пауза после области (мкс; ненулевая
+# только у последней области кадра), смещение и длина данных
+FRAME = struct.Struct('<HHHHIII')
+MAGIC = b'LCDSPL01'
+# Размер плитки при поиске изменившихся областей
+TILE_SIZE = 16
+
+
+def cache_key(paths, settings):
+    """
+    Ключ содержимого анимации
+
+    Меняется при изменении кода заставки или настроек, влияющих на кадры.
+
+    Args:
+        paths (list): Файлы, от которых зависят кадры (код заставки, шрифт)
+        settings: Значения настроек (должны иметь стабильный repr)
+
+    Returns:
+        bytes: SHA-256 (32 байта)
+    """
+    digest = hashlib.sha256(repr(settings).encode())
+    for path in paths:
+        try:
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        except OSError:
+            digest.update(path.encode())
+    return digest.digest()
+
+
+def dirty_rects(previous, current, tile=TILE_SIZE):
+    """
+    Изменившиеся области кадра
+
+    Кадр делится на плитки; в каждой полосе плиток соседние изменившиеся
+    плитки объединяются в один прямоугольник. Для тонких фигур (контур
+    круга) это в разы меньше данных, чем общий ограничивающий прямоугольник.
+
+    Args:
+        previous: Предыдущий кадр (массив uint16 height x width) или None
+        current: Текущий кадр
+        tile (int): Размер плитки
+
+    Returns:
+        list: Прямоугольники (x, y, width, height)
+    """
+    height, width = current.shape
+    if previous is None:
+        return [(0, 0, width, height)]
+
+    changed = previous != current
+    rows = -(-height // tile)
+    cols = -(-width // tile)
+    padded = np.zeros((rows * tile, cols * tile), dtype=bool)
+    padded[:height, :width] = changed
+    tiles = padded.reshape(rows, tile, cols, tile).any(axis=(1, 3))
+    return tile_rects(tiles, tile, width, height)
+
+
+def tile_rects(tiles, tile, width, height):
+    """
+    Прямоугольники из карты изменившихся плиток
+
+    Args:
+        tiles: Массив bool (строки x столбцы плиток)
+        tile (int): Размер плитки
+        width (int): Ширина кадра
+        height (int): Высота кадра
+
+    Returns:
+        list: Прямоугольники (x, y, width, height)
+    """
+    cols = tiles.shape[1]
+    rects = []
+    for row in np.flatnonzero(tiles.any(axis=1)):
+        y = int(row) * tile
+        tile_height = min(tile, height - y)
+        run_start = None
+        for col in range(cols + 1):
+            if col < cols and tiles[row, col]:
+                if run_start is None:
+                    run_start = col
+            elif run_start is not None:
+                x = run_start * tile
+                rects.append((x, y, min(col * tile, width) - x, tile_height))
+                run_start = None
+    return rects
+
+
+class SplashRecorder:
+    """
+    Запись кадров анимации в файл кэша
+
+    Каждый кадр сохраняется как области, изменившиеся относительно
+    предыдущего; неизменившиеся кадры только продлевают паузу.
+    """
+
+    def __init__(self, width, height, key):
+        self.width = width
+        self.height = height
+        self.key = key
+        self.frames = []
+        self.chunks = []
+        self.size = 0
+        self._previous = None
+        self._last_payload = None
+
+    def add(self, payload, delay):
+        """
+        Добавление кадра
+
+        Args:
+            payload (bytes): Полный кадр RGB565 (старший байт первым)
+            delay (float): Пауза после кадра в секундах
+        """
+        current = np.frombuffer(payload, dtype='>u2').reshape(self.height, self.width)
+        rects = dirty_rects(self._previous, current)
+        self._previous = current
+        self._last_payload = payload
+        delay_us = int(delay * 1000000)
+
+        for index, (x, y, width, height) in enumerate(rects):
+            data = current[y:y + height, x:x + width].tobytes()
+            # Пауза - после последней области кадра
+            pause = delay_us if index == len(rects) - 1 else 0
+            self.frames.append((x, y, width, height, pause, self.size, len(data)))
+            self.chunks.append(data)
+            self.size += len(data)
+
+        if not rects and self.frames:
+            # Кадр не изменился - продлеваем паузу предыдущего
+            x, y, width, height, previous_delay, offset, length = self.frames[-1]
+            self.frames[-1] = (x, y, width, height, previous_delay + delay_us, offset, length)
+
+    def save(self, path):
+        """
+        Запись файла кэша (атомарно через временный файл)
+
+        Returns:
+            bool: True если файл записан
+        """
+        if self._last_payload is None:
+            return False
+
+        data_start = HEADER.size + FRAME.size * len(self.frames)
+        final_offset = data_start + self.size
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, self.key, self.width, self.height, len(self.frames),
+                                    final_offset, len(self._last_payload)))
+                for x, y, width, height, delay, offset, length in self.frames:
+                    f.write(FRAME.pack(x, y, width, height, delay, data_start + offset, length))
+                for chunk in self.chunks:
+                    f.write(chunk)
+                f.write(self._last_payload)
+            os.replace(temp_path, path)
+            return True
+        except OSError as e:
+            print(f"Не удалось сохранить кэш заставки: {e}")
+            return False
+
+
+class SplashCache:
+    """
+    Проигрывание записанной анимации из файла через mmap
+
+    Данные областей передаются на дисплей прямо из отображенной памяти,
+    кадры выводятся по абсолютному расписанию от момента старта.
+    """
+
+    def __init__(self, path, key, width, height):
+        """
+        Открытие файла кэша
+
+        Args:
+            path (str): Путь к файлу
+            key (bytes): Ожидаемый ключ содержимого
+            width (int): Ширина кадра
+            height (int): Высота кадра
+        """
+        self.path = path
+        self.map = None
+        self.frames = []
+        self.final = None
+
+        try:
+            with open(path, 'rb') as f:
+                self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return
+
+        try:
+            magic, file_key, file_width, file_height, count, final_offset, final_length = \
+                HEADER.unpack_from(self.map, 0)
+            if (magic, file_key, file_width, file_height) != (MAGIC, key, width, height):
+                raise ValueError("ключ не совпадает")
+            self.frames = [FRAME.unpack_from(self.map, HEADER.size + i * FRAME.size) for i in range(count)]
+            if final_offset + final_length > len(self.map):
+                raise ValueError("файл обрезан")
+            self.final = (final_offset, final_length)
+        except (struct.error, ValueError):
+            # Устаревший или поврежденный кэш будет перезаписан
+            self.close()
+
+    @property
+    def valid(self):
+        """Можно ли проигрывать кэш"""
+        return self.map is not None
+
+    def final_frame(self):
+        """Последний кадр анимации целиком (для восстановления буфера дисплея)"""
+        offset, length = self.final
+        return self.map[offset:offset + length]
+
+    def play(self, lcd, stop_event=None):
+        """
+        Проигрывание анимации
+
+        Args:
+            lcd: Экземпляр LCDGame
+            stop_event: threading.Event; если установлен - сразу показать последний кадр
+
+        Returns:
+            bool: True если анимация проиграна до конца, False если прервана
+        """
+        view = memoryview(self.map)
+        deadline = time.perf_counter()
+        try:
+            for x, y, width, height, delay, offset, length in self.frames:
+                if stop_event is not None and stop_event.is_set():
+                    offset, length = self.final
+                    lcd.write_frame(view[offset:offset + length])
+                    return False
+                lcd.write_region(x, y, width, height, view[offset:offset + length])
+                deadline += delay / 1000000.0
+                pause = deadline - time.perf_counter()
+                if pause > 0:
+                    if stop_event is not None:
+                        stop_event.wait(pause)
+                    else:
+                        time.sleep(pause)
+            return True
+        finally:
+            view.release()
+
+    def close(self):
+        """Закрытие отображения"""
+        if self.map is not None:
+            self.map.close()
+            self.map = None
@@ -7,10 +7,10 @@
 import os
 import sys
 import subprocess
-import shutil
 import json
-import time
 from pathlib import Path
+from boot_config import BootConfig
+from backup_store import BackupStore
 from config import *
 
 class SystemManager:
@@ -23,6 +23,7 @@ class SystemManager:
         self.config_file = ROTATION_CONFIG['config_file']
         self.calibration_dir = ROTATION_CONFIG['calibration_dir']
         self.current_rotation = ROTATION_CONFIG['current_rotation']
+        self.boot_config = None
         
     def check_root_permissions(self):
         """Проверка прав администратора"""
@@ -33,25 +34,25 @@ class SystemManager:
         return True
     
     def backup_system_config(self):
-        """Резервное копирование системной конфигурации"""
+        """
+        Резервное копирование системной конфигурации
+        
+        Каждое уникальное содержимое хранится один раз (backup_store.py);
+        неизменившиеся файлы ничего не записывают.
+        """
         try:
-            backup_dir = SYSTEM_CONFIG['backup_path']
-            os.makedirs(backup_dir, exist_ok=True)
+            store = BackupStore(SYSTEM_CONFIG['backup_path'])
+            calibration_file = f"{self.calibration_dir}/99-calibration.conf"
             
-            timestamp = time.strftime("%Y%m%d_%H%M%S")
+            for path, (digest, added) in store.backup([self.config_file, calibration_file]).items():
+                if added:
+                    print(f"✓ Резервная копия {path}: {digest[:12]}")
+                else:
+                    print(f"✓ {path} не изменился с последней копии")
             
-            # Резервное копирование config.txt
-            if os.path.exists(self.config_file):
-                backup_file = f"{backup_dir}/config.txt.{timestamp}"
-                shutil.copy2(self.config_file, backup_file)
-                print(f"✓ Резервная копия config.txt: {backup_file}")
-            
-            # Резервное копирование калибровки
-            calibration_file = f"{self.calibration_dir}/99-calibration.conf"
-            if os.path.exists(calibration_file):
-                backup_file = f"{backup_dir}/99-calibration.conf.{timestamp}"
-                shutil.copy2(calibration_file, backup_file)
-                print(f"✓ Резервная копия калибровки: {backup_file}")
+            removed = store.prune()
+            if removed:
+                print(f"✓ Удалено старых копий: {removed}")
             
             return True
             
@@ -59,81 +60,91 @@ class SystemManager:
             print(f"✗ Ошибка резервного копирования: {e}")
             return False
     
-    def setup_spi_interface(self):
-        """Настройка SPI интерфейса"""
+    def load_boot_config(self):
+        """
+        Разобранный config.txt (читается один раз)
+        
+        Returns:
+            BootConfig
+        """
+        if self.boot_config is None:
+            self.boot_config = BootConfig(self.config_file)
+        return self.boot_config
+    
+    def commit_boot_config(self):
+        """Запись накопленных изменений config.txt одной атомарной заменой"""
         try:
-            # Проверка существующей настройки
-            with open(self.config_file, 'r') as f:
-                config_content = f.read()
-            
-            if 'dtparam=spi=on' not in config_content:
-                # Добавление настройки SPI
-                with open(self.config_file, 'a') as f:
-                    f.write('\n# LCD Game Driver SPI Configuration\ndtparam=spi=on\n')
+            if self.load_boot_config().commit():
+                print(f"✓ {self.config_file} обновлен")
+            else:
+                print(f"✓ {self.config_file} не изменился")
+            return True
+            
+        except Exception as e:
+            print(f"✗ Ошибка записи {self.config_file}: {e}")
+            return False
+    
+    def setup_spi_interface(self, commit=True):
+        """
+        Настройка SPI интерфейса
+        
+        Args:
+            commit (bool): Сразу записать config.txt (False - запись
+                позже через commit_boot_config)
+        """
+        try:
+            boot_config = self.load_boot_config()
+            if boot_config.set('dtparam=spi', 'on', comment="LCD Game Driver SPI Configuration"):
                 print("✓ SPI интерфейс включен")
             else:
                 print("✓ SPI интерфейс уже настроен")
             
-            return True
+            return self.commit_boot_config() if commit else True
             
         except Exception as e:
             print(f"✗ Ошибка настройки SPI: {e}")
             return False
     
-    def setup_gpio_pullup(self):
-        """Настройка подтягивающих резисторов GPIO"""
+    def setup_gpio_pullup(self, commit=True):
+        """
+        Настройка подтягивающих резисторов GPIO
+        
+        Args:
+            commit (bool): Сразу записать config.txt
+        """
         try:
-            with open(self.config_file, 'r') as f:
-                config_content = f.read()
+            boot_config = self.load_boot_config()
             
             # Добавление подтягивающих резисторов для кнопок
             gpio_pins = ','.join([str(pin) for pin in BUTTON_PINS.values()])
-            gpio_config = f"gpio={gpio_pins}=pu"
-            
-            if gpio_config not in config_content:
-                with open(self.config_file, 'a') as f:
-                    f.write(f'\n# LCD Game Driver GPIO Configuration\n{gpio_config}\n')
+            if boot_config.set(f"gpio={gpio_pins}", 'pu', comment="LCD Game Driver GPIO Configuration"):
                 print("✓ Подтягивающие резисторы GPIO настроены")
             else:
                 print("✓ Подтягивающие резисторы GPIO уже настроены")
             
-            return True
+            return self.commit_boot_config() if commit else True
             
         except Exception as e:
             print(f"✗ Ошибка настройки GPIO: {e}")
             return False
     
-    def set_display_rotation(self, angle):
+    def set_display_rotation(self, angle, commit=True):
         """
         Установка поворота экрана
         
         Args:
             angle (int): Угол поворота (0, 90, 180, 270)
+            commit (bool): Сразу записать config.txt
         """
         if angle not in ROTATION_CONFIG['supported_angles']:
             print(f"✗ Неподдерживаемый угол поворота: {angle}")
             return False
         
         try:
-            # Чтение текущей конфигурации
-            with open(self.config_file, 'r') as f:
-                lines = f.readlines()
-            
-            # Поиск и замена существующей настройки поворота
-            rotation_found = False
-            for i, line in enumerate(lines):
-                if line.strip().startswith('display_rotate='):
-                    lines[i] = f'display_rotate={angle}\n'
-                    rotation_found = True
-                    break
-            
-            # Добавление новой настройки, если не найдена
-            if not rotation_found:
-                lines.append(f'display_rotate={angle}\n')
-            
-            # Запись обновленной конфигурации
-            with open(self.config_file, 'w') as f:
-                f.writelines(lines)
+            # Замена существующей настройки поворота (повторы удаляются)
+            self.load_boot_config().set('display_rotate', angle)
+            if commit and not self.commit_boot_config():
+                return False
             
             # Обновление калибровки сенсора
             self.update_touch_calibration(angle)
@@ -187,51 +198,114 @@ EndSection
     def get_current_rotation(self):
         """Получение текущего поворота экрана"""
         try:
-            with open(self.config_file, 'r') as f:
-                config_content = f.read()
-            
-            for line in config_content.split('\n'):
-                if line.strip().startswith('display_rotate='):
-                    angle = int(line.split('=')[1].strip())
-                    self.current_rotation = angle
-                    return angle
-            
-            return 0
+            angle = int(self.load_boot_config().get('display_rotate', default=0))
+            self.current_rotation = angle
+            return angle
             
         except Exception as e:
             print(f"✗ Ошибка получения поворота: {e}")
             return 0
     
-    def install_systemd_service(self):
-        """Установка systemd сервиса"""
-        try:
-            service_content = f"""[Unit]
+    def service_units(self):
+        """
+        Тексты unit-файлов systemd (единственное место, где они формируются;
+        install_enhanced.sh вызывает system_manager.py --write-units)
+        
+        Returns:
+            dict: Имя unit-файла -> содержимое
+        """
+        name = SYSTEM_CONFIG['service_name']
+        install_path = SYSTEM_CONFIG['install_path']
+        # Основной сервис рисует через сервер дисплея и без него не запускается
+        service_content = f"""[Unit]
 Description=LCD Game Driver Service
-After=network.target
+After=network.target {name}-splash.service {name}-display.service
+Requires={name}-display.service
 
 [Service]
 Type=simple
 User={SYSTEM_CONFIG['service_user']}
 Group={SYSTEM_CONFIG['service_group']}
-WorkingDirectory={SYSTEM_CONFIG['install_path']}
-Environment=PATH={SYSTEM_CONFIG['install_path']}/venv/bin
-ExecStart={SYSTEM_CONFIG['install_path']}/venv/bin/python3 {SYSTEM_CONFIG['install_path']}/main.py
+WorkingDirectory={install_path}
+Environment=PATH={install_path}/venv/bin
+ExecStart={install_path}/venv/bin/python3 {install_path}/main.py
 Restart=always
 RestartSec=10
 
 [Install]
 WantedBy=multi-user.target
 """
-            
-            service_file = f"/etc/systemd/system/{SYSTEM_CONFIG['service_name']}.service"
-            with open(service_file, 'w') as f:
-                f.write(service_content)
+        
+        # Сервер дисплея - единственный владелец SPI и GPIO; готов (Type=notify),
+        # когда сокет уже принимает подключения
+        display_content = f"""[Unit]
+Description=LCD Game Display Server
+After={name}-splash.service
+
+[Service]
+Type=notify
+NotifyAccess=main
+User={SYSTEM_CONFIG['service_user']}
+Group={SYSTEM_CONFIG['service_group']}
+WorkingDirectory={install_path}
+ExecStart={install_path}/venv/bin/python3 {install_path}/display_server.py
+Restart=always
+RestartSec=2
+
+[Install]
+WantedBy=multi-user.target
+"""
+        
+        # Ранняя заставка: логотип на панели задолго до запуска основной системы.
+        # /dev/spidev и /dev/gpiomem создает udev coldplug: заставка идет после
+        # systemd-udev-trigger и сама ждет узлы (early_splash.wait_for_devices).
+        # /run/lcd_game (отметка инициализации панели и сокет сервера дисплея)
+        # принадлежит root и группе сервиса: чужие пользователи не могут
+        # подложить или заменить файлы, подключаться к сокету - могут
+        splash_content = f"""[Unit]
+Description=LCD Game Early Splash
+DefaultDependencies=no
+Wants=systemd-udev-trigger.service
+After=local-fs.target systemd-modules-load.service systemd-udev-trigger.service
+Before=sysinit.target {name}-display.service {name}.service
+
+[Service]
+Type=oneshot
+RemainAfterExit=yes
+Group={SYSTEM_CONFIG['service_group']}
+RuntimeDirectory=lcd_game
+RuntimeDirectoryMode=0775
+RuntimeDirectoryPreserve=yes
+WorkingDirectory={install_path}
+ExecStart={install_path}/venv/bin/python3 -E -s {install_path}/early_splash.py
+
+[Install]
+WantedBy=sysinit.target
+"""
+        return {
+            f"{name}.service": service_content,
+            f"{name}-display.service": display_content,
+            f"{name}-splash.service": splash_content,
+        }
+    
+    def write_service_units(self):
+        """Запись unit-файлов в /etc/systemd/system"""
+        for unit, content in self.service_units().items():
+            with open(f"/etc/systemd/system/{unit}", 'w') as f:
+                f.write(content)
+    
+    def install_systemd_service(self):
+        """Установка systemd сервиса"""
+        try:
+            self.write_service_units()
             
             # Перезагрузка systemd
             subprocess.run(['systemctl', 'daemon-reload'], check=True)
             
             # Включение автозапуска
             subprocess.run(['systemctl', 'enable', f'{SYSTEM_CONFIG["service_name"]}.service'], check=True)
+            subprocess.run(['systemctl', 'enable', f'{SYSTEM_CONFIG["service_name"]}-display.service'], check=True)
+            subprocess.run(['systemctl', 'enable', f'{SYSTEM_CONFIG["service_name"]}-splash.service'], check=True)
             
             print("✓ Systemd сервис установлен и включен")
             return True
@@ -289,70 +363,71 @@ X-GNOME-Autostart-enabled=true
     def create_mouse_emulator(self):
         """Создание эмулятора мыши"""
         try:
-            mouse_script = f"""#!/usr/bin/env python3
+            mouse_script = """#!/usr/bin/env python3
 \"\"\"
 Эмулятор мыши для LCD Game Driver
+Кнопки приходят от сервера дисплея (display_server.py): эмулятор не
+настраивает GPIO и не забирает дисплей у рабочего стола
 \"\"\"
 
 from pymouse import PyMouse
 import time
-import RPi.GPIO as GPIO
+from display_server import open_display
 from config import *
 
-GPIO.setmode(GPIO.BCM)
-
-# Настройка кнопок
-for button_name, pin in BUTTON_PINS.items():
-    GPIO.setup(pin, GPIO.IN, GPIO.PUD_UP)
-
 def main():
     m = PyMouse()
-    button_flags = {{}}
+    lcd = open_display()
+    lcd.watch_buttons()
+    button_flags = {}
     
     for button_name in BUTTON_PINS.keys():
         button_flags[button_name] = False
     
     print("Эмулятор мыши запущен...")
     
-    while True:
-        current_pos = m.position()
-        
-        # Обработка кнопок
-        for button_name, pin in BUTTON_PINS.items():
-            if not GPIO.input(pin):  # Кнопка нажата
-                if not button_flags[button_name]:
-                    button_flags[button_name] = True
-                    
-                    if button_name in ['A', 'B']:
-                        # Эмуляция клика
-                        click_type = 1 if button_name == 'A' else 2
-                        m.click(current_pos[0], current_pos[1], click_type)
-                        print(f"Клик: {{button_name}}")
-                    else:
-                        # Эмуляция движения мыши
-                        move_speed = MOUSE_CONFIG['move_speed']
-                        if button_name == 'UP':
-                            m.move(current_pos[0], current_pos[1] - move_speed)
-                        elif button_name == 'DOWN':
-                            m.move(current_pos[0], current_pos[1] + move_speed)
-                        elif button_name == 'LEFT':
-                            m.move(current_pos[0] - move_speed, current_pos[1])
-                        elif button_name == 'RIGHT':
-                            m.move(current_pos[0] + move_speed, current_pos[1])
+    try:
+        while True:
+            current_pos = m.position()
+            
+            # Обработка кнопок
+            for button_name in BUTTON_PINS.keys():
+                if lcd.buttons.is_held(button_name):  # Кнопка нажата
+                    if not button_flags[button_name]:
+                        button_flags[button_name] = True
                         
-                        print(f"Движение: {{button_name}}")
-            
-            elif button_flags[button_name]:  # Кнопка отпущена
-                button_flags[button_name] = False
-        
-        time.sleep(MOUSE_CONFIG['poll_interval'])
+                        if button_name in ['A', 'B']:
+                            # Эмуляция клика
+                            click_type = 1 if button_name == 'A' else 2
+                            m.click(current_pos[0], current_pos[1], click_type)
+                            print(f"Клик: {button_name}")
+                        else:
+                            # Эмуляция движения мыши
+                            move_speed = MOUSE_CONFIG['move_speed']
+                            if button_name == 'UP':
+                                m.move(current_pos[0], current_pos[1] - move_speed)
+                            elif button_name == 'DOWN':
+                                m.move(current_pos[0], current_pos[1] + move_speed)
+                            elif button_name == 'LEFT':
+                                m.move(current_pos[0] - move_speed, current_pos[1])
+                            elif button_name == 'RIGHT':
+                                m.move(current_pos[0] + move_speed, current_pos[1])
+                            
+                            print(f"Движение: {button_name}")
+                
+                elif button_flags[button_name]:  # Кнопка отпущена
+                    button_flags[button_name] = False
+            
+            time.sleep(MOUSE_CONFIG['poll_interval'])
+    finally:
+        # Только отключение от сервера: подтяжки кнопок не трогаются
+        lcd.cleanup()
 
 if __name__ == "__main__":
     try:
         main()
     except KeyboardInterrupt:
         print("\\nЭмулятор мыши остановлен")
-        GPIO.cleanup()
 """
             
             mouse_file = f"{SYSTEM_CONFIG['install_path']}/mouse_emulator.py"
@@ -370,38 +445,24 @@ if __name__ == "__main__":
             return False
     
     def test_system_integration(self):
-        """Тестирование системной интеграции"""
+        """Тестирование системной интеграции (проверки выполняются параллельно)"""
         try:
-            print("Тестирование системной интеграции...")
-            
-            # Проверка SPI
-            if not os.path.exists('/dev/spidev0.0'):
-                print("✗ SPI устройство не найдено")
-                return False
+            import self_test
             
-            # Проверка GPIO
-            try:
-                import RPi.GPIO as GPIO
-                GPIO.setmode(GPIO.BCM)
-                GPIO.cleanup()
-                print("✓ GPIO доступен")
-            except Exception as e:
-                print(f"✗ Ошибка GPIO: {e}")
-                return False
-            
-            # Проверка поворота
-            current_rotation = self.get_current_rotation()
-            print(f"✓ Текущий поворот: {current_rotation}°")
-            
-            # Проверка калибровки
-            calibration_file = f"{self.calibration_dir}/99-calibration.conf"
-            if os.path.exists(calibration_file):
-                print("✓ Файл калибровки найден")
-            else:
-                print("⚠ Файл калибровки не найден")
-            
-            print("✓ Системная интеграция работает")
-            return True
+            print("Тестирование системной интеграции...")
+            # Сервис запустится после перезагрузки, калибровку создает
+            # только поворот экрана, а подтяжки gpio=...=pu из config.txt
+            # действуют тоже только после перезагрузки (до нее часть кнопок
+            # подтянута вниз и выглядит нажатой) - при установке проверка
+            # gpio сводится к доступу к регистрам
+            skipped = ('service', 'calibration', 'gpio')
+            checks = [name for name in self_test.CHECKS if name not in skipped]
+            report = self_test.run(checks)
+            self_test.print_report(report)
+            
+            gpiomem = os.access('/dev/gpiomem', os.R_OK)
+            print(f"{'✓' if gpiomem else '✗'} /dev/gpiomem {'доступен' if gpiomem else 'недоступен'}")
+            return report['ok'] and gpiomem
             
         except Exception as e:
             print(f"✗ Ошибка тестирования: {e}")
@@ -416,6 +477,15 @@ def main():
     
     manager = SystemManager()
     
+    if '--write-units' in sys.argv[1:]:
+        # Только unit-файлы systemd (для install_enhanced.sh)
+        manager.write_service_units()
+        print("✓ Unit-файлы systemd записаны")
+        return
+    if '--mouse-emulator' in sys.argv[1:]:
+        # Только эмулятор мыши (для install_enhanced.sh)
+        sys.exit(0 if manager.create_mouse_emulator() else 1)
+    
     print("=" * 50)
     print("Системный менеджер LCD Game Driver")
     print("=" * 50)
@@ -423,9 +493,10 @@ def main():
     # Резервное копирование
     manager.backup_system_config()
     
-    # Настройка системы
-    manager.setup_spi_interface()
-    manager.setup_gpio_pullup()
+    # Настройка системы: config.txt записывается один раз и только при изменениях
+    manager.setup_spi_interface(commit=False)
+    manager.setup_gpio_pullup(commit=False)
+    manager.commit_boot_config()
     
     # Установка сервисов
     manager.install_systemd_service()
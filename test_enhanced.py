@@ -7,7 +7,6 @@
 import time
 import sys
 import os
-import subprocess
 from lcd_game import LCDGame
 from boot_splash import BootSplash
 from desktop import Desktop
@@ -18,96 +17,15 @@ def test_system_integration():
     
     tests = []
     
-    # Проверка SPI интерфейса
+    # SPI, GPIO, config.txt, калибровка, сервисы и вывод - параллельно с таймаутами
     try:
-        if os.path.exists('/dev/spidev0.0'):
-            print("✓ SPI устройство найдено")
-            tests.append(True)
-        else:
-            print("✗ SPI устройство не найдено")
-            tests.append(False)
-    except Exception as e:
-        print(f"✗ Ошибка проверки SPI: {e}")
-        tests.append(False)
-    
-    # Проверка GPIO
-    try:
-        import RPi.GPIO as GPIO
-        GPIO.setmode(GPIO.BCM)
-        GPIO.cleanup()
-        print("✓ GPIO доступен")
-        tests.append(True)
-    except Exception as e:
-        print(f"✗ Ошибка GPIO: {e}")
-        tests.append(False)
-    
-    # Проверка config.txt
-    try:
-        with open('/boot/config.txt', 'r') as f:
-            config_content = f.read()
-        
-        if 'dtparam=spi=on' in config_content:
-            print("✓ SPI настроен в config.txt")
-            tests.append(True)
-        else:
-            print("⚠ SPI не настроен в config.txt")
-            tests.append(False)
+        import self_test
         
-        if 'gpio=' in config_content and '=pu' in config_content:
-            print("✓ GPIO подтягивающие резисторы настроены")
-            tests.append(True)
-        else:
-            print("⚠ GPIO подтягивающие резисторы не настроены")
-            tests.append(False)
-            
-    except Exception as e:
-        print(f"✗ Ошибка проверки config.txt: {e}")
-        tests.append(False)
-    
-    # Проверка поворота экрана
-    try:
-        rotation_found = False
-        for line in config_content.split('\n'):
-            if line.strip().startswith('display_rotate='):
-                angle = int(line.split('=')[1].strip())
-                print(f"✓ Текущий поворот экрана: {angle}°")
-                rotation_found = True
-                tests.append(True)
-                break
-        
-        if not rotation_found:
-            print("⚠ Поворот экрана не настроен")
-            tests.append(False)
-            
+        report = self_test.run()
+        self_test.print_report(report)
+        tests.append(report['ok'])
     except Exception as e:
-        print(f"✗ Ошибка проверки поворота: {e}")
-        tests.append(False)
-    
-    # Проверка калибровки сенсора
-    try:
-        calibration_file = '/etc/X11/xorg.conf.d/99-calibration.conf'
-        if os.path.exists(calibration_file):
-            print("✓ Файл калибровки сенсора найден")
-            tests.append(True)
-        else:
-            print("⚠ Файл калибровки сенсора не найден")
-            tests.append(False)
-    except Exception as e:
-        print(f"✗ Ошибка проверки калибровки: {e}")
-        tests.append(False)
-    
-    # Проверка systemd сервиса
-    try:
-        result = subprocess.run(['systemctl', 'is-active', 'lcd-game'], 
-                              capture_output=True, text=True)
-        if result.returncode == 0:
-            print("✓ LCD Game сервис активен")
-            tests.append(True)
-        else:
-            print("⚠ LCD Game сервис не активен")
-            tests.append(False)
-    except Exception as e:
-        print(f"✗ Ошибка проверки сервиса: {e}")
+        print(f"✗ Ошибка самопроверки: {e}")
         tests.append(False)
     
     # Проверка PyMouse
@@ -313,12 +231,15 @@ def test_backup_system():
     """Тест системы резервного копирования"""
     print("Тестирование системы резервного копирования...")
     try:
-        backup_dir = "/opt/lcd_game_backup"
+        from backup_store import BackupStore
+        from config import SYSTEM_CONFIG
+        
+        backup_dir = SYSTEM_CONFIG['backup_path']
         if os.path.exists(backup_dir):
             print("✓ Директория резервного копирования найдена")
             
-            # Проверка наличия резервных копий
-            backups = [d for d in os.listdir(backup_dir) if os.path.isdir(os.path.join(backup_dir, d))]
+            # Проверка наличия резервных копий (версии в индексе хранилища)
+            backups = BackupStore(backup_dir).entries
             if backups:
                 print(f"✓ Найдено резервных копий: {len(backups)}")
                 return True
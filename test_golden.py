@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Проверка эталонных кадров и бюджетов времени отрисовки
+Экраны рабочего стола, ключевые кадры заставки и кадры примеров игр
+выводятся на симулированный дисплей; хэш байт RGB565 на панели сравнивается
+с эталоном, время отрисовки и конвертации - с бюджетами GOLDEN_CONFIG.
+Время, метрики и датчики заморожены, случайные числа - с фиксированным seed
+
+Использование:
+    python3 test_golden.py            - проверка
+    python3 test_golden.py --update   - снять эталоны заново (после
+                                        намеренного изменения внешнего вида)
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+import PIL
+from lcd_game import LCDGame, load_font
+from sim_backend import SimulatedBackend
+from metrics import MetricsSnapshot
+from config import *
+
+# Замороженные значения рабочего стола
+FROZEN_STATUS = ("12:34", 80)
+FROZEN_METRICS = MetricsSnapshot(
+    cpu_percent=23.5, memory_percent=41.2, disk_percent=57.0, load_average=0.42,
+    process_count=123, temperature=48.3, uptime=93784, timestamp=0.0,
+)
+FROZEN_NETWORK = {
+    'interface': 'wlan0', 'address': '192.168.1.50', 'wireless': True, 'ssid': 'SHIWA',
+    'level': -54.0, 'rx_rate': 12345.0, 'tx_rate': 2048.0,
+}
+
+
+class FrozenMetrics:
+    """Сборщик метрик с неизменным снимком"""
+
+    snapshot = FROZEN_METRICS
+
+    def sample_due(self, now=None):
+        return False
+
+    def is_alive(self):
+        return True
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+class FrozenProbes:
+    """Датчики с неизменными значениями"""
+
+    def battery_level(self):
+        return FROZEN_STATUS[1]
+
+    def network(self):
+        return dict(FROZEN_NETWORK)
+
+    def close(self):
+        pass
+
+
+def environment():
+    """
+    Окружение, от которого зависят пиксели (шрифт и версия PIL)
+
+    Хэши эталонов, снятых в другом окружении, не сравниваются; бюджеты
+    времени проверяются всегда.
+    """
+    font = load_font(12)
+    path = getattr(font, 'path', None)
+    size = os.path.getsize(path) if path and os.path.exists(path) else 0
+    return {'pil': PIL.__version__, 'font': path or 'default', 'font_size': size}
+
+
+class GoldenHarness:
+    """
+    Симулированный дисплей и учет кадров
+
+    Каждый кадр: хэш того, что показывает панель, время операции, которая
+    его вывела, и время конвертации RGB565 внутри нее.
+    """
+
+    def __init__(self):
+        self.backend = SimulatedBackend(realtime=False)
+        self.lcd = LCDGame(backend=self.backend)
+        self.lcd.preload_fonts()
+        self.frames = {}
+        self.errors = []
+
+    def measure(self, op):
+        """Выполнение операции; возвращает (время, время конвертации) в секундах"""
+        self.lcd.stats.reset()
+        start = time.perf_counter()
+        op()
+        elapsed = time.perf_counter() - start
+        convert = self.lcd.stats.phases.get('convert')
+        return elapsed, sum(convert.samples) if convert else 0.0
+
+    def capture(self, name, category, timing):
+        """Запись кадра, показанного на панели"""
+        panel = self.backend.frame().tobytes()
+        if self.lcd._convert_rgb565(self.lcd.buffer) != panel:
+            # Частичные обновления или кэш разошлись с буфером рисования
+            self.errors.append(f"{name}: панель не совпадает с буфером рисования")
+        self.frames[name] = {
+            'category': category,
+            'sha256': hashlib.sha256(panel).hexdigest(),
+            'render_ms': timing[0] * 1000,
+            'convert_ms': timing[1] * 1000,
+        }
+
+    def save_image(self, name, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.backend.to_image().save(os.path.join(directory, f"{name}.png"))
+
+    def close(self):
+        self.lcd.cleanup()
+
+
+def tap(harness, button_name, op):
+    """
+    Короткое нажатие кнопки симулированного дисплея во время операции
+
+    Returns:
+        tuple: Время операции (см. GoldenHarness.measure)
+    """
+    source = harness.backend.buttons
+    source.press(button_name)
+    try:
+        timing = harness.measure(op)
+    finally:
+        source.release(button_name)
+    # ButtonManager замечает отпускание при опросе; следующее нажатие той же
+    # кнопки не должно попасть в подавление дребезга
+    harness.lcd.buttons.is_pressed(button_name)
+    time.sleep(BUTTON_DEBOUNCE_TIME)
+    return timing
+
+
+def render_desktop(harness, on_frame):
+    """Экраны рабочего стола и навигация по меню"""
+    from desktop import Desktop
+
+    desktop = Desktop(harness.lcd)
+    desktop.probes.close()
+    desktop.metrics = FrozenMetrics()
+    desktop.probes = FrozenProbes()
+    desktop.status_value = lambda: FROZEN_STATUS
+
+    # Переход на каждый экран с другого экрана; время - лучший из повторов
+    for screen_id in ("main", "system_info", "games", "settings", "network", "shutdown"):
+        other = "main" if screen_id != "main" else "settings"
+
+        def switch():
+            desktop.current_screen = other
+            desktop.render_screen()
+            desktop.current_screen = screen_id
+            desktop.render_screen()
+
+        timing = min(harness.measure(switch) for _ in range(GOLDEN_CONFIG['repeats']))
+        on_frame(f"desktop.{screen_id}", timing)
+
+    # Навигация кнопками: выделение, вход в игры, выбор игры, возврат
+    desktop.current_screen = "main"
+    desktop.selected_item = 0
+    desktop.render_screen()
+    for name, button in (("desktop.main.menu", 'DOWN'), ("desktop.games.enter", 'A'),
+                         ("desktop.games.select", 'DOWN'), ("desktop.main.back", 'B')):
+        on_frame(name, tap(harness, button,
+                           lambda: desktop.handle_input() and desktop.render_screen()))
+
+
+def render_splash(harness, on_frame):
+    """Ключевые кадры вступления и индикатора загрузки"""
+    from boot_splash import BootSplash
+
+    splash = BootSplash(harness.lcd)
+    frames = splash.intro_frames()
+    steps = []
+
+    def step():
+        next(frames)
+        harness.lcd.update()
+
+    while True:
+        try:
+            timing = harness.measure(step)
+        except StopIteration:
+            break
+        steps.append(timing)
+        if len(steps) in GOLDEN_CONFIG['splash_key_frames']:
+            on_frame(f"splash.intro.{len(steps)}", timing)
+    on_frame("splash.intro.last", steps[-1])
+
+    splash.draw_background()
+    harness.lcd.update()
+    on_frame("splash.progress", harness.measure(
+        lambda: splash.draw_progress(0.5, "Loading: Desktop", phase=1.2)))
+    on_frame("splash.ready", harness.measure(lambda: splash.draw_progress(1.0, "READY")))
+
+
+def render_games(harness, on_frame):
+    """Кадры примеров игр по сценарию"""
+    from examples.snake_game import SnakeGame
+    from examples.simple_game import SimpleGame
+
+    def frame(game):
+        game.handle_input()
+        game.update(0.1)
+        game.render()
+
+    random.seed(GOLDEN_CONFIG['seed'])
+    snake = SnakeGame(harness.lcd)
+    for number in range(1, 21):
+        timing = harness.measure(lambda: frame(snake))
+        if number in (1, 10, 20):
+            on_frame(f"game.snake.{number}", timing)
+
+    simple = SimpleGame(harness.lcd)
+    on_frame("game.simple.start", harness.measure(lambda: frame(simple)))
+    harness.backend.buttons.press('RIGHT')
+    for _ in range(5):
+        timing = harness.measure(lambda: frame(simple))
+    harness.backend.buttons.release('RIGHT')
+    on_frame("game.simple.moved", timing)
+    on_frame("game.simple.shot", tap(harness, 'A', lambda: frame(simple)))
+    on_frame("game.simple.paused", tap(harness, 'START', lambda: frame(simple)))
+
+
+SCENARIOS = (
+    ("Экраны рабочего стола", 'desktop', render_desktop),
+    ("Заставка", 'splash', render_splash),
+    ("Игры", 'game', render_games),
+)
+
+
+def run_scenario(category, scenario, golden, update):
+    """
+    Выполнение сценария и проверка его кадров
+
+    Args:
+        golden (dict): Эталоны кадров (None - хэши не сравниваются)
+        update (bool): Снятие эталонов без проверок
+
+    Returns:
+        tuple: (успех, кадры сценария)
+    """
+    harness = GoldenHarness()
+    budget = GOLDEN_CONFIG['budgets'][category]
+    failures_dir = GOLDEN_CONFIG['failures_dir']
+    ok = True
+
+    def on_frame(name, timing):
+        nonlocal ok
+        harness.capture(name, category, timing)
+        frame = harness.frames[name]
+        expected = golden.get(name) if golden is not None else None
+        status = "✓"
+        if not update:
+            if golden is not None and expected is None:
+                status = "✗ нет эталона"
+            elif expected is not None and expected['sha256'] != frame['sha256']:
+                status = "✗ кадр отличается"
+                harness.save_image(name, failures_dir)
+            elif frame['render_ms'] > budget['render_ms']:
+                status = f"✗ бюджет отрисовки {budget['render_ms']} мс"
+            elif frame['convert_ms'] > budget['convert_ms']:
+                status = f"✗ бюджет конвертации {budget['convert_ms']} мс"
+            if status != "✓":
+                ok = False
+        print(f"{status} {name:24} {frame['render_ms']:8.2f} мс (конвертация {frame['convert_ms']:.2f} мс)")
+
+    try:
+        scenario(harness, on_frame)
+    finally:
+        harness.close()
+
+    for error in harness.errors:
+        print(f"✗ {error}")
+        ok = False
+    return ok, harness.frames
+
+
+def main():
+    update = '--update' in sys.argv[1:]
+    path = GOLDEN_CONFIG['path']
+    if not os.path.isabs(path):
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), path)
+
+    print("=" * 50)
+    print("ПРОВЕРКА ЭТАЛОННЫХ КАДРОВ")
+    print("=" * 50)
+
+    golden = {}
+    if not update:
+        try:
+            with open(path, 'r') as f:
+                stored = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"✗ Эталоны недоступны ({e}); снимите их: python3 test_golden.py --update")
+            return False
+        golden = stored['frames']
+        if stored['environment'] != environment():
+            # Пиксели зависят от шрифта и версии PIL, время отрисовки - нет
+            print(f"! Эталоны сняты в другом окружении: {stored['environment']}")
+            print(f"  Текущее: {environment()}")
+            print("  Кадры не сравниваются, проверяются только бюджеты времени;")
+            print("  эталоны для этого окружения: python3 test_golden.py --update")
+            golden = None
+
+    results = []
+    frames = {}
+    for test_name, category, scenario in SCENARIOS:
+        print(f"\n--- Тест: {test_name} ---")
+        try:
+            ok, scenario_frames = run_scenario(category, scenario, golden, update)
+            frames.update(scenario_frames)
+            results.append((test_name, ok))
+        except Exception as e:
+            print(f"✗ Критическая ошибка в тесте {test_name}: {e}")
+            results.append((test_name, False))
+
+    if update:
+        stored = {
+            'environment': environment(),
+            'frames': {name: {'category': frame['category'], 'sha256': frame['sha256']}
+                       for name, frame in frames.items()},
+        }
+        with open(path, 'w') as f:
+            json.dump(stored, f, indent=2, sort_keys=True)
+        print(f"\nЭталоны записаны: {path} ({len(frames)} кадров)")
+        return all(ok for _, ok in results)
+
+    print("\n" + "=" * 50)
+    print("РЕЗУЛЬТАТЫ ПРОВЕРКИ")
+    print("=" * 50)
+    passed = 0
+    for test_name, result in results:
+        status = "✓ ПРОЙДЕН" if result else "✗ ПРОВАЛЕН"
+        print(f"{test_name}: {status}")
+        if result:
+            passed += 1
+    if passed != len(results):
+        print(f"\nОтличающиеся кадры сохранены в {GOLDEN_CONFIG['failures_dir']}")
+    return passed == len(results)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
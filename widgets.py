@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Виджеты с сохранением состояния для экранов рабочего стола
+Каждый виджет перерисовывается и отправляется на дисплей только при изменении
+"""
+
+from config import *
+
+# Маркер "виджет еще не отрисован"
+_NOT_DRAWN = object()
+
+
+class Widget:
+    """
+    Базовый виджет
+
+    Хранит свое значение, границы и значение, которое было отрисовано
+    последним. render() рисует виджет только если значение изменилось
+    и возвращает список прямоугольников, которые нужно отправить на дисплей.
+    """
+
+    def __init__(self, x, y, width, height, background=(0, 0, 0)):
+        """
+        Инициализация виджета
+
+        Args:
+            x (int): Левая граница
+            y (int): Верхняя граница
+            width (int): Ширина
+            height (int): Высота
+            background (tuple): Цвет фона RGB
+        """
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.background = background
+        self.value = None
+        self._drawn = _NOT_DRAWN
+
+    @property
+    def bounds(self):
+        """Границы виджета (x, y, width, height)"""
+        return (self.x, self.y, self.width, self.height)
+
+    @property
+    def dirty(self):
+        """Требуется ли перерисовка"""
+        return self._drawn is _NOT_DRAWN or self._drawn != self.value
+
+    def set(self, value):
+        """
+        Установка значения
+
+        Returns:
+            bool: True если значение изменилось
+        """
+        changed = value != self.value
+        self.value = value
+        return changed
+
+    def invalidate(self):
+        """Принудительная перерисовка при следующем render()"""
+        self._drawn = _NOT_DRAWN
+
+    def mark_drawn(self, value):
+        """Отметка, что на дисплее уже показано значение value"""
+        self._drawn = value
+
+    def draw(self, lcd):
+        """Отрисовка фона и содержимого в буфер дисплея"""
+        lcd.draw_rect(self.x, self.y, self.width, self.height, color=self.background, fill=True)
+        self.paint(lcd)
+
+    def paint(self, lcd):
+        """Отрисовка содержимого (переопределить в наследниках)"""
+        pass
+
+    def render(self, lcd):
+        """
+        Отрисовка виджета, если он изменился
+
+        Returns:
+            list: Прямоугольники (x, y, width, height) для отправки на дисплей
+        """
+        if not self.dirty:
+            return []
+        self.draw(lcd)
+        self._drawn = self.value
+        return [self.bounds]
+
+
+class Label(Widget):
+    """Текстовая метка"""
+
+    def __init__(self, x, y, width, height, text="", color=(255, 255, 255),
+                 font_size=DEFAULT_FONT_SIZE, background=(0, 0, 0)):
+        super().__init__(x, y, width, height, background)
+        self.color = color
+        self.font_size = font_size
+        self.value = text
+
+    def paint(self, lcd):
+        lcd.draw_text(self.value, self.x, self.y, color=self.color, font_size=self.font_size)
+
+
+class Bar(Widget):
+    """Индикатор заполнения (значение 0-100)"""
+
+    def __init__(self, x, y, width, height, color=(0, 255, 0),
+                 frame_color=(100, 100, 100), background=(0, 0, 0)):
+        super().__init__(x, y, width, height, background)
+        self.color = color
+        self.frame_color = frame_color
+        self.value = 0
+
+    def paint(self, lcd):
+        lcd.draw_rect(self.x, self.y, self.width, self.height, color=self.frame_color, fill=False)
+        fill_width = int(max(0, min(100, self.value)) / 100 * self.width)
+        if fill_width > 0:
+            lcd.draw_rect(self.x, self.y, fill_width, self.height, color=self.color, fill=True)
+
+
+class ListWidget(Widget):
+    """
+    Список строк с выделенным элементом
+
+    Значение - кортеж (элементы, индекс выделения). При смене только
+    выделения перерисовываются две затронутые строки, а не весь список.
+    """
+
+    def __init__(self, x, y, width, item_height, items, selected=None,
+                 font_size=DEFAULT_FONT_SIZE, text_color=(200, 200, 200),
+                 selected_color=(255, 255, 255), highlight=(0, 150, 255),
+                 icon_offset=25, background=(0, 0, 0), height=None):
+        """
+        Args:
+            items: Элементы - строки или пары (иконка, текст)
+            selected (int): Индекс выделенного элемента или None
+            icon_offset (int): Отступ текста от иконки
+            height (int): Высота области (по умолчанию по числу элементов)
+        """
+        if height is None:
+            height = item_height * len(items)
+        super().__init__(x, y, width, height, background)
+        self.item_height = item_height
+        self.font_size = font_size
+        self.text_color = text_color
+        self.selected_color = selected_color
+        self.highlight = highlight
+        self.icon_offset = icon_offset
+        self.value = (tuple(items), selected)
+
+    @property
+    def selected(self):
+        return self.value[1]
+
+    def select(self, index):
+        """Выделение элемента"""
+        return self.set((self.value[0], index))
+
+    def _row_bounds(self, index):
+        return (self.x, self.y + index * self.item_height, self.width, self.item_height)
+
+    def _paint_row(self, lcd, index):
+        items, selected = self.value
+        x, y, width, height = self._row_bounds(index)
+        lcd.draw_rect(x, y, width, height, color=self.background, fill=True)
+
+        if index == selected:
+            lcd.draw_rect(x + 5, y, width - 10, height, color=self.highlight, fill=True)
+            color = self.selected_color
+        else:
+            color = self.text_color
+
+        item = items[index]
+        if isinstance(item, tuple):
+            icon, text = item
+            lcd.draw_text(icon, x + 10, y + 2, color=color, font_size=self.font_size)
+            lcd.draw_text(text, x + 10 + self.icon_offset, y + 2, color=color, font_size=self.font_size)
+        else:
+            lcd.draw_text(item, x + 10, y + 2, color=color, font_size=self.font_size)
+
+    def paint(self, lcd):
+        for index in range(len(self.value[0])):
+            self._paint_row(lcd, index)
+
+    def render(self, lcd):
+        if not self.dirty:
+            return []
+
+        drawn = self._drawn
+        if drawn is not _NOT_DRAWN and drawn[0] == self.value[0]:
+            # Изменилось только выделение - перерисовываем две строки
+            rows = {index for index in (drawn[1], self.value[1]) if index is not None}
+            for index in rows:
+                self._paint_row(lcd, index)
+            self._drawn = self.value
+            return [self._row_bounds(index) for index in sorted(rows)]
+
+        return super().render(lcd)
+
+
+class StatusBar(Widget):
+    """
+    Верхняя панель статуса
+
+    Значение - кортеж (время "ЧЧ:ММ", уровень батареи в процентах).
+    """
+
+    def __init__(self, width, height=25, background=(40, 40, 40)):
+        super().__init__(0, 0, width, height, background)
+        self.value = ("", None)
+
+    def paint(self, lcd):
+        current_time, battery_level = self.value
+
+        # Время
+        lcd.draw_text(current_time, 10, 5, color=(255, 255, 255), font_size=12)
+
+        # Индикатор сети
+        lcd.draw_text("📶", self.width - 30, 5, color=(0, 255, 0), font_size=12)
+
+        # Индикатор батареи
+        if battery_level is not None:
+            battery_color = (0, 255, 0) if battery_level > 50 else (255, 255, 0) if battery_level > 20 else (255, 0, 0)
+            lcd.draw_text(f"🔋{battery_level}%", self.width - 80, 5, color=battery_color, font_size=10)
+
+
+class Screen:
+    """
+    Экран из виджетов
+
+    Полная отрисовка очищает буфер, рисует все виджеты и отправляет кадр
+    целиком; инкрементальная - отправляет только области изменившихся виджетов.
+    """
+
+    def __init__(self, lcd, background=(0, 0, 0)):
+        """
+        Инициализация экрана
+
+        Args:
+            lcd: Экземпляр LCDGame
+            background (tuple): Цвет фона RGB
+        """
+        self.lcd = lcd
+        self.background = background
+        self.widgets = []
+
+    def add(self, widget):
+        """Добавление виджета; возвращает сам виджет"""
+        self.widgets.append(widget)
+        return widget
+
+    def invalidate(self):
+        """Принудительная перерисовка всех виджетов"""
+        for widget in self.widgets:
+            widget.invalidate()
+
+    def widget_state(self):
+        """Отрисованные значения всех виджетов (для кэша готовых кадров)"""
+        return [widget._drawn for widget in self.widgets]
+
+    def restore_widget_state(self, state):
+        """Восстановление отрисованных значений после вывода кадра из кэша"""
+        for widget, value in zip(self.widgets, state):
+            widget.mark_drawn(value)
+
+    def render(self, full=False):
+        """
+        Отрисовка экрана
+
+        Args:
+            full (bool): Перерисовать и отправить весь экран
+
+        Returns:
+            int: Количество отправленных областей (0 - ничего не изменилось)
+        """
+        if full:
+            self.lcd.draw_rect(0, 0, self.lcd.width, self.lcd.height, color=self.background, fill=True)
+            for widget in self.widgets:
+                widget.invalidate()
+                widget.render(self.lcd)
+            self.lcd.update()
+            return 1
+
+        damaged = []
+        for widget in self.widgets:
+            damaged.extend(widget.render(self.lcd))
+        for rect in damaged:
+            self.lcd.update_region(*rect)
+        return len(damaged)